@@ -0,0 +1,81 @@
+"""add_order_summaries
+
+Revision ID: 2049c96f007b
+Revises: 803c44c70a9c
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2049c96f007b"
+down_revision: Union[str, None] = "803c44c70a9c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "order_summaries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_number", sa.String(length=50), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("payment_method", sa.String(length=20), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.Column("tax_amount", sa.Float(), nullable=False),
+        sa.Column("shipping_cost", sa.Float(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("shipping_address", sa.Text(), nullable=False),
+        sa.Column("billing_address", sa.Text(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("items", postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_order_summaries_created_at_id", "order_summaries", ["created_at", "id"])
+    op.create_index("ix_order_summaries_user_id_created_at_id", "order_summaries", ["user_id", "created_at", "id"])
+    op.create_index("ix_order_summaries_status_created_at_id", "order_summaries", ["status", "created_at", "id"])
+
+    # Backfill from the normalized tables
+    op.execute(
+        """
+        INSERT INTO order_summaries (
+            id, order_number, user_id, status, payment_method, item_count, total_quantity,
+            subtotal, tax_amount, shipping_cost, total_amount, shipping_address,
+            billing_address, notes, items, created_at, updated_at
+        )
+        SELECT
+            o.id, o.order_number, o.user_id, lower(o.status::text), lower(o.payment_method::text),
+            count(i.id), coalesce(sum(i.quantity), 0),
+            o.subtotal, o.tax_amount, o.shipping_cost, o.total_amount, o.shipping_address,
+            o.billing_address, o.notes,
+            coalesce(
+                jsonb_agg(
+                    jsonb_build_object(
+                        'id', i.id, 'product_id', i.product_id, 'quantity', i.quantity,
+                        'unit_price', i.unit_price, 'total_price', i.total_price
+                    ) ORDER BY i.id
+                ) FILTER (WHERE i.id IS NOT NULL),
+                '[]'::jsonb
+            ),
+            coalesce(o.created_at, now()), o.updated_at
+        FROM orders o
+        LEFT JOIN order_items i ON i.order_id = o.id
+        GROUP BY o.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_order_summaries_status_created_at_id", table_name="order_summaries")
+    op.drop_index("ix_order_summaries_user_id_created_at_id", table_name="order_summaries")
+    op.drop_index("ix_order_summaries_created_at_id", table_name="order_summaries")
+    op.drop_table("order_summaries")
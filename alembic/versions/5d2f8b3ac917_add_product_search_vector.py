@@ -0,0 +1,41 @@
+"""add_product_search_vector
+
+Revision ID: 5d2f8b3ac917
+Revises: c41e7a9d2b68
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f8b3ac917"
+down_revision: Union[str, None] = "c41e7a9d2b68"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Generated columns are filled for existing rows when they are added
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index("ix_products_search_vector", "products", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_search_vector", table_name="products")
+    op.drop_column("products", "search_vector")
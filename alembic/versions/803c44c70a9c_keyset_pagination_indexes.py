@@ -0,0 +1,32 @@
+"""keyset_pagination_indexes
+
+Revision ID: 803c44c70a9c
+Revises: 4fb6902bf10b
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "803c44c70a9c"
+down_revision: Union[str, None] = "4fb6902bf10b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # List endpoints page with ORDER BY created_at, id and (created_at, id) > cursor
+    op.create_index("ix_products_created_at_id", "products", ["created_at", "id"])
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    op.create_index("ix_orders_created_at_id", "orders", ["created_at", "id"])
+    op.create_index("ix_orders_user_id_created_at_id", "orders", ["user_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_user_id_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_created_at_id", table_name="orders")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.drop_index("ix_products_created_at_id", table_name="products")
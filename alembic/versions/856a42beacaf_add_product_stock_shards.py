@@ -0,0 +1,48 @@
+"""add_product_stock_shards
+
+Revision ID: 856a42beacaf
+Revises: af7cfecbf77b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "856a42beacaf"
+down_revision: Union[str, None] = "af7cfecbf77b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "products",
+        sa.Column("stock_sharded", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_table(
+        "product_stock_shards",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.CheckConstraint("quantity >= 0", name="ck_product_stock_shards_quantity"),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    # Fold any sharded stock back into the product rows before dropping the shards
+    op.execute(
+        """
+        UPDATE products p
+        SET stock_quantity = p.stock_quantity + s.total
+        FROM (SELECT product_id, sum(quantity) AS total FROM product_stock_shards GROUP BY product_id) s
+        WHERE p.id = s.product_id
+        """
+    )
+    op.drop_table("product_stock_shards")
+    op.drop_column("products", "stock_sharded")
@@ -0,0 +1,77 @@
+"""add_category_paths
+
+Revision ID: 9b4e2d7c1f58
+Revises: e7a1c5f09d34
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e2d7c1f58"
+down_revision: Union[str, None] = "e7a1c5f09d34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # parent_id was never enforced; dangling parents become roots
+    op.execute(
+        "UPDATE categories c SET parent_id = NULL WHERE parent_id IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM categories p WHERE p.id = c.parent_id)"
+    )
+    op.create_foreign_key("fk_categories_parent_id", "categories", "categories", ["parent_id"], ["id"])
+    op.create_index("ix_categories_parent_id", "categories", ["parent_id"])
+
+    op.add_column("categories", sa.Column("path", sa.Text(), nullable=False, server_default=""))
+    bind = op.get_bind()
+    parents = dict(bind.execute(sa.text("SELECT id, parent_id FROM categories")).all())
+    paths, cut = _paths(parents)
+    if cut:
+        bind.execute(
+            sa.text("UPDATE categories SET parent_id = NULL WHERE id = ANY(:ids)"), {"ids": sorted(cut)}
+        )
+    if paths:
+        bind.execute(
+            sa.text("UPDATE categories SET path = :path WHERE id = :id"),
+            [{"id": category_id, "path": path} for category_id, path in paths.items()],
+        )
+    op.create_index("ix_categories_path", "categories", ["path"], postgresql_ops={"path": "text_pattern_ops"})
+
+
+def _paths(parents):
+    """Materialized paths of every category, and the ids whose parent link
+    closed a cycle; those become roots."""
+    parents, cut, checked = dict(parents), set(), set()
+    for category_id in parents:
+        chain, node = [], category_id
+        while node is not None and node not in checked:
+            if node in chain:
+                cut.add(node)
+                parents[node] = None
+                break
+            chain.append(node)
+            node = parents[node]
+        checked.update(chain)
+
+    paths = {}
+    for category_id in parents:
+        chain, node = [], category_id
+        while node is not None and node not in paths:
+            chain.append(node)
+            node = parents[node]
+        prefix = paths.get(node, "")
+        for node in reversed(chain):
+            prefix = paths[node] = f"{prefix}{node}/"
+    return paths, cut
+
+
+def downgrade() -> None:
+    op.drop_index("ix_categories_path", table_name="categories")
+    op.drop_column("categories", "path")
+    op.drop_index("ix_categories_parent_id", table_name="categories")
+    op.drop_constraint("fk_categories_parent_id", "categories", type_="foreignkey")
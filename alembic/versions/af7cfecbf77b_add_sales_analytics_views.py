@@ -0,0 +1,81 @@
+"""add_sales_analytics_views
+
+Revision ID: af7cfecbf77b
+Revises: 2049c96f007b
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "af7cfecbf77b"
+down_revision: Union[str, None] = "2049c96f007b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Each view needs a unique index for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW sales_daily AS
+        SELECT CAST(created_at AS date) AS day,
+               count(*) AS order_count,
+               coalesce(sum(total_amount), 0) AS revenue
+        FROM orders
+        WHERE lower(status::text) <> 'cancelled'
+        GROUP BY CAST(created_at AS date)
+        """
+    )
+    op.create_index("ux_sales_daily_day", "sales_daily", ["day"], unique=True)
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW sales_by_product AS
+        SELECT i.product_id,
+               sum(i.quantity) AS units,
+               sum(i.total_price) AS revenue
+        FROM order_items i
+        JOIN orders o ON o.id = i.order_id
+        WHERE lower(o.status::text) <> 'cancelled'
+        GROUP BY i.product_id
+        """
+    )
+    op.create_index("ux_sales_by_product_product_id", "sales_by_product", ["product_id"], unique=True)
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW sales_by_category AS
+        SELECT p.category_id,
+               sum(i.quantity) AS units,
+               sum(i.total_price) AS revenue
+        FROM order_items i
+        JOIN orders o ON o.id = i.order_id
+        JOIN products p ON p.id = i.product_id
+        WHERE lower(o.status::text) <> 'cancelled'
+        GROUP BY p.category_id
+        """
+    )
+    op.create_index("ux_sales_by_category_category_id", "sales_by_category", ["category_id"], unique=True)
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW orders_by_status AS
+        SELECT lower(status::text) AS status,
+               count(*) AS order_count,
+               coalesce(sum(total_amount), 0) AS revenue
+        FROM orders
+        GROUP BY lower(status::text)
+        """
+    )
+    op.create_index("ux_orders_by_status_status", "orders_by_status", ["status"], unique=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS orders_by_status")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS sales_by_category")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS sales_by_product")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS sales_daily")
@@ -0,0 +1,241 @@
+"""partition_orders_by_month
+
+Revision ID: bd3f23e38ff7
+Revises: 80f92ea18d8a
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "bd3f23e38ff7"
+down_revision: Union[str, None] = "80f92ea18d8a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+ORDER_COLUMNS = (
+    "id, order_number, user_id, status, payment_method, subtotal, tax_amount, shipping_cost, "
+    "total_amount, shipping_address, billing_address, notes, created_at, updated_at"
+)
+ITEM_COLUMNS = "id, order_id, product_id, quantity, unit_price, total_price"
+
+# The sales analytics views read orders/order_items and must be rebuilt with them
+SALES_VIEWS = {
+    "sales_daily": (
+        """
+        SELECT CAST(created_at AS date) AS day,
+               count(*) AS order_count,
+               coalesce(sum(total_amount), 0) AS revenue
+        FROM orders
+        WHERE lower(status::text) <> 'cancelled'
+        GROUP BY CAST(created_at AS date)
+        """,
+        "day",
+    ),
+    "sales_by_product": (
+        """
+        SELECT i.product_id,
+               sum(i.quantity) AS units,
+               sum(i.total_price) AS revenue
+        FROM order_items i
+        JOIN orders o ON o.id = i.order_id
+        WHERE lower(o.status::text) <> 'cancelled'
+        GROUP BY i.product_id
+        """,
+        "product_id",
+    ),
+    "sales_by_category": (
+        """
+        SELECT p.category_id,
+               sum(i.quantity) AS units,
+               sum(i.total_price) AS revenue
+        FROM order_items i
+        JOIN orders o ON o.id = i.order_id
+        JOIN products p ON p.id = i.product_id
+        WHERE lower(o.status::text) <> 'cancelled'
+        GROUP BY p.category_id
+        """,
+        "category_id",
+    ),
+    "orders_by_status": (
+        """
+        SELECT lower(status::text) AS status,
+               count(*) AS order_count,
+               coalesce(sum(total_amount), 0) AS revenue
+        FROM orders
+        GROUP BY lower(status::text)
+        """,
+        "status",
+    ),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    year, month_index = divmod(month.month - 1 + months, 12)
+    return date(month.year + year, month_index + 1, 1)
+
+
+def _drop_sales_views() -> None:
+    for view in reversed(list(SALES_VIEWS)):
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view}")
+
+
+def _create_sales_views() -> None:
+    for view, (query, key) in SALES_VIEWS.items():
+        op.execute(f"CREATE MATERIALIZED VIEW {view} AS {query}")
+        op.create_index(f"ux_{view}_{key}", view, [key], unique=True)
+
+
+def _order_columns(created_at_nullable: bool):
+    return [
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('orders_id_seq')"), nullable=False),
+        sa.Column("order_number", sa.String(length=50), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="orderstatus", create_type=False),
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column("payment_method", postgresql.ENUM(name="paymentmethod", create_type=False), nullable=False),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.Column("tax_amount", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("shipping_cost", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("shipping_address", sa.Text(), nullable=False),
+        sa.Column("billing_address", sa.Text(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=created_at_nullable),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _item_columns():
+    return [
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('order_items_id_seq')"), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.Column("total_price", sa.Float(), nullable=False),
+    ]
+
+
+def _set_aside(table: str) -> None:
+    # Free the index names and keep the id sequence when the old table is dropped
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER INDEX IF EXISTS {table}_pkey RENAME TO {table}_old_pkey")
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+
+
+def _drop_old_indexes() -> None:
+    op.execute("ALTER TABLE orders_old DROP CONSTRAINT IF EXISTS orders_order_number_key")
+    for index in (
+        "ix_orders_id", "ix_orders_order_number", "ix_orders_created_at_id",
+        "ix_orders_user_id_created_at_id", "ix_order_items_id",
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def upgrade() -> None:
+    _drop_sales_views()
+    _set_aside("order_items")
+    _set_aside("orders")
+    _drop_old_indexes()
+
+    op.create_table(
+        "orders",
+        *_order_columns(created_at_nullable=False),
+        sa.PrimaryKeyConstraint("id", "created_at", name="orders_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_table(
+        "order_items",
+        *_item_columns(),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "created_at", name="order_items_pkey"),
+        sa.ForeignKeyConstraint(["order_id", "created_at"], ["orders.id", "orders.created_at"]),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+
+    # One partition per month from the oldest order to MONTHS_AHEAD months from now
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM orders_old")).scalar()
+    this_month = date.today().replace(day=1)
+    month = min(oldest.date(), this_month).replace(day=1) if oldest else this_month
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        for table in ("orders", "order_items"):
+            op.execute(
+                f"CREATE TABLE {table}_y{month:%Y}m{month:%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_add_months(month, 1)} 00:00:00+00')"
+            )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+    op.execute("CREATE TABLE order_items_default PARTITION OF order_items DEFAULT")
+
+    op.execute(
+        f"INSERT INTO orders ({ORDER_COLUMNS}) "
+        f"SELECT {ORDER_COLUMNS.replace('created_at', 'coalesce(created_at, now())')} FROM orders_old"
+    )
+    op.execute(
+        f"INSERT INTO order_items ({ITEM_COLUMNS}, created_at) "
+        f"SELECT {', '.join('i.' + c for c in ITEM_COLUMNS.split(', '))}, o.created_at "
+        "FROM order_items_old i JOIN orders o ON o.id = i.order_id"
+    )
+    op.drop_table("order_items_old")
+    op.drop_table("orders_old")
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id")
+
+    op.create_index("ix_orders_order_number", "orders", ["order_number"])
+    op.create_index("ix_orders_created_at_id", "orders", ["created_at", "id"])
+    op.create_index("ix_orders_user_id_created_at_id", "orders", ["user_id", "created_at", "id"])
+    op.create_index("ix_order_items_order_id_created_at", "order_items", ["order_id", "created_at"])
+
+    _create_sales_views()
+
+
+def downgrade() -> None:
+    _drop_sales_views()
+    _set_aside("order_items")
+    _set_aside("orders")
+    for index in (
+        "ix_orders_order_number", "ix_orders_created_at_id",
+        "ix_orders_user_id_created_at_id", "ix_order_items_order_id_created_at",
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+    op.create_table(
+        "orders",
+        *_order_columns(created_at_nullable=True),
+        sa.PrimaryKeyConstraint("id", name="orders_pkey"),
+        sa.UniqueConstraint("order_number", name="orders_order_number_key"),
+    )
+    op.create_table(
+        "order_items",
+        *_item_columns(),
+        sa.PrimaryKeyConstraint("id", name="order_items_pkey"),
+        sa.ForeignKeyConstraint(["order_id"], ["orders.id"]),
+    )
+    op.execute(f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_old")
+    op.execute(f"INSERT INTO order_items ({ITEM_COLUMNS}) SELECT {ITEM_COLUMNS} FROM order_items_old")
+    # Dropping the partitioned parents drops their partitions
+    op.drop_table("order_items_old")
+    op.drop_table("orders_old")
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute("ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id")
+
+    op.create_index("ix_orders_id", "orders", ["id"])
+    op.create_index("ix_orders_order_number", "orders", ["order_number"])
+    op.create_index("ix_order_items_id", "order_items", ["id"])
+    op.create_index("ix_orders_created_at_id", "orders", ["created_at", "id"])
+    op.create_index("ix_orders_user_id_created_at_id", "orders", ["user_id", "created_at", "id"])
+
+    _create_sales_views()
@@ -0,0 +1,29 @@
+"""add_order_discount_amount
+
+Revision ID: c41e7a9d2b68
+Revises: bd3f23e38ff7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7a9d2b68"
+down_revision: Union[str, None] = "bd3f23e38ff7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Adding the column to the partitioned parent adds it to every partition
+    op.add_column("orders", sa.Column("discount_amount", sa.Float(), nullable=False, server_default="0"))
+    op.add_column("order_summaries", sa.Column("discount_amount", sa.Float(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("order_summaries", "discount_amount")
+    op.drop_column("orders", "discount_amount")
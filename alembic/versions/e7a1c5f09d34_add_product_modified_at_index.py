@@ -0,0 +1,26 @@
+"""add_product_modified_at_index
+
+Revision ID: e7a1c5f09d34
+Revises: 5d2f8b3ac917
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a1c5f09d34"
+down_revision: Union[str, None] = "5d2f8b3ac917"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_modified_at", "products", [sa.text("coalesce(updated_at, created_at)")])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_modified_at", table_name="products")
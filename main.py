@@ -2,22 +2,100 @@ from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
-from src.infrastructure.database import engine, Base
-from src.api.routes import router as api_router
+from src.infrastructure.database import engine, replica_set, AsyncSessionLocal, Base
+from src.infrastructure.replicas import LSN_HEADER
+from src.infrastructure.pagination import NEXT_CURSOR_HEADER
+from src.infrastructure.pool_metrics import pool_status
+from src.infrastructure.periodic import run_periodically
+from src.infrastructure.idempotency import idempotency_store
+from src.infrastructure.outbox_relay import OutboxRelay
+from src.infrastructure.partitions import ensure_monthly_partitions
+from src.infrastructure.entity_cache import product_cache, user_cache
+from src.infrastructure.result_cache import result_cache
+from src.api.routes import router as api_router, MISSING_IDS_HEADER
 from src.api.routers import router as users_router
 from src.api.order_routers import router as order_router
 from src.api.auth_routers import router as auth_router
+from src.api.analytics_routers import router as analytics_router
+from src.api.pricing_routers import router as pricing_router
+from src.api.category_routers import router as category_router
+from src.application.handlers.analytics_handlers import RefreshSalesAnalyticsHandler, analytics_cache
+from src.application.handlers.category_handlers import RebuildCategoryTreeHandler
+from src.application.handlers.product_handlers import RebuildAutocompleteIndexHandler, RebuildFacetIndexHandler
+from src.api.middleware import ReadYourWritesMiddleware, IdempotencyMiddleware, IDEMPOTENT_REPLAY_HEADER
 from src.core.config import settings
 
 
+async def refresh_sales_analytics():
+    async with AsyncSessionLocal() as db:
+        await RefreshSalesAnalyticsHandler(db).handle()
+
+
+async def rebuild_autocomplete_index():
+    async with AsyncSessionLocal() as db:
+        await RebuildAutocompleteIndexHandler(db).handle()
+
+
+async def rebuild_category_tree():
+    async with AsyncSessionLocal() as db:
+        await RebuildCategoryTreeHandler(db).handle()
+
+
+async def rebuild_facet_index():
+    async with AsyncSessionLocal() as db:
+        await RebuildFacetIndexHandler(db).handle()
+
+
+async def create_order_partitions():
+    async with engine.begin() as conn:
+        created = await ensure_monthly_partitions(conn, settings.ORDER_PARTITION_MONTHS_AHEAD)
+    if created:
+        print(f"Created partitions: {', '.join(created)}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create database tables
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     print("Database tables created")
+    # Before serving, so that no order lands in a default partition
+    await create_order_partitions()
+    await rebuild_category_tree()
+    await rebuild_autocomplete_index()
+    await rebuild_facet_index()
+    background_tasks = [
+        asyncio.create_task(
+            run_periodically(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, create_order_partitions)
+        ),
+        asyncio.create_task(
+            run_periodically(settings.ANALYTICS_REFRESH_INTERVAL_SECONDS, refresh_sales_analytics)
+        ),
+        asyncio.create_task(
+            run_periodically(settings.AUTOCOMPLETE_REBUILD_INTERVAL_SECONDS, rebuild_autocomplete_index)
+        ),
+        asyncio.create_task(
+            run_periodically(settings.CATEGORY_TREE_REBUILD_INTERVAL_SECONDS, rebuild_category_tree)
+        ),
+        asyncio.create_task(
+            run_periodically(settings.FACET_INDEX_REBUILD_INTERVAL_SECONDS, rebuild_facet_index)
+        ),
+    ]
+    if settings.OUTBOX_RELAY_IN_PROCESS:
+        relay = OutboxRelay(AsyncSessionLocal)
+        background_tasks.append(asyncio.create_task(
+            run_periodically(settings.OUTBOX_POLL_INTERVAL_SECONDS, relay.relay_pending)
+        ))
     yield
     print("Shutting down...")
+    for task in background_tasks:
+        task.cancel()
+    await idempotency_store.close()
+    await result_cache.close()
+    await replica_set.dispose()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -34,13 +112,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LSN_HEADER, NEXT_CURSOR_HEADER, MISSING_IDS_HEADER, IDEMPOTENT_REPLAY_HEADER, "ETag"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(IdempotencyMiddleware, exclude_paths={"/api/v1/admin/products/import"})
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(users_router, prefix="/api/v1")
 app.include_router(order_router, prefix="/api/v1")
 app.include_router(auth_router, prefix="/api/v1", tags=["authentication"])
+app.include_router(analytics_router, prefix="/api/v1", tags=["analytics"])
+app.include_router(pricing_router, prefix="/api/v1", tags=["pricing"])
+app.include_router(category_router, prefix="/api/v1", tags=["categories"])
 
 
 @app.get("/")
@@ -53,6 +137,27 @@ async def health_check():
     return {"status": "healthy", "database": "connected"}
 
 
+@app.get("/admin/db/pool")
+async def database_pool_status():
+    return {
+        "primary": pool_status(engine.pool),
+        "replicas": [
+            {**replica.status(), **pool_status(replica.engine.pool)}
+            for replica in replica_set.replicas
+        ],
+    }
+
+
+@app.get("/admin/cache")
+async def cache_stats():
+    return {
+        "products": product_cache.stats(),
+        "users": user_cache.stats(),
+        "analytics": analytics_cache.stats(),
+        "results": result_cache.stats(),
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
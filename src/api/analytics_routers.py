@@ -0,0 +1,60 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_db, get_read_db
+from src.application.queries.analytics_queries import (
+    GetDailyRevenueQuery, GetProductSalesQuery,
+    DailyRevenueDTO, ProductSalesDTO, CategoryRevenueDTO, OrderStatusCountDTO
+)
+from src.application.handlers.analytics_handlers import (
+    GetDailyRevenueHandler, GetProductSalesHandler, GetCategoryRevenueHandler,
+    GetOrderStatusCountsHandler, RefreshSalesAnalyticsHandler
+)
+
+router = APIRouter(prefix="/analytics")
+
+
+@router.get("/revenue/daily", response_model=list[DailyRevenueDTO])
+async def get_daily_revenue(
+    date_from: date = Query(None),
+    date_to: date = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetDailyRevenueHandler(db)
+    query = GetDailyRevenueQuery(date_from=date_from, date_to=date_to)
+    return await handler.handle(query)
+
+
+@router.get("/products/units", response_model=list[ProductSalesDTO])
+async def get_product_sales(
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetProductSalesHandler(db)
+    query = GetProductSalesQuery(limit=limit)
+    return await handler.handle(query)
+
+
+@router.get("/categories/revenue", response_model=list[CategoryRevenueDTO])
+async def get_category_revenue(
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetCategoryRevenueHandler(db)
+    return await handler.handle()
+
+
+@router.get("/orders/status", response_model=list[OrderStatusCountDTO])
+async def get_order_status_counts(
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetOrderStatusCountsHandler(db)
+    return await handler.handle()
+
+
+@router.post("/refresh")
+async def refresh_sales_analytics(
+    db: AsyncSession = Depends(get_db)
+):
+    handler = RefreshSalesAnalyticsHandler(db)
+    refreshed = await handler.handle()
+    return {"refreshed": refreshed}
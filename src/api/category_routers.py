@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_read_db
+from src.infrastructure.unit_of_work import UnitOfWork, get_uow
+from src.domain.exceptions import CategoryNotFoundError
+from src.application.commands.category_commands import (
+    CreateCategoryCommand, UpdateCategoryCommand, DeleteCategoryCommand
+)
+from src.application.queries.category_queries import CategoryDTO, CategoryTreeNodeDTO, GetCategoryQuery
+from src.application.handlers.category_handlers import (
+    CreateCategoryHandler, UpdateCategoryHandler, DeleteCategoryHandler,
+    GetCategoryHandler, GetCategoryTreeHandler
+)
+
+router = APIRouter()
+
+
+@router.post("/categories", response_model=CategoryDTO, status_code=201)
+async def create_category(
+    command: CreateCategoryCommand,
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = CreateCategoryHandler(uow)
+    try:
+        return await handler.handle(command)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Declared before /categories/{category_id}, which would otherwise match "tree"
+@router.get("/categories/tree", response_model=list[CategoryTreeNodeDTO])
+async def get_category_tree():
+    """Served from this worker's in-memory tree; no database round trip."""
+    handler = GetCategoryTreeHandler()
+    return handler.handle()
+
+
+@router.get("/categories/{category_id}", response_model=CategoryDTO)
+async def get_category(
+    category_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetCategoryHandler(db)
+    query = GetCategoryQuery(category_id=category_id)
+    try:
+        return await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/categories/{category_id}", response_model=CategoryDTO)
+async def update_category(
+    category_id: int,
+    command: UpdateCategoryCommand,
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = UpdateCategoryHandler(uow)
+    try:
+        return await handler.handle(category_id, command)
+    except CategoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/categories/{category_id}")
+async def delete_category(
+    category_id: int,
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = DeleteCategoryHandler(uow)
+    command = DeleteCategoryCommand(category_id=category_id)
+    try:
+        await handler.handle(command)
+        return {"message": "Category deleted successfully"}
+    except CategoryNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
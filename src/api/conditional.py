@@ -0,0 +1,86 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from typing import Iterable, Optional, Tuple
+
+# Conditional GET support: validators come from updated_at (created_at for
+# rows that were never updated), so a 304 can be decided without serializing
+# the body.
+
+
+def _version(updated_at: Optional[datetime], created_at: Optional[datetime]) -> Optional[datetime]:
+    return updated_at or created_at
+
+
+def _micros(moment: Optional[datetime]) -> int:
+    return int(moment.timestamp() * 1_000_000) if moment else 0
+
+
+def entity_validators(
+    entity_id: int, updated_at: Optional[datetime], created_at: Optional[datetime]
+) -> Tuple[str, Optional[datetime]]:
+    """ETag and Last-Modified of a single row."""
+    last_modified = _version(updated_at, created_at)
+    return f'"{entity_id}-{_micros(last_modified)}"', last_modified
+
+
+def collection_etag(items: Iterable) -> str:
+    """ETag of a page, from the id and version of every item on it.
+
+    Adding, removing, reordering or changing any item changes the tag, so no
+    collection-wide counter is needed. Pages get no Last-Modified, because a
+    deleted item would not move the newest timestamp.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(f"{item.id}-{_micros(_version(item.updated_at, item.created_at))},".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Whether the client's cached copy is current; If-None-Match wins over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        return _not_modified_since(if_modified_since, last_modified)
+    return False
+
+
+def has_preconditions(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def conditional(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Set the validators on ``response``; return a 304 if the client's copy is current."""
+    headers = {"ETag": etag}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    response.headers.update(headers)
+    if is_fresh(request, etag, last_modified):
+        # Headers already set for the full response (e.g. X-Next-Cursor) still apply
+        kept = {key: value for key, value in response.headers.items() if key != "content-length"}
+        return Response(status_code=304, headers=kept)
+    return None
@@ -0,0 +1,178 @@
+import hashlib
+from typing import Collection, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, Response
+from src.core.config import settings
+from src.infrastructure.database import replica_set
+from src.infrastructure.idempotency import PENDING, idempotency_store
+from src.infrastructure.replicas import LSN_HEADER, current_wal_lsn
+
+
+class ReadYourWritesMiddleware:
+    """Returns the primary WAL position to clients whose request committed.
+
+    Clients send the value back in the same header on later reads so that
+    ``get_read_db`` keeps them on the primary until a replica has caught up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_set.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_lsn(message):
+            if message["type"] == "http.response.start":
+                session = scope.get("state", {}).get("primary_session")
+                if session is not None and session.info.get("committed"):
+                    lsn = session.info.get("commit_lsn") or await current_wal_lsn(session)
+                    headers = MutableHeaders(scope=message)
+                    headers.append(LSN_HEADER, lsn)
+            await send(message)
+
+        await self.app(scope, receive, send_with_lsn)
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class IdempotencyMiddleware:
+    """Executes a command request at most once per ``Idempotency-Key``.
+
+    The first request claims the key and its response is stored for
+    ``IDEMPOTENCY_TTL_SECONDS``; retries get the stored response back, and
+    duplicates that arrive while it is still running wait for it. 5xx
+    responses are not stored so that the client can retry them.
+    """
+
+    def __init__(self, app, exclude_paths: Collection[str] = ()):
+        self.app = app
+        # Routes that stream their request body; buffering it here to
+        # fingerprint it would hold the whole upload in memory
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in IDEMPOTENT_METHODS
+            or scope["path"] in self.exclude_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= 255:
+            await JSONResponse(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} must be 1-255 characters"}, status_code=400
+            )(scope, receive, send)
+            return
+
+        limit = settings.IDEMPOTENCY_MAX_BODY_BYTES
+        body = None
+        if int(headers.get("content-length") or 0) <= limit:
+            body = await _read_body(receive, limit)
+        if body is None:
+            await JSONResponse(
+                {"detail": f"Requests with an {IDEMPOTENCY_KEY_HEADER} are limited to {limit} bytes"},
+                status_code=413,
+            )(scope, receive, send)
+            return
+        store_key = f"{scope['method']}:{scope['path']}:{_caller(headers)}:{key}"
+        fingerprint = hashlib.sha256(scope.get("query_string", b"") + b"\n" + body).hexdigest()
+
+        record = await idempotency_store.claim(store_key, fingerprint)
+        while record is not None and record["state"] == PENDING:
+            if record["fingerprint"] != fingerprint:
+                break
+            record = await idempotency_store.wait(store_key, settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+            if record is None:
+                # The first request failed and released the key; take it over
+                record = await idempotency_store.claim(store_key, fingerprint)
+            elif record["state"] == PENDING:
+                await JSONResponse(
+                    {"detail": "A request with this idempotency key is still in progress"},
+                    status_code=409,
+                )(scope, receive, send)
+                return
+
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                response = JSONResponse(
+                    {"detail": f"{IDEMPOTENCY_KEY_HEADER} was already used with a different request"},
+                    status_code=422,
+                )
+            else:
+                response = Response(record["body"], status_code=record["status"])
+                response.raw_headers = [
+                    (name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]
+                ] + [(IDEMPOTENT_REPLAY_HEADER.lower().encode("latin-1"), b"true")]
+            await response(scope, receive, send)
+            return
+
+        await self._execute(scope, receive, send, body, store_key, fingerprint)
+
+    async def _execute(self, scope, receive, send, body, store_key, fingerprint):
+        response = {"status": 500, "headers": [], "chunks": []}
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                response["chunks"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await idempotency_store.release(store_key)
+            raise
+        if response["status"] >= 500:
+            await idempotency_store.release(store_key)
+            return
+        await idempotency_store.complete(store_key, {
+            "fingerprint": fingerprint,
+            "status": response["status"],
+            "headers": response["headers"],
+            "body": b"".join(response["chunks"]),
+        })
+
+
+def _caller(headers: Headers) -> str:
+    # Keys are only unique per client, and the stored response is replayed
+    # before any auth dependency runs, so each set of credentials gets its own
+    credentials = headers.get("authorization", "") + "\n" + headers.get("cookie", "")
+    return hashlib.sha256(credentials.encode("latin-1")).hexdigest()
+
+
+async def _read_body(receive, limit: int) -> Optional[bytes]:
+    """Returns the request body, or None once it grows past ``limit`` bytes."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from src.infrastructure.database import get_db
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_read_db
+from src.infrastructure.pagination import set_next_cursor
+from src.infrastructure.unit_of_work import UnitOfWork, get_uow
+from src.api.conditional import conditional, collection_etag, entity_validators, has_preconditions, is_fresh
+from src.domain.exceptions import InsufficientStockError, InvalidStatusTransitionError
 from src.application.commands.order_commands import (
     CreateOrderCommand, UpdateOrderCommand, CancelOrderCommand,
-    AddOrderItemCommand, UpdateOrderItemCommand, RemoveOrderItemCommand
+    AddOrderItemCommand, UpdateOrderItemCommand, RemoveOrderItemCommand,
+    BulkUpdateOrderStatusCommand, RebuildOrderSummariesCommand
 )
 from src.application.queries.order_queries import (
-    GetOrderQuery, GetOrdersQuery, GetUserOrdersQuery, OrderDTO
+    GetOrderQuery, GetOrdersQuery, GetUserOrdersQuery, OrderDTO, BulkOrderStatusResultDTO
 )
 from src.application.handlers.order_handlers import (
     CreateOrderHandler, UpdateOrderHandler, CancelOrderHandler,
-    GetOrderHandler, GetOrdersHandler, GetUserOrdersHandler
+    UpdateOrderItemHandler, RemoveOrderItemHandler, BulkUpdateOrderStatusHandler,
+    RebuildOrderSummariesHandler,
+    GetOrderHandler, GetOrderVersionHandler, GetOrdersHandler, GetUserOrdersHandler
 )
 
 router = APIRouter()
@@ -19,81 +27,135 @@ router = APIRouter()
 @router.post("/orders", response_model=OrderDTO, status_code=201)
 async def create_order(
     command: CreateOrderCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = CreateOrderHandler(db)
-    return handler.handle(command)
+    handler = CreateOrderHandler(uow)
+    try:
+        return await handler.handle(command)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.get("/orders/{order_id}", response_model=OrderDTO)
 async def get_order(
+    request: Request,
+    response: Response,
     order_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    handler = GetOrderHandler(db)
     query = GetOrderQuery(order_id=order_id)
     try:
-        return handler.handle(query)
+        if has_preconditions(request):
+            # Revalidation reads two timestamps instead of the order and its items
+            version = await GetOrderVersionHandler(db).handle(query)
+            validators = entity_validators(version.id, version.updated_at, version.created_at)
+            if is_fresh(request, *validators):
+                return conditional(request, response, *validators)
+        order = await GetOrderHandler(db).handle(query)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    validators = entity_validators(order.id, order.updated_at, order.created_at)
+    return conditional(request, response, *validators) or order
 
 
 @router.get("/orders", response_model=list[OrderDTO])
 async def get_orders(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status: str = Query(None, pattern="^(pending|confirmed|processing|shipped|delivered|cancelled)$"),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip"),
+    created_from: datetime = Query(None, description="Only orders created at or after this time"),
+    created_to: datetime = Query(None, description="Only orders created before this time"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     handler = GetOrdersHandler(db)
     query = GetOrdersQuery(
         skip=skip,
         limit=limit,
-        status=status
+        status=status,
+        cursor=cursor,
+        created_from=created_from,
+        created_to=created_to
     )
-    return handler.handle(query)
+    try:
+        orders = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, orders, limit)
+    return conditional(request, response, collection_etag(orders)) or orders
 
 
 @router.get("/users/{user_id}/orders", response_model=list[OrderDTO])
 async def get_user_orders(
+    request: Request,
     user_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip"),
+    created_from: datetime = Query(None, description="Only orders created at or after this time"),
+    created_to: datetime = Query(None, description="Only orders created before this time"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     handler = GetUserOrdersHandler(db)
     query = GetUserOrdersQuery(
         user_id=user_id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        created_from=created_from,
+        created_to=created_to
     )
-    return handler.handle(query)
+    try:
+        orders = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, orders, limit)
+    return conditional(request, response, collection_etag(orders)) or orders
 
 
 @router.put("/orders/{order_id}", response_model=OrderDTO)
 async def update_order(
     order_id: int,
     command: UpdateOrderCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = UpdateOrderHandler(db)
+    handler = UpdateOrderHandler(uow)
     try:
-        return handler.handle(order_id, command)
+        return await handler.handle(order_id, command)
+    except (InsufficientStockError, InvalidStatusTransitionError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.post("/orders/bulk-status", response_model=BulkOrderStatusResultDTO)
+async def bulk_update_order_status(
+    command: BulkUpdateOrderStatusCommand,
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = BulkUpdateOrderStatusHandler(uow)
+    try:
+        return await handler.handle(command)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/orders/{order_id}/cancel", response_model=OrderDTO)
 async def cancel_order(
     order_id: int,
     reason: str = None,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
     from src.application.commands.order_commands import CancelOrderCommand
-    handler = CancelOrderHandler(db)
+    handler = CancelOrderHandler(uow)
     command = CancelOrderCommand(order_id=order_id, reason=reason)
     try:
-        return handler.handle(command)
+        return await handler.handle(command)
+    except InvalidStatusTransitionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -102,25 +164,33 @@ async def cancel_order(
 async def add_order_item(
     order_id: int,
     command: AddOrderItemCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
     # Override order_id from the URL
     command.order_id = order_id
     from src.application.handlers.order_handlers import AddOrderItemHandler
-    handler = AddOrderItemHandler(db)
-    item = handler.handle(command)
-    return item
+    handler = AddOrderItemHandler(uow)
+    try:
+        return await handler.handle(command)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.put("/orders/items/{item_id}", response_model=OrderDTO)
 async def update_order_item(
     item_id: int,
     command: UpdateOrderItemCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = UpdateOrderItemHandler(db)
+    # Override item_id from the URL
+    command.item_id = item_id
+    handler = UpdateOrderItemHandler(uow)
     try:
-        return handler.handle(command)
+        return await handler.handle(command)
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -128,12 +198,21 @@ async def update_order_item(
 @router.delete("/orders/items/{item_id}")
 async def remove_order_item(
     item_id: int,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = RemoveOrderItemHandler(db)
+    handler = RemoveOrderItemHandler(uow)
     command = RemoveOrderItemCommand(item_id=item_id)
     try:
-        handler.handle(command)
+        await handler.handle(command)
         return {"message": "Order item removed successfully"}
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/admin/order-summaries/rebuild")
+async def rebuild_order_summaries(
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = RebuildOrderSummariesHandler(uow)
+    count = await handler.handle(RebuildOrderSummariesCommand())
+    return {"message": "Order summaries rebuilt", "count": count}
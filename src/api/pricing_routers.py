@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_read_db
+from src.application.queries.pricing_queries import QuoteCartsQuery, CartQuoteDTO
+from src.application.handlers.pricing_handlers import QuoteCartsHandler
+
+router = APIRouter()
+
+
+@router.post("/quotes", response_model=list[CartQuoteDTO])
+async def quote_carts(
+    query: QuoteCartsQuery,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Price many carts in one call; quotes are returned in the order of the carts."""
+    handler = QuoteCartsHandler(db)
+    try:
+        return await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from src.infrastructure.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_read_db
+from src.infrastructure.pagination import set_next_cursor
+from src.infrastructure.unit_of_work import UnitOfWork, get_uow
 from src.api.auth_routers import get_current_active_user
+from src.api.conditional import conditional, collection_etag, entity_validators
 from src.application.queries.user_queries import UserDTO
 from src.application.commands.user_commands import (
     CreateUserCommand, UpdateUserCommand, DeleteUserCommand
@@ -20,41 +23,54 @@ router = APIRouter()
 @router.post("/users", response_model=UserDTO, status_code=201)
 async def create_user(
     command: CreateUserCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = CreateUserHandler(db)
-    return handler.handle(command)
+    handler = CreateUserHandler(uow)
+    return await handler.handle(command)
 
 
 @router.get("/users/{user_id}", response_model=UserDTO)
 async def get_user(
+    request: Request,
+    response: Response,
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     handler = GetUserHandler(db)
     query = GetUserQuery(user_id=user_id)
     try:
-        return handler.handle(query)
+        user = await handler.handle(query)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    validators = entity_validators(user.id, user.updated_at, user.created_at)
+    return conditional(request, response, *validators) or user
 
 
 @router.get("/users", response_model=list[UserDTO])
 async def get_users(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     role: str = Query(None, pattern="^(customer|admin|moderator)$"),
     is_active: bool = Query(True),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     handler = GetUsersHandler(db)
     query = GetUsersQuery(
         skip=skip,
         limit=limit,
         role=role,
-        is_active=is_active
+        is_active=is_active,
+        cursor=cursor
     )
-    return handler.handle(query)
+    try:
+        users = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, users, limit)
+    return conditional(request, response, collection_etag(users)) or users
 
 
 @router.put("/users/{user_id}", response_model=UserDTO)
@@ -62,11 +78,11 @@ async def update_user(
     user_id: int,
     command: UpdateUserCommand,
     current_user: UserDTO = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = UpdateUserHandler(db)
+    handler = UpdateUserHandler(uow)
     try:
-        return handler.handle(user_id, command)
+        return await handler.handle(user_id, command)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -75,12 +91,12 @@ async def update_user(
 async def delete_user(
     user_id: int,
     current_user: UserDTO = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = DeleteUserHandler(db)
+    handler = DeleteUserHandler(uow)
     command = DeleteUserCommand(user_id=user_id)
     try:
-        handler.handle(command)
+        await handler.handle(command)
         return {"message": "User deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
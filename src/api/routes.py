@@ -1,85 +1,233 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from src.infrastructure.database import get_db
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.infrastructure.database import get_read_db
+from src.infrastructure.pagination import set_next_cursor
+from src.infrastructure.exports import EXPORT_MEDIA_TYPES
+from src.infrastructure.imports import UploadTooLargeError
+from src.infrastructure.unit_of_work import UnitOfWork, get_uow
+from src.api.conditional import conditional, collection_etag, entity_validators
 from src.application.commands.product_commands import (
-    CreateProductCommand, UpdateProductCommand, DeleteProductCommand
+    CreateProductCommand, UpdateProductCommand, DeleteProductCommand,
+    EnableStockShardingCommand, DisableStockShardingCommand, ImportProductsCommand
 )
 from src.application.queries.product_queries import (
-    GetProductQuery, GetProductsQuery, SearchProductsQuery, ProductDTO
+    GetProductQuery, GetProductBySkuQuery, GetProductsQuery, SearchProductsQuery, AutocompleteProductsQuery, GetProductStockQuery,
+    ExportProductsQuery, GetProductsByIdsQuery, ProductBatchDTO, BrowseProductsQuery, ProductBrowseDTO,
+    ProductDTO, ProductStockDTO, ProductSuggestionDTO, ProductImportResultDTO
 )
 from src.application.handlers.product_handlers import (
     CreateProductHandler, UpdateProductHandler, DeleteProductHandler,
-    GetProductHandler, GetProductsHandler, SearchProductsHandler
+    EnableStockShardingHandler, DisableStockShardingHandler, ImportProductsHandler,
+    GetProductHandler, GetProductBySkuHandler, GetProductsHandler, SearchProductsHandler, AutocompleteProductsHandler,
+    ExportProductsHandler, GetProductsByIdsHandler, BrowseProductsHandler,
+    GetProductStockHandler
 )
 
 router = APIRouter()
 
+# Response header listing requested product ids that do not exist
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
 
 @router.post("/products", response_model=ProductDTO, status_code=201)
 async def create_product(
     command: CreateProductCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = CreateProductHandler(uow)
+    return await handler.handle(command)
+
+
+# Declared before /products/{product_id}, which would otherwise match "autocomplete"
+@router.get("/products/autocomplete", response_model=list[ProductSuggestionDTO])
+async def autocomplete_products(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Served from this worker's in-memory index; no database round trip."""
+    handler = AutocompleteProductsHandler()
+    return handler.handle(AutocompleteProductsQuery(prefix=prefix, limit=limit))
+
+
+# Declared before /products/{product_id}, which would otherwise match "search"
+@router.get("/products/search", response_model=list[ProductDTO])
+async def search_products(
+    request: Request,
+    response: Response,
+    query: str = Query(..., min_length=1, max_length=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    category_id: int = Query(None, gt=0),
+    is_active: bool = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = SearchProductsHandler(db)
+    search_query = SearchProductsQuery(
+        query=query,
+        skip=skip,
+        limit=limit,
+        category_id=category_id,
+        is_active=is_active
+    )
+    products = await handler.handle(search_query)
+    return conditional(request, response, collection_etag(products)) or products
+
+
+# Declared before /products/{product_id}, which would otherwise match "browse"
+@router.get("/products/browse", response_model=ProductBrowseDTO)
+async def browse_products(
+    category_id: List[int] = Query(None, description="Repeat to match any of several categories"),
+    min_price: float = Query(None, ge=0),
+    max_price: float = Query(None, ge=0),
+    in_stock: bool = Query(False),
+    is_active: bool = Query(True),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Filtered products with facet counts, from this worker's in-memory facet index."""
+    handler = BrowseProductsHandler(db)
+    try:
+        query = BrowseProductsQuery(
+            category_ids=category_id or [],
+            min_price=min_price,
+            max_price=max_price,
+            in_stock=in_stock,
+            is_active=is_active,
+            skip=skip,
+            limit=limit
+        )
+        return await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Declared before /products/{product_id}, which would otherwise match "export"
+@router.get("/products/export")
+async def export_products(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    updated_since: datetime = Query(None, description="Only products created or updated since then"),
+    category_id: int = Query(None, gt=0),
+    is_active: bool = Query(None),
+    gzip: bool = Query(False, description="Compress the body (Content-Encoding: gzip)"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    handler = CreateProductHandler(db)
-    return handler.handle(command)
+    """The whole catalog in one streamed response, for feeds."""
+    handler = ExportProductsHandler(db)
+    query = ExportProductsQuery(
+        format=format,
+        updated_since=updated_since,
+        category_id=category_id,
+        is_active=is_active,
+        gzip=gzip
+    )
+    headers = {"Content-Disposition": f'attachment; filename="products.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(handler.handle(query), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
 
 
 @router.get("/products/{product_id}", response_model=ProductDTO)
 async def get_product(
+    request: Request,
+    response: Response,
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     handler = GetProductHandler(db)
     query = GetProductQuery(product_id=product_id)
     try:
-        return handler.handle(query)
+        product = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    validators = entity_validators(product.id, product.updated_at, product.created_at)
+    return conditional(request, response, *validators) or product
+
+
+@router.get("/products/sku/{sku}", response_model=ProductDTO)
+async def get_product_by_sku(
+    request: Request,
+    response: Response,
+    sku: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetProductBySkuHandler(db)
+    query = GetProductBySkuQuery(sku=sku)
+    try:
+        product = await handler.handle(query)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    validators = entity_validators(product.id, product.updated_at, product.created_at)
+    return conditional(request, response, *validators) or product
 
 
 @router.get("/products", response_model=list[ProductDTO])
 async def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     category_id: int = Query(None, ge=0),
+    include_descendants: bool = Query(False, description="Also match products in subcategories of category_id"),
     is_active: bool = Query(True),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="Cursor from the X-Next-Cursor header; takes precedence over skip"),
+    ids: str = Query(None, description="Comma-separated product ids to fetch in this order; the other parameters are ignored"),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    if ids is not None:
+        try:
+            product_ids = [int(product_id) for product_id in ids.split(",") if product_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+        try:
+            batch_query = GetProductsByIdsQuery(ids=product_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        batch = await GetProductsByIdsHandler(db).handle(batch_query)
+        if batch.missing_ids:
+            response.headers[MISSING_IDS_HEADER] = ",".join(map(str, batch.missing_ids))
+        return conditional(request, response, collection_etag(batch.products)) or batch.products
+
     handler = GetProductsHandler(db)
     query = GetProductsQuery(
         skip=skip,
         limit=limit,
         category_id=category_id,
-        is_active=is_active
+        include_descendants=include_descendants,
+        is_active=is_active,
+        cursor=cursor
     )
-    return handler.handle(query)
+    try:
+        products = await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, products, limit)
+    return conditional(request, response, collection_etag(products)) or products
 
 
-@router.get("/products/search", response_model=list[ProductDTO])
-async def search_products(
-    query: str = Query(..., min_length=1, max_length=100),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+@router.post("/products/batch", response_model=ProductBatchDTO)
+async def get_products_by_ids(
+    query: GetProductsByIdsQuery,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    handler = SearchProductsHandler(db)
-    search_query = SearchProductsQuery(
-        query=query,
-        skip=skip,
-        limit=limit
-    )
-    return handler.handle(search_query)
+    """Same as GET /products?ids=, for id lists too long for a URL."""
+    handler = GetProductsByIdsHandler(db)
+    return await handler.handle(query)
 
 
 @router.put("/products/{product_id}", response_model=ProductDTO)
 async def update_product(
     product_id: int,
     command: UpdateProductCommand,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = UpdateProductHandler(db)
+    handler = UpdateProductHandler(uow)
     try:
-        return handler.handle(product_id, command)
+        return await handler.handle(product_id, command)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -87,12 +235,73 @@ async def update_product(
 @router.delete("/products/{product_id}")
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    uow: UnitOfWork = Depends(get_uow)
 ):
-    handler = DeleteProductHandler(db)
+    handler = DeleteProductHandler(uow)
     command = DeleteProductCommand(product_id=product_id)
     try:
-        handler.handle(command)
+        await handler.handle(command)
         return {"message": "Product deleted successfully"}
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/products/{product_id}/stock", response_model=ProductStockDTO)
+async def get_product_stock(
+    product_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    handler = GetProductStockHandler(db)
+    query = GetProductStockQuery(product_id=product_id)
+    try:
+        return await handler.handle(query)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/admin/products/{product_id}/stock-shards", response_model=ProductStockDTO)
+async def enable_stock_sharding(
+    product_id: int,
+    shards: int = Query(None, ge=2, le=256, description="Number of shards; defaults to STOCK_SHARD_COUNT"),
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = EnableStockShardingHandler(uow)
+    command = EnableStockShardingCommand(product_id=product_id, shards=shards)
+    try:
+        return await handler.handle(command)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/admin/products/{product_id}/stock-shards", response_model=ProductStockDTO)
+async def disable_stock_sharding(
+    product_id: int,
+    uow: UnitOfWork = Depends(get_uow)
+):
+    handler = DisableStockShardingHandler(uow)
+    command = DisableStockShardingCommand(product_id=product_id)
+    try:
+        return await handler.handle(command)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/admin/products/import", response_model=ProductImportResultDTO)
+async def import_products(
+    request: Request,
+    format: str = Query(None, pattern="^(csv|ndjson)$", description="Defaults to ndjson for NDJSON content types, else csv"),
+    uow: UnitOfWork = Depends(get_uow)
+):
+    """Upsert products by SKU from the raw request body: CSV with a header row, or NDJSON."""
+    if int(request.headers.get("content-length") or 0) > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail=str(UploadTooLargeError(settings.MAX_FILE_SIZE)))
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    handler = ImportProductsHandler(uow)
+    try:
+        return await handler.handle(ImportProductsCommand(format=format), request.stream())
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
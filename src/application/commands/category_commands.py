@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class CreateCategoryCommand(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    slug: str = Field(..., min_length=1, max_length=100, pattern="^[a-z0-9]+(-[a-z0-9]+)*$")
+    description: Optional[str] = None
+    parent_id: Optional[int] = Field(None, gt=0)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "name": "Headphones",
+                "slug": "headphones",
+                "description": "Wired and wireless headphones",
+                "parent_id": 1
+            }
+        }
+    }
+
+
+class UpdateCategoryCommand(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    slug: Optional[str] = Field(None, min_length=1, max_length=100, pattern="^[a-z0-9]+(-[a-z0-9]+)*$")
+    description: Optional[str] = None
+    # Moves the category with its subtree; null makes it a root category
+    parent_id: Optional[int] = Field(None, gt=0)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "name": "Audio",
+                "parent_id": 1
+            }
+        }
+    }
+
+
+class DeleteCategoryCommand(BaseModel):
+    category_id: int = Field(..., gt=0)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "category_id": 1
+            }
+        }
+    }
@@ -102,4 +102,29 @@ class RemoveOrderItemCommand(BaseModel):
                 "item_id": 1
             }
         }
-    }
\ No newline at end of file
+    }
+
+
+class BulkUpdateOrderStatusCommand(BaseModel):
+    status: str = Field(..., pattern="^(pending|confirmed|processing|shipped|delivered|cancelled)$")
+    # Either explicit ids or a filter on the current status (optionally by age)
+    order_ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    current_status: Optional[str] = Field(None, pattern="^(pending|confirmed|processing|shipped|delivered|cancelled)$")
+    created_before: Optional[datetime] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "status": "shipped",
+                "order_ids": [1, 2, 3]
+            }
+        }
+    }
+
+
+class RebuildOrderSummariesCommand(BaseModel):
+    model_config = {
+        "json_schema_extra": {
+            "example": {}
+        }
+    }
@@ -56,4 +56,42 @@ class DeleteProductCommand(BaseModel):
                 "product_id": 1
             }
         }
-    }
\ No newline at end of file
+    }
+
+
+class EnableStockShardingCommand(BaseModel):
+    product_id: int = Field(..., gt=0)
+    shards: Optional[int] = Field(None, ge=2, le=256)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "product_id": 1,
+                "shards": 16
+            }
+        }
+    }
+
+
+class DisableStockShardingCommand(BaseModel):
+    product_id: int = Field(..., gt=0)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "product_id": 1
+            }
+        }
+    }
+
+
+class ImportProductsCommand(BaseModel):
+    format: str = Field(..., pattern="^(csv|ndjson)$")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "format": "csv"
+            }
+        }
+    }
@@ -1,13 +1,19 @@
-from .product_handlers import CreateProductHandler, UpdateProductHandler, DeleteProductHandler
+from .product_handlers import (
+    CreateProductHandler, UpdateProductHandler, DeleteProductHandler,
+    EnableStockShardingHandler, DisableStockShardingHandler
+)
 from .user_handlers import CreateUserHandler, UpdateUserHandler, DeleteUserHandler
 from .order_handlers import (
     CreateOrderHandler, UpdateOrderHandler, CancelOrderHandler,
-    AddOrderItemHandler, UpdateOrderItemHandler, RemoveOrderItemHandler
+    AddOrderItemHandler, UpdateOrderItemHandler, RemoveOrderItemHandler,
+    BulkUpdateOrderStatusHandler, RebuildOrderSummariesHandler
 )
 
 __all__ = [
     "CreateProductHandler", "UpdateProductHandler", "DeleteProductHandler",
+    "EnableStockShardingHandler", "DisableStockShardingHandler",
     "CreateUserHandler", "UpdateUserHandler", "DeleteUserHandler",
     "CreateOrderHandler", "UpdateOrderHandler", "CancelOrderHandler",
-    "AddOrderItemHandler", "UpdateOrderItemHandler", "RemoveOrderItemHandler"
+    "AddOrderItemHandler", "UpdateOrderItemHandler", "RemoveOrderItemHandler",
+    "BulkUpdateOrderStatusHandler", "RebuildOrderSummariesHandler"
 ]
\ No newline at end of file
@@ -0,0 +1,74 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.application.queries.analytics_queries import (
+    GetDailyRevenueQuery, GetProductSalesQuery,
+    DailyRevenueDTO, ProductSalesDTO, CategoryRevenueDTO, OrderStatusCountDTO
+)
+from src.core.config import settings
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.repositories.analytics_repository import AnalyticsRepository
+from typing import List
+
+# Rollups only change when the views are refreshed, so results are shared
+# by every request in this worker until the TTL expires
+analytics_cache = TTLCache(ttl=settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+
+class GetDailyRevenueHandler:
+    def __init__(self, db: AsyncSession):
+        self.analytics_repository = AnalyticsRepository(db)
+
+    async def handle(self, query: GetDailyRevenueQuery) -> List[DailyRevenueDTO]:
+        rows = await analytics_cache.get_or_load(
+            ("revenue_per_day", query.date_from, query.date_to),
+            lambda: self.analytics_repository.revenue_per_day(query.date_from, query.date_to),
+        )
+        return [DailyRevenueDTO(**row) for row in rows]
+
+
+class GetProductSalesHandler:
+    def __init__(self, db: AsyncSession):
+        self.analytics_repository = AnalyticsRepository(db)
+
+    async def handle(self, query: GetProductSalesQuery) -> List[ProductSalesDTO]:
+        rows = await analytics_cache.get_or_load(
+            ("units_per_product", query.limit),
+            lambda: self.analytics_repository.units_per_product(query.limit),
+        )
+        return [ProductSalesDTO(**row) for row in rows]
+
+
+class GetCategoryRevenueHandler:
+    def __init__(self, db: AsyncSession):
+        self.analytics_repository = AnalyticsRepository(db)
+
+    async def handle(self) -> List[CategoryRevenueDTO]:
+        rows = await analytics_cache.get_or_load(
+            ("revenue_per_category",),
+            self.analytics_repository.revenue_per_category,
+        )
+        return [CategoryRevenueDTO(**row) for row in rows]
+
+
+class GetOrderStatusCountsHandler:
+    def __init__(self, db: AsyncSession):
+        self.analytics_repository = AnalyticsRepository(db)
+
+    async def handle(self) -> List[OrderStatusCountDTO]:
+        rows = await analytics_cache.get_or_load(
+            ("orders_per_status",),
+            self.analytics_repository.orders_per_status,
+        )
+        return [OrderStatusCountDTO(**row) for row in rows]
+
+
+class RefreshSalesAnalyticsHandler:
+    def __init__(self, db: AsyncSession):
+        self.analytics_repository = AnalyticsRepository(db)
+        self.db = db
+
+    async def handle(self) -> bool:
+        refreshed = await self.analytics_repository.refresh()
+        await self.db.commit()
+        if refreshed:
+            analytics_cache.clear()
+        return refreshed
@@ -0,0 +1,114 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.application.commands.category_commands import (
+    CreateCategoryCommand, UpdateCategoryCommand, DeleteCategoryCommand
+)
+from src.application.queries.category_queries import CategoryDTO, CategoryTreeNodeDTO, GetCategoryQuery
+from src.domain.exceptions import CategoryNotFoundError
+from src.infrastructure.category_tree import category_tree, path_ids
+from src.infrastructure.repositories.category_repository import CategoryRepository
+from src.infrastructure.result_cache import product_lists_changed
+from src.infrastructure.unit_of_work import UnitOfWork
+from src.domain.models.category import Category
+from typing import List, Optional
+
+
+async def _get_parent(uow: UnitOfWork, parent_id: Optional[int]) -> Optional[Category]:
+    if parent_id is None:
+        return None
+    parent = await uow.categories.get_by_id(parent_id)
+    if not parent:
+        raise ValueError(f"Parent category with id {parent_id} not found")
+    return parent
+
+
+async def _check_slug(uow: UnitOfWork, slug: str):
+    if await uow.categories.get_by_slug(slug):
+        raise ValueError(f"Category with slug {slug} already exists")
+
+
+class CreateCategoryHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: CreateCategoryCommand) -> CategoryDTO:
+        async with self.uow:
+            await _check_slug(self.uow, command.slug)
+            parent = await _get_parent(self.uow, command.parent_id)
+            category = await self.uow.categories.create(command.model_dump(), parent)
+            await self.uow.commit()
+        await RebuildCategoryTreeHandler(self.uow.session).handle()
+        return CategoryDTO.model_validate(category)
+
+
+class UpdateCategoryHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, category_id: int, command: UpdateCategoryCommand) -> CategoryDTO:
+        update_data = command.model_dump(exclude_unset=True)
+        moving = "parent_id" in update_data
+        parent_id = update_data.pop("parent_id", None)
+        moved_from, moved_to = [], []
+        async with self.uow:
+            category = await self.uow.categories.get_by_id(category_id)
+            if not category:
+                raise CategoryNotFoundError(category_id)
+            if "slug" in update_data and update_data["slug"] != category.slug:
+                await _check_slug(self.uow, update_data["slug"])
+            if moving and parent_id != category.parent_id:
+                parent = await _get_parent(self.uow, parent_id)
+                if parent and parent.path.startswith(category.path):
+                    raise ValueError("A category cannot be moved under itself or one of its subcategories")
+                moved_from = path_ids(category.path)
+                await self.uow.categories.move(category, parent)
+                moved_to = path_ids(category.path)
+            category = await self.uow.categories.update(category_id, update_data)
+            await self.uow.commit()
+        await RebuildCategoryTreeHandler(self.uow.session).handle()
+        if moved_from:
+            # Pages that include subcategories change for the old and the new ancestors
+            await product_lists_changed(*moved_from, *moved_to)
+        return CategoryDTO.model_validate(category)
+
+
+class DeleteCategoryHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: DeleteCategoryCommand) -> bool:
+        async with self.uow:
+            if not await self.uow.categories.get_by_id(command.category_id):
+                raise CategoryNotFoundError(command.category_id)
+            if await self.uow.categories.has_children(command.category_id):
+                raise ValueError(f"Category with id {command.category_id} has subcategories")
+            if await self.uow.categories.has_products(command.category_id):
+                raise ValueError(f"Category with id {command.category_id} has products")
+            success = await self.uow.categories.delete(command.category_id)
+            await self.uow.commit()
+        await RebuildCategoryTreeHandler(self.uow.session).handle()
+        return success
+
+
+class GetCategoryHandler:
+    def __init__(self, db: AsyncSession):
+        self.category_repository = CategoryRepository(db)
+
+    async def handle(self, query: GetCategoryQuery) -> CategoryDTO:
+        category = await self.category_repository.get_by_id(query.category_id)
+        if not category:
+            raise CategoryNotFoundError(query.category_id)
+        return CategoryDTO.model_validate(category)
+
+
+class GetCategoryTreeHandler:
+    def handle(self) -> List[CategoryTreeNodeDTO]:
+        return [CategoryTreeNodeDTO(**node) for node in category_tree.tree()]
+
+
+class RebuildCategoryTreeHandler:
+    def __init__(self, db: AsyncSession):
+        self.category_repository = CategoryRepository(db)
+
+    async def handle(self) -> int:
+        category_tree.rebuild(await self.category_repository.get_tree_nodes())
+        return len(category_tree)
@@ -1,148 +1,358 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.application.commands.order_commands import (
     CreateOrderCommand, UpdateOrderCommand, CancelOrderCommand,
-    AddOrderItemCommand, UpdateOrderItemCommand, RemoveOrderItemCommand
+    AddOrderItemCommand, UpdateOrderItemCommand, RemoveOrderItemCommand,
+    BulkUpdateOrderStatusCommand, RebuildOrderSummariesCommand
+)
+from src.application.queries.order_queries import (
+    OrderDTO, OrderVersionDTO, BulkOrderStatusResultDTO, OrderStatusChangeDTO,
+    GetOrderQuery, GetOrdersQuery, GetUserOrdersQuery
 )
-from src.application.queries.order_queries import OrderDTO, GetOrderQuery, GetOrdersQuery, GetUserOrdersQuery
 from src.infrastructure.repositories.order_repository import OrderRepository
-from src.domain.models.order import Order, OrderItem
+from src.infrastructure.repositories.order_summary_repository import OrderSummaryRepository
+from src.infrastructure.unit_of_work import UnitOfWork
+from src.domain.events import OrderCancelled, OrderCreated
+from src.domain.exceptions import InvalidStatusTransitionError
+from src.domain.models.order import (
+    ORDER_STATUS_TRANSITIONS, Order, OrderStatus, statuses_allowed_to_become
+)
+from src.domain.pricing import build_cart_lines, to_cents
+from src.application.handlers.pricing_handlers import pricing_engine
 from typing import List
-from decimal import Decimal
 
 
-class CreateOrderHandler:
-    def __init__(self, db: Session):
-        self.order_repository = OrderRepository(db)
+def _stock_items(items) -> List[dict]:
+    return [{'product_id': item.product_id, 'quantity': item.quantity} for item in items]
 
-    def handle(self, command: CreateOrderCommand) -> OrderDTO:
-        # Calculate totals
-        subtotal = sum(item['quantity'] * item['unit_price'] for item in command.items)
-        tax_amount = subtotal * Decimal('0.08')  # 8% tax
-        shipping_cost = Decimal('10.00')  # Fixed shipping cost
-        total_amount = subtotal + tax_amount + shipping_cost
-
-        order_data = {
-            'user_id': command.user_id,
-            'payment_method': command.payment_method,
-            'subtotal': float(subtotal),
-            'tax_amount': float(tax_amount),
-            'shipping_cost': float(shipping_cost),
-            'total_amount': float(total_amount),
-            'shipping_address': command.shipping_address,
-            'billing_address': command.billing_address,
-            'notes': command.notes
-        }
 
-        order = self.order_repository.create(order_data)
+async def _on_status_change(uow: UnitOfWork, order: Order, status: str) -> None:
+    # Checked before any stock moves; the bulk path applies the same table in SQL
+    current = OrderStatus(order.status)
+    status = OrderStatus(status)
+    if status == current:
+        return
+    if status not in ORDER_STATUS_TRANSITIONS[current]:
+        raise InvalidStatusTransitionError(order.id, current.value, status.value)
+    # Cancelled orders hold no stock
+    if status == OrderStatus.CANCELLED:
+        await uow.stock.release(_stock_items(order.items))
+        await uow.outbox.add(OrderCancelled(
+            order_id=order.id,
+            user_id=order.user_id,
+            previous_status=current.value
+        ))
 
-        # Add order items
-        for item in command.items:
-            item_data = {
+
+class CreateOrderHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: CreateOrderCommand) -> OrderDTO:
+        unit_cents = to_cents([item['unit_price'] for item in command.items]).tolist()
+        items_data = [
+            {
                 'product_id': item['product_id'],
                 'quantity': item['quantity'],
                 'unit_price': item['unit_price'],
-                'total_price': float(item['quantity'] * item['unit_price'])
+                'total_price': item['quantity'] * cents / 100
             }
-            self.order_repository.add_item(order.id, item_data)
+            for item, cents in zip(command.items, unit_cents)
+        ]
+
+        async with self.uow:
+            # Fails the whole order before anything is written if an item is short
+            await self.uow.stock.reserve(command.items)
+            # Category promotions need the catalog category; prices are the ones ordered at
+            catalog = await self.uow.products.get_pricing([item['product_id'] for item in command.items])
+            lines = build_cart_lines([[
+                (item['product_id'], catalog.get(item['product_id'], (None, -1))[1], item['quantity'], cents)
+                for item, cents in zip(command.items, unit_cents)
+            ]])
+            quote = pricing_engine.price(lines, 1)
+            order = await self.uow.orders.create({
+                'user_id': command.user_id,
+                'payment_method': command.payment_method,
+                'subtotal': int(quote.subtotal[0]) / 100,
+                'discount_amount': int(quote.discount[0]) / 100,
+                'tax_amount': int(quote.tax[0]) / 100,
+                'shipping_cost': int(quote.shipping[0]) / 100,
+                'total_amount': int(quote.total[0]) / 100,
+                'shipping_address': command.shipping_address,
+                'billing_address': command.billing_address,
+                'notes': command.notes
+            })
+            await self.uow.orders.add_items(order, items_data)
+            await self.uow.order_summaries.upsert(order)
+            await self.uow.outbox.add(OrderCreated(
+                order_id=order.id,
+                order_number=order.order_number,
+                user_id=order.user_id,
+                total_amount=order.total_amount,
+                items=[
+                    {'product_id': item.product_id, 'quantity': item.quantity, 'unit_price': item.unit_price}
+                    for item in order.items
+                ]
+            ))
+            await self.uow.commit()
 
-        # Refresh order with items
-        order = self.order_repository.get_by_id(order.id)
         return OrderDTO.model_validate(order)
 
 
 class UpdateOrderHandler:
-    def __init__(self, db: Session):
-        self.order_repository = OrderRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, order_id: int, command: UpdateOrderCommand) -> OrderDTO:
+    async def handle(self, order_id: int, command: UpdateOrderCommand) -> OrderDTO:
         update_data = command.model_dump(exclude_unset=True)
-        order = self.order_repository.update(order_id, update_data)
-        if not order:
-            raise ValueError(f"Order with id {order_id} not found")
+        async with self.uow:
+            if 'status' in update_data:
+                order = await self.uow.orders.get_by_id(order_id)
+                if not order:
+                    raise ValueError(f"Order with id {order_id} not found")
+                await _on_status_change(self.uow, order, update_data['status'])
+            order = await self.uow.orders.update(order_id, update_data)
+            if not order:
+                raise ValueError(f"Order with id {order_id} not found")
+            await self.uow.flush()
+            await self.uow.order_summaries.upsert(order)
+            await self.uow.commit()
         return OrderDTO.model_validate(order)
 
 
 class CancelOrderHandler:
-    def __init__(self, db: Session):
-        self.order_repository = OrderRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: CancelOrderCommand) -> OrderDTO:
-        order = self.order_repository.update_status(command.order_id, 'cancelled')
-        if not order:
-            raise ValueError(f"Order with id {command.order_id} not found")
+    async def handle(self, command: CancelOrderCommand) -> OrderDTO:
+        async with self.uow:
+            order = await self.uow.orders.get_by_id(command.order_id)
+            if not order:
+                raise ValueError(f"Order with id {command.order_id} not found")
+            await _on_status_change(self.uow, order, OrderStatus.CANCELLED)
+            order = await self.uow.orders.update_status(order.id, 'cancelled')
+            await self.uow.flush()
+            await self.uow.order_summaries.upsert(order)
+            await self.uow.commit()
         return OrderDTO.model_validate(order)
 
 
 class AddOrderItemHandler:
-    def __init__(self, db: Session):
-        self.order_repository = OrderRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: AddOrderItemCommand) -> OrderItem:
+    async def handle(self, command: AddOrderItemCommand) -> OrderDTO:
         item_data = {
             'product_id': command.product_id,
             'quantity': command.quantity,
             'unit_price': command.unit_price,
             'total_price': float(command.quantity * command.unit_price)
         }
-        item = self.order_repository.add_item(command.order_id, item_data)
-        return item
+        async with self.uow:
+            order = await self.uow.orders.get_by_id(command.order_id)
+            if not order:
+                raise ValueError(f"Order with id {command.order_id} not found")
+            if order.status != OrderStatus.CANCELLED:
+                await self.uow.stock.reserve([item_data])
+            await self.uow.orders.add_item(order, item_data)
+            await self.uow.flush()
+            await self.uow.orders.touch(order.id, order.created_at)
+            order = await self.uow.orders.get_by_id(order.id, order.created_at)
+            await self.uow.order_summaries.upsert(order)
+            await self.uow.commit()
+        return OrderDTO.model_validate(order)
 
 
 class UpdateOrderItemHandler:
-    def __init__(self, db: Session):
-        self.order_repository = OrderRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: UpdateOrderItemCommand) -> OrderItem:
-        update_data = command.model_dump(exclude_unset=True)
-        item = self.order_repository.update_item(command.item_id, update_data)
-        if not item:
-            raise ValueError(f"Order item with id {command.item_id} not found")
-        return item
+    async def handle(self, command: UpdateOrderItemCommand) -> OrderDTO:
+        update_data = command.model_dump(exclude_unset=True, exclude={'item_id'})
+        async with self.uow:
+            item = await self.uow.orders.get_item(command.item_id)
+            if not item:
+                raise ValueError(f"Order item with id {command.item_id} not found")
+            old_quantity = item.quantity
+            await self.uow.orders.update_item(item.id, update_data)
+            item.total_price = float(item.quantity * item.unit_price)
+            await self.uow.flush()
+            await self.uow.orders.touch(item.order_id, item.created_at)
+            order = await self.uow.orders.get_by_id(item.order_id, item.created_at)
+            delta = item.quantity - old_quantity
+            if delta and order.status != OrderStatus.CANCELLED:
+                stock_items = [{'product_id': item.product_id, 'quantity': abs(delta)}]
+                if delta > 0:
+                    await self.uow.stock.reserve(stock_items)
+                else:
+                    await self.uow.stock.release(stock_items)
+            await self.uow.order_summaries.upsert(order)
+            await self.uow.commit()
+        return OrderDTO.model_validate(order)
 
 
 class RemoveOrderItemHandler:
-    def __init__(self, db: Session):
-        self.order_repository = OrderRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: RemoveOrderItemCommand) -> bool:
+        async with self.uow:
+            item = await self.uow.orders.get_item(command.item_id)
+            if not item:
+                raise ValueError(f"Order item with id {command.item_id} not found")
+            await self.uow.orders.delete_item(item.id)
+            await self.uow.flush()
+            await self.uow.orders.touch(item.order_id, item.created_at)
+            order = await self.uow.orders.get_by_id(item.order_id, item.created_at)
+            if order.status != OrderStatus.CANCELLED:
+                await self.uow.stock.release(_stock_items([item]))
+            await self.uow.order_summaries.upsert(order)
+            await self.uow.commit()
+        return True
+
+
+class BulkUpdateOrderStatusHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: BulkUpdateOrderStatusCommand) -> BulkOrderStatusResultDTO:
+        if command.order_ids is None and command.current_status is None:
+            raise ValueError("Either order_ids or current_status must be given")
+        status = OrderStatus(command.status)
+        async with self.uow:
+            changed = await self.uow.orders.bulk_update_status(
+                status,
+                statuses_allowed_to_become(status),
+                order_ids=command.order_ids,
+                current_status=OrderStatus(command.current_status) if command.current_status else None,
+                created_before=command.created_before
+            )
+            changed_ids = [row.id for row in changed]
+            if changed_ids:
+                if status == OrderStatus.CANCELLED:
+                    await self.uow.stock.release(await self.uow.orders.get_item_quantities(changed_ids))
+                    await self.uow.outbox.add(*[
+                        OrderCancelled(
+                            order_id=row.id,
+                            user_id=row.user_id,
+                            previous_status=OrderStatus(row.previous_status).value
+                        )
+                        for row in changed
+                    ])
+                await self.uow.order_summaries.update_status(changed_ids, status)
 
-    def handle(self, command: RemoveOrderItemCommand) -> bool:
-        success = self.order_repository.delete_item(command.item_id)
-        if not success:
-            raise ValueError(f"Order item with id {command.item_id} not found")
-        return success
+            results = [
+                OrderStatusChangeDTO(
+                    order_id=row.id,
+                    result="updated",
+                    previous_status=OrderStatus(row.previous_status).value
+                )
+                for row in changed
+            ]
+            if command.order_ids is not None:
+                skipped = sorted(set(command.order_ids) - set(changed_ids))
+                current = await self.uow.orders.get_statuses(skipped) if skipped else {}
+                for order_id in skipped:
+                    if order_id in current:
+                        results.append(OrderStatusChangeDTO(
+                            order_id=order_id,
+                            result="invalid_transition",
+                            previous_status=OrderStatus(current[order_id]).value
+                        ))
+                    else:
+                        results.append(OrderStatusChangeDTO(order_id=order_id, result="not_found"))
+            await self.uow.commit()
+        return BulkOrderStatusResultDTO(status=status.value, updated=len(changed_ids), results=results)
+
+
+class RebuildOrderSummariesHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: RebuildOrderSummariesCommand) -> int:
+        async with self.uow:
+            count = await self.uow.order_summaries.rebuild()
+            await self.uow.commit()
+        return count
 
 
 class GetOrderHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.order_repository = OrderRepository(db)
+        self.order_summary_repository = OrderSummaryRepository(db)
 
-    def handle(self, query: GetOrderQuery) -> OrderDTO:
-        order = self.order_repository.get_by_id(query.order_id)
+    async def handle(self, query: GetOrderQuery) -> OrderDTO:
+        # The summary's created_at confines the read to one partition; orders
+        # without a summary yet (before a rebuild) are looked up in all of them
+        created_at = await self.order_summary_repository.get_created_at(query.order_id)
+        order = await self.order_repository.get_by_id(query.order_id, created_at)
         if not order:
             raise ValueError(f"Order with id {query.order_id} not found")
         return OrderDTO.model_validate(order)
 
 
-class GetOrdersHandler:
-    def __init__(self, db: Session):
+class GetOrderVersionHandler:
+    def __init__(self, db: AsyncSession):
         self.order_repository = OrderRepository(db)
+        self.order_summary_repository = OrderSummaryRepository(db)
 
-    def handle(self, query: GetOrdersQuery) -> List[OrderDTO]:
-        orders = self.order_repository.get_all(
-            skip=query.skip,
-            limit=query.limit,
-            status=query.status
+    async def handle(self, query: GetOrderQuery) -> OrderVersionDTO:
+        # The summary is written in the same transaction as the order and
+        # carries the same timestamps; orders without one are read directly
+        version = (
+            await self.order_summary_repository.get_by_id(query.order_id)
+            or await self.order_repository.get_version(query.order_id)
         )
+        if not version:
+            raise ValueError(f"Order with id {query.order_id} not found")
+        return OrderVersionDTO(id=query.order_id, created_at=version.created_at, updated_at=version.updated_at)
+
+
+class GetOrdersHandler:
+    def __init__(self, db: AsyncSession):
+        self.order_repository = OrderRepository(db)
+        self.order_summary_repository = OrderSummaryRepository(db)
+
+    async def handle(self, query: GetOrdersQuery) -> List[OrderDTO]:
+        if query.created_from or query.created_to:
+            # A creation time range prunes the monthly partitions of orders
+            orders = await self.order_repository.get_all(
+                skip=query.skip,
+                limit=query.limit,
+                status=query.status,
+                cursor=query.cursor,
+                created_from=query.created_from,
+                created_to=query.created_to
+            )
+        else:
+            orders = await self.order_summary_repository.get_all(
+                skip=query.skip,
+                limit=query.limit,
+                status=query.status,
+                cursor=query.cursor
+            )
         return [OrderDTO.model_validate(order) for order in orders]
 
 
 class GetUserOrdersHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.order_repository = OrderRepository(db)
+        self.order_summary_repository = OrderSummaryRepository(db)
 
-    def handle(self, query: GetUserOrdersQuery) -> List[OrderDTO]:
-        orders = self.order_repository.get_by_user_id(
-            query.user_id,
-            skip=query.skip,
-            limit=query.limit
-        )
-        return [OrderDTO.model_validate(order) for order in orders]
\ No newline at end of file
+    async def handle(self, query: GetUserOrdersQuery) -> List[OrderDTO]:
+        if query.created_from or query.created_to:
+            orders = await self.order_repository.get_by_user_id(
+                query.user_id,
+                skip=query.skip,
+                limit=query.limit,
+                cursor=query.cursor,
+                created_from=query.created_from,
+                created_to=query.created_to
+            )
+        else:
+            orders = await self.order_summary_repository.get_by_user_id(
+                query.user_id,
+                skip=query.skip,
+                limit=query.limit,
+                cursor=query.cursor
+            )
+        return [OrderDTO.model_validate(order) for order in orders]
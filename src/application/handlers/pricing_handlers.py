@@ -0,0 +1,45 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.application.queries.pricing_queries import QuoteCartsQuery, CartQuoteDTO
+from src.core.config import settings
+from src.domain.pricing import PricingEngine, build_cart_lines, to_cents
+from src.infrastructure.repositories.product_repository import ProductRepository
+from typing import List
+
+# Rules come from settings, so one engine serves every request in this worker
+pricing_engine = PricingEngine.from_settings(settings)
+
+
+class QuoteCartsHandler:
+    def __init__(self, db: AsyncSession):
+        self.product_repository = ProductRepository(db)
+
+    async def handle(self, query: QuoteCartsQuery) -> List[CartQuoteDTO]:
+        product_ids = {item.product_id for cart in query.carts for item in cart.items}
+        catalog = await self.product_repository.get_pricing(list(product_ids))
+        missing = sorted(product_ids - catalog.keys())
+        if missing:
+            raise ValueError(f"Products not found: {missing}")
+
+        prices = dict(zip(catalog, to_cents([price for price, _ in catalog.values()]).tolist()))
+        lines = build_cart_lines([
+            [
+                (item.product_id, catalog[item.product_id][1], item.quantity, prices[item.product_id])
+                for item in cart.items
+            ]
+            for cart in query.carts
+        ])
+        quotes = pricing_engine.price(lines, len(query.carts))
+        return [
+            CartQuoteDTO(
+                subtotal=subtotal / 100,
+                discount=discount / 100,
+                tax_amount=tax / 100,
+                shipping_cost=shipping / 100,
+                total_amount=total / 100,
+                promotions=promotions,
+            )
+            for subtotal, discount, tax, shipping, total, promotions in zip(
+                quotes.subtotal.tolist(), quotes.discount.tolist(), quotes.tax.tolist(),
+                quotes.shipping.tolist(), quotes.total.tolist(), quotes.promotions
+            )
+        ]
@@ -1,78 +1,416 @@
-from sqlalchemy.orm import Session
-from src.application.commands.product_commands import CreateProductCommand, UpdateProductCommand, DeleteProductCommand
-from src.application.queries.product_queries import ProductDTO, GetProductQuery, GetProductsQuery, SearchProductsQuery
+import os
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.application.commands.product_commands import (
+    CreateProductCommand, UpdateProductCommand, DeleteProductCommand,
+    EnableStockShardingCommand, DisableStockShardingCommand, ImportProductsCommand
+)
+from src.application.queries.product_queries import (
+    ProductDTO, ProductStockDTO, ProductSuggestionDTO, GetProductQuery, GetProductBySkuQuery,
+    GetProductsQuery, GetProductsByIdsQuery, SearchProductsQuery, AutocompleteProductsQuery, GetProductStockQuery,
+    ExportProductsQuery, BrowseProductsQuery, ProductBatchDTO, ProductImportResultDTO,
+    ProductBrowseDTO, ProductFacetsDTO, CategoryFacetDTO, PriceRangeFacetDTO
+)
+from src.core.config import settings
+from src.domain.events import ProductUpdated
+from src.infrastructure.autocomplete import autocomplete_index
+from src.infrastructure.cache import MISSING
+from src.infrastructure.category_tree import category_tree
+from src.infrastructure.entity_cache import can_fill_cache, can_read_cache, product_cache, invalidate_products
+from src.infrastructure.exports import encode_rows, gzip_chunks
+from src.infrastructure.facets import facet_index
+from src.infrastructure.imports import (
+    IMPORT_COLUMNS, PARSE_ERROR_COLUMN, limit_size, ndjson_to_csv, split_csv_header
+)
+from src.infrastructure.result_cache import make_key, product_list_scope, product_lists_changed, result_cache
+from src.infrastructure.repositories.analytics_repository import AnalyticsRepository
 from src.infrastructure.repositories.product_repository import ProductRepository
+from src.infrastructure.repositories.stock_repository import StockRepository
+from src.infrastructure.unit_of_work import UnitOfWork
 from src.domain.models.product import Product
-from typing import List
-from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, List, Optional
+from datetime import datetime, timezone
+
+
+def _index_product(product: Product) -> None:
+    # Only this worker's indexes see the change; the others catch up on
+    # their next rebuild
+    facet_index.mark_stale([product.id])
+    if product.is_active:
+        autocomplete_index.upsert(product.id, product.name, product.sku)
+    else:
+        autocomplete_index.remove(product.id)
+
+
+async def _cached_product_page(
+    db: AsyncSession,
+    namespace: str,
+    category_id: Optional[int],
+    params: dict,
+    load: Callable[[], Awaitable[list]]
+) -> List[ProductDTO]:
+    # Same freshness rules as the entity caches: read-your-writes clients
+    # skip the cache, and lagging replicas must not fill a bumped version
+    if not can_read_cache(db):
+        return [ProductDTO.model_validate(product) for product in await load()]
+    version = await result_cache.get_version(product_list_scope(category_id))
+    key = make_key(namespace, version, params)
+
+    async def load_rows():
+        return [ProductDTO.model_validate(product).model_dump(mode="json") for product in await load()]
+
+    if can_fill_cache(db):
+        rows = await result_cache.get_or_load(key, load_rows)
+    else:
+        rows = await result_cache.get(key)
+        if rows is MISSING:
+            rows = await load_rows()
+    return [ProductDTO(**row) for row in rows]
 
 
 class CreateProductHandler:
-    def __init__(self, db: Session):
-        self.product_repository = ProductRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: CreateProductCommand) -> ProductDTO:
+    async def handle(self, command: CreateProductCommand) -> ProductDTO:
         product_data = command.model_dump()
-        product = self.product_repository.create(product_data)
+        async with self.uow:
+            product = await self.uow.products.create(product_data)
+            await self.uow.commit()
+        await product_lists_changed(product.category_id)
+        _index_product(product)
         return ProductDTO.model_validate(product)
 
 
 class UpdateProductHandler:
-    def __init__(self, db: Session):
-        self.product_repository = ProductRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, product_id: int, command: UpdateProductCommand) -> ProductDTO:
+    async def handle(self, product_id: int, command: UpdateProductCommand) -> ProductDTO:
         update_data = command.model_dump(exclude_unset=True)
-        product = self.product_repository.update(product_id, update_data)
-        if not product:
-            raise ValueError(f"Product with id {product_id} not found")
+        async with self.uow:
+            product = await self.uow.products.get_by_id(product_id)
+            if not product:
+                raise ValueError(f"Product with id {product_id} not found")
+            previous_category_id = product.category_id
+            product = await self.uow.products.update(product_id, update_data)
+            await self.uow.outbox.add(ProductUpdated(product_id=product.id, changes=update_data))
+            await self.uow.commit()
+        invalidate_products([product.id])
+        await product_lists_changed(previous_category_id, product.category_id)
+        _index_product(product)
         return ProductDTO.model_validate(product)
 
 
 class DeleteProductHandler:
-    def __init__(self, db: Session):
-        self.product_repository = ProductRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: DeleteProductCommand) -> bool:
-        success = self.product_repository.delete(command.product_id)
-        if not success:
-            raise ValueError(f"Product with id {command.product_id} not found")
+    async def handle(self, command: DeleteProductCommand) -> bool:
+        async with self.uow:
+            product = await self.uow.products.get_by_id(command.product_id)
+            if not product:
+                raise ValueError(f"Product with id {command.product_id} not found")
+            category_id = product.category_id
+            success = await self.uow.products.delete(command.product_id)
+            await self.uow.commit()
+        invalidate_products([command.product_id])
+        await product_lists_changed(category_id)
+        autocomplete_index.remove(command.product_id)
+        facet_index.mark_stale([command.product_id])
         return success
 
 
+class ImportProductsHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: ImportProductsCommand, chunks: AsyncIterable[bytes]) -> ProductImportResultDTO:
+        """Upsert products by SKU from a streamed CSV or NDJSON file, all or nothing.
+
+        Chunks go straight into COPY, so memory use does not depend on the
+        file size; validation and the upsert are single set-based statements.
+        """
+        chunks = limit_size(chunks, settings.MAX_FILE_SIZE)
+        if command.format == "csv":
+            columns, rows = await split_csv_header(chunks)
+        else:
+            columns, rows = [*IMPORT_COLUMNS, PARSE_ERROR_COLUMN], ndjson_to_csv(chunks)
+
+        report = None
+        async with self.uow:
+            await self.uow.product_imports.copy_rows(rows, columns)
+            result = await self.uow.product_imports.upsert_staged()
+            if result["rejected"]:
+                os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+                report = os.path.join(settings.UPLOAD_DIR, f"product-import-{uuid4().hex}-rejected.csv")
+                await self.uow.product_imports.write_rejected(os.path.abspath(report))
+            await self.uow.commit()
+
+        product_cache.clear()
+        await product_lists_changed(*result.pop("category_ids"))
+        await RebuildAutocompleteIndexHandler(self.uow.session).handle()
+        await RebuildFacetIndexHandler(self.uow.session).handle()
+        return ProductImportResultDTO(**result, rejected_report=report)
+
+
+class EnableStockShardingHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: EnableStockShardingCommand) -> ProductStockDTO:
+        async with self.uow:
+            stock = await self.uow.stock.enable_sharding(
+                command.product_id, command.shards or settings.STOCK_SHARD_COUNT
+            )
+            if not stock:
+                raise ValueError(f"Product with id {command.product_id} not found")
+            await self.uow.commit()
+        return ProductStockDTO(**stock)
+
+
+class DisableStockShardingHandler:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def handle(self, command: DisableStockShardingCommand) -> ProductStockDTO:
+        async with self.uow:
+            stock = await self.uow.stock.disable_sharding(command.product_id)
+            if not stock:
+                raise ValueError(f"Product with id {command.product_id} not found")
+            await self.uow.commit()
+        return ProductStockDTO(**stock)
+
+
 class GetProductHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
+        self.db = db
         self.product_repository = ProductRepository(db)
 
-    def handle(self, query: GetProductQuery) -> ProductDTO:
-        product = self.product_repository.get_by_id(query.product_id)
+    async def handle(self, query: GetProductQuery) -> ProductDTO:
+        if can_read_cache(self.db):
+            cached = product_cache.get(("id", query.product_id))
+            if cached is not MISSING:
+                return cached
+        product = await self.product_repository.get_by_id(query.product_id)
         if not product:
             raise ValueError(f"Product with id {query.product_id} not found")
-        return ProductDTO.model_validate(product)
+        product_dto = ProductDTO.model_validate(product)
+        if can_fill_cache(self.db):
+            product_cache.set(("id", product_dto.id), product_dto)
+        return product_dto
+
+
+class GetProductBySkuHandler:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.product_repository = ProductRepository(db)
+
+    async def handle(self, query: GetProductBySkuQuery) -> ProductDTO:
+        if can_read_cache(self.db):
+            product_id = product_cache.get(("sku", query.sku))
+            if product_id is not MISSING:
+                cached = product_cache.get(("id", product_id))
+                # The SKU may have moved to another product since it was cached
+                if cached is not MISSING and cached.sku == query.sku:
+                    return cached
+        product = await self.product_repository.get_by_sku(query.sku)
+        if not product:
+            raise ValueError(f"Product with SKU {query.sku} not found")
+        product_dto = ProductDTO.model_validate(product)
+        if can_fill_cache(self.db):
+            product_cache.set(("id", product_dto.id), product_dto)
+            product_cache.set(("sku", product_dto.sku), product_dto.id)
+        return product_dto
+
+
+class GetProductsByIdsHandler:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.product_repository = ProductRepository(db)
+
+    async def handle(self, query: GetProductsByIdsQuery) -> ProductBatchDTO:
+        """Cached products come from the cache; the rest take a single query."""
+        ids = list(dict.fromkeys(query.ids))
+        found = {}
+        if can_read_cache(self.db):
+            for product_id in ids:
+                cached = product_cache.get(("id", product_id))
+                if cached is not MISSING:
+                    found[product_id] = cached
+        uncached = [product_id for product_id in ids if product_id not in found]
+        if uncached:
+            fill = can_fill_cache(self.db)
+            for product in await self.product_repository.get_many(uncached):
+                product_dto = ProductDTO.model_validate(product)
+                if fill:
+                    product_cache.set(("id", product_dto.id), product_dto)
+                found[product_dto.id] = product_dto
+        return ProductBatchDTO(
+            products=[found[product_id] for product_id in ids if product_id in found],
+            missing_ids=[product_id for product_id in ids if product_id not in found]
+        )
 
 
 class GetProductsHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
+        self.db = db
         self.product_repository = ProductRepository(db)
 
-    def handle(self, query: GetProductsQuery) -> List[ProductDTO]:
-        products = self.product_repository.get_all(
-            skip=query.skip,
-            limit=query.limit,
-            category_id=query.category_id,
-            is_active=query.is_active
+    async def handle(self, query: GetProductsQuery) -> List[ProductDTO]:
+        category_ids = None
+        if query.category_id:
+            # Resolved from the in-memory tree into a single ANY(...) filter
+            category_ids = (
+                category_tree.descendants(query.category_id) if query.include_descendants else [query.category_id]
+            )
+        return await _cached_product_page(
+            self.db,
+            "products:list",
+            query.category_id,
+            query.model_dump(),
+            lambda: self.product_repository.get_all(
+                skip=query.skip,
+                limit=query.limit,
+                category_ids=category_ids,
+                is_active=query.is_active,
+                cursor=query.cursor
+            )
         )
-        return [ProductDTO.model_validate(product) for product in products]
 
 
 class SearchProductsHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.product_repository = ProductRepository(db)
+
+    async def handle(self, query: SearchProductsQuery) -> List[ProductDTO]:
+        # Both search modes ignore case, so "Wireless" and "wireless " share an entry
+        params = {
+            **query.model_dump(),
+            'query': " ".join(query.query.casefold().split()),
+            'mode': settings.PRODUCT_SEARCH_MODE
+        }
+        return await _cached_product_page(
+            self.db,
+            "products:search",
+            query.category_id,
+            params,
+            lambda: self.product_repository.search(
+                query=query.query,
+                skip=query.skip,
+                limit=query.limit,
+                category_id=query.category_id,
+                is_active=query.is_active
+            )
+        )
+
+
+class BrowseProductsHandler:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.product_repository = ProductRepository(db)
+
+    async def handle(self, query: BrowseProductsQuery) -> ProductBrowseDTO:
+        """Filter and count in the facet index; only the requested page is loaded, by id."""
+        if query.min_price is not None and query.max_price is not None and query.min_price > query.max_price:
+            raise ValueError("min_price must not exceed max_price")
+        stale = facet_index.take_stale()
+        if stale:
+            try:
+                rows = await self.product_repository.get_facet_rows(stale)
+            except Exception:
+                facet_index.mark_stale(stale)
+                raise
+            facet_index.refresh(stale, rows)
+
+        result = facet_index.search(
+            category_ids=query.category_ids,
+            min_price=query.min_price,
+            max_price=query.max_price,
+            in_stock=query.in_stock,
+            is_active=query.is_active
+        )
+        page_ids = result.ids[query.skip:query.skip + query.limit].tolist()
+        products = []
+        if page_ids:
+            batch = await GetProductsByIdsHandler(self.db).handle(GetProductsByIdsQuery(ids=page_ids))
+            products = batch.products
+
+        bounds = facet_index.price_bounds.tolist()
+        return ProductBrowseDTO(
+            total=len(result.ids),
+            products=products,
+            facets=ProductFacetsDTO(
+                categories=[
+                    CategoryFacetDTO(category_id=category_id, count=count)
+                    for category_id, count in sorted(result.categories.items())
+                ],
+                price_ranges=[
+                    PriceRangeFacetDTO(
+                        min_price=low, max_price=bounds[i + 1] if i + 1 < len(bounds) else None, count=count
+                    )
+                    for i, (low, count) in enumerate(zip(bounds, result.price_buckets))
+                ],
+                in_stock=result.in_stock
+            )
+        )
+
+
+class RebuildFacetIndexHandler:
+    def __init__(self, db: AsyncSession):
         self.product_repository = ProductRepository(db)
 
-    def handle(self, query: SearchProductsQuery) -> List[ProductDTO]:
-        products = self.product_repository.search(
-            query=query.query,
-            skip=query.skip,
-            limit=query.limit
+    async def handle(self) -> int:
+        facet_index.rebuild(await self.product_repository.get_facet_rows())
+        return len(facet_index)
+
+
+class ExportProductsHandler:
+    def __init__(self, db: AsyncSession):
+        self.product_repository = ProductRepository(db)
+
+    def handle(self, query: ExportProductsQuery) -> AsyncIterator[bytes]:
+        """The export as encoded chunks; rows are read from the database as the chunks are consumed."""
+        updated_since = query.updated_since
+        if updated_since and updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=timezone.utc)
+        rows = self.product_repository.stream_for_export(
+            chunk_size=settings.PRODUCT_EXPORT_CHUNK_SIZE,
+            updated_since=updated_since,
+            category_id=query.category_id,
+            is_active=query.is_active
         )
-        return [ProductDTO.model_validate(product) for product in products]
\ No newline at end of file
+        chunks = encode_rows(rows, query.format)
+        return gzip_chunks(chunks) if query.gzip else chunks
+
+
+class AutocompleteProductsHandler:
+    def handle(self, query: AutocompleteProductsQuery) -> List[ProductSuggestionDTO]:
+        return [
+            ProductSuggestionDTO(id=suggestion.id, name=suggestion.name, sku=suggestion.sku)
+            for suggestion in autocomplete_index.lookup(query.prefix, query.limit)
+        ]
+
+
+class RebuildAutocompleteIndexHandler:
+    def __init__(self, db: AsyncSession):
+        self.product_repository = ProductRepository(db)
+        self.analytics_repository = AnalyticsRepository(db)
+
+    async def handle(self) -> int:
+        products = await self.product_repository.get_autocomplete_entries()
+        popularity = await self.analytics_repository.units_sold()
+        autocomplete_index.rebuild(products, popularity)
+        return len(autocomplete_index)
+
+
+class GetProductStockHandler:
+    def __init__(self, db: AsyncSession):
+        self.stock_repository = StockRepository(db)
+
+    async def handle(self, query: GetProductStockQuery) -> ProductStockDTO:
+        stock = await self.stock_repository.get_stock(query.product_id)
+        if not stock:
+            raise ValueError(f"Product with id {query.product_id} not found")
+        return ProductStockDTO(**stock)
@@ -1,7 +1,11 @@
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.application.commands.user_commands import CreateUserCommand, UpdateUserCommand, DeleteUserCommand
 from src.application.queries.user_queries import UserDTO, GetUserQuery, GetUsersQuery
+from src.infrastructure.cache import MISSING
+from src.infrastructure.entity_cache import can_fill_cache, can_read_cache, user_cache, invalidate_user
 from src.infrastructure.repositories.user_repository import UserRepository
+from src.infrastructure.unit_of_work import UnitOfWork
 from src.domain.models.user import User
 from src.core.auth import get_password_hash
 from typing import List
@@ -9,62 +13,78 @@ from datetime import datetime
 
 
 class CreateUserHandler:
-    def __init__(self, db: Session):
-        self.user_repository = UserRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: CreateUserCommand) -> UserDTO:
-        # Hash the password
-        hashed_password = get_password_hash(command.password)
-        user_data = command.model_copy()
-        user_data.password = hashed_password
-        user_dict = user_data.model_dump()
-        user = self.user_repository.create(user_dict)
+    async def handle(self, command: CreateUserCommand) -> UserDTO:
+        # Hash the password off the event loop, bcrypt is deliberately slow
+        hashed_password = await run_in_threadpool(get_password_hash, command.password)
+        user_dict = command.model_dump(exclude={"password"})
+        user_dict["hashed_password"] = hashed_password
+        async with self.uow:
+            user = await self.uow.users.create(user_dict)
+            await self.uow.commit()
         return UserDTO.model_validate(user)
 
 
 class UpdateUserHandler:
-    def __init__(self, db: Session):
-        self.user_repository = UserRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, user_id: int, command: UpdateUserCommand) -> UserDTO:
+    async def handle(self, user_id: int, command: UpdateUserCommand) -> UserDTO:
         update_data = command.model_dump(exclude_unset=True)
-        user = self.user_repository.update(user_id, update_data)
-        if not user:
-            raise ValueError(f"User with id {user_id} not found")
+        async with self.uow:
+            user = await self.uow.users.update(user_id, update_data)
+            if not user:
+                raise ValueError(f"User with id {user_id} not found")
+            await self.uow.commit()
+        invalidate_user(user_id)
         return UserDTO.model_validate(user)
 
 
 class DeleteUserHandler:
-    def __init__(self, db: Session):
-        self.user_repository = UserRepository(db)
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    def handle(self, command: DeleteUserCommand) -> bool:
-        success = self.user_repository.delete(command.user_id)
-        if not success:
-            raise ValueError(f"User with id {command.user_id} not found")
+    async def handle(self, command: DeleteUserCommand) -> bool:
+        async with self.uow:
+            success = await self.uow.users.delete(command.user_id)
+            if not success:
+                raise ValueError(f"User with id {command.user_id} not found")
+            await self.uow.commit()
+        invalidate_user(command.user_id)
         return success
 
 
 class GetUserHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
+        self.db = db
         self.user_repository = UserRepository(db)
 
-    def handle(self, query: GetUserQuery) -> UserDTO:
-        user = self.user_repository.get_by_id(query.user_id)
+    async def handle(self, query: GetUserQuery) -> UserDTO:
+        if can_read_cache(self.db):
+            cached = user_cache.get(query.user_id)
+            if cached is not MISSING:
+                return cached
+        user = await self.user_repository.get_by_id(query.user_id)
         if not user:
             raise ValueError(f"User with id {query.user_id} not found")
-        return UserDTO.model_validate(user)
+        user_dto = UserDTO.model_validate(user)
+        if can_fill_cache(self.db):
+            user_cache.set(user_dto.id, user_dto)
+        return user_dto
 
 
 class GetUsersHandler:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.user_repository = UserRepository(db)
 
-    def handle(self, query: GetUsersQuery) -> List[UserDTO]:
-        users = self.user_repository.get_all(
+    async def handle(self, query: GetUsersQuery) -> List[UserDTO]:
+        users = await self.user_repository.get_all(
             skip=query.skip,
             limit=query.limit,
             role=query.role,
-            is_active=query.is_active
+            is_active=query.is_active,
+            cursor=query.cursor
         )
         return [UserDTO.model_validate(user) for user in users]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date
+
+
+class GetDailyRevenueQuery(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "date_from": "2026-01-01",
+                "date_to": "2026-01-31"
+            }
+        }
+    }
+
+
+class GetProductSalesQuery(BaseModel):
+    limit: int = Field(100, ge=1, le=1000)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "limit": 20
+            }
+        }
+    }
+
+
+class DailyRevenueDTO(BaseModel):
+    day: date
+    order_count: int
+    revenue: float
+
+
+class ProductSalesDTO(BaseModel):
+    product_id: int
+    units: int
+    revenue: float
+
+
+class CategoryRevenueDTO(BaseModel):
+    category_id: int
+    units: int
+    revenue: float
+
+
+class OrderStatusCountDTO(BaseModel):
+    status: str
+    order_count: int
+    revenue: float
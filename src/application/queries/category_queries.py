@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+
+class GetCategoryQuery(BaseModel):
+    category_id: int = Field(..., gt=0)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "category_id": 1
+            }
+        }
+    }
+
+
+class CategoryDTO(BaseModel):
+    id: int
+    name: str
+    slug: str
+    description: Optional[str]
+    parent_id: Optional[int]
+    path: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class CategoryTreeNodeDTO(BaseModel):
+    id: int
+    name: str
+    slug: str
+    children: List["CategoryTreeNodeDTO"]
@@ -19,6 +19,10 @@ class GetOrdersQuery(BaseModel):
     skip: int = Field(0, ge=0)
     limit: int = Field(20, ge=1, le=100)
     status: Optional[str] = Field(None, pattern="^(pending|confirmed|processing|shipped|delivered|cancelled)$")
+    cursor: Optional[str] = None
+    # Creation time range [created_from, created_to)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
 
     model_config = {
         "json_schema_extra": {
@@ -35,6 +39,10 @@ class GetUserOrdersQuery(BaseModel):
     user_id: int = Field(..., gt=0)
     skip: int = Field(0, ge=0)
     limit: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = None
+    # Creation time range [created_from, created_to)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
 
     model_config = {
         "json_schema_extra": {
@@ -65,6 +73,7 @@ class OrderDTO(BaseModel):
     status: str
     payment_method: str
     subtotal: float
+    discount_amount: float
     tax_amount: float
     shipping_cost: float
     total_amount: float
@@ -76,4 +85,23 @@ class OrderDTO(BaseModel):
     items: List[OrderItemDTO]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class OrderVersionDTO(BaseModel):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class OrderStatusChangeDTO(BaseModel):
+    order_id: int
+    # updated | not_found | invalid_transition
+    result: str
+    previous_status: Optional[str] = None
+
+
+class BulkOrderStatusResultDTO(BaseModel):
+    status: str
+    updated: int
+    results: List[OrderStatusChangeDTO]
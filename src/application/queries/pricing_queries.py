@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class QuoteItem(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+
+class Cart(BaseModel):
+    items: List[QuoteItem] = Field(..., min_length=1)
+
+
+class QuoteCartsQuery(BaseModel):
+    carts: List[Cart] = Field(..., min_length=1, max_length=1000)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "carts": [
+                    {"items": [{"product_id": 1, "quantity": 2}, {"product_id": 3, "quantity": 1}]},
+                    {"items": [{"product_id": 2, "quantity": 4}]}
+                ]
+            }
+        }
+    }
+
+
+class CartQuoteDTO(BaseModel):
+    subtotal: float
+    discount: float
+    tax_amount: float
+    shipping_cost: float
+    total_amount: float
+    promotions: List[str]
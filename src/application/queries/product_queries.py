@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Dict, Optional, List
 from datetime import datetime
 
 
@@ -15,11 +15,26 @@ class GetProductQuery(BaseModel):
     }
 
 
+class GetProductBySkuQuery(BaseModel):
+    sku: str = Field(..., min_length=1, max_length=100)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "sku": "WH-1000XM5"
+            }
+        }
+    }
+
+
 class GetProductsQuery(BaseModel):
     skip: int = Field(0, ge=0)
     limit: int = Field(20, ge=1, le=100)
     category_id: Optional[int] = Field(None, gt=0)
+    # Also match products in the subcategories of category_id
+    include_descendants: bool = False
     is_active: bool = True
+    cursor: Optional[str] = None
 
     model_config = {
         "json_schema_extra": {
@@ -27,34 +42,122 @@ class GetProductsQuery(BaseModel):
                 "skip": 0,
                 "limit": 20,
                 "category_id": 1,
+                "include_descendants": True,
                 "is_active": True
             }
         }
     }
 
 
+class GetProductsByIdsQuery(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=100)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "ids": [42, 7, 19]
+            }
+        }
+    }
+
+
 class SearchProductsQuery(BaseModel):
     query: str = Field(..., min_length=1, max_length=100)
     skip: int = Field(0, ge=0)
     limit: int = Field(20, ge=1, le=100)
+    category_id: Optional[int] = Field(None, gt=0)
+    is_active: Optional[bool] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "query": "wireless headphones -refurbished",
+                "skip": 0,
+                "limit": 10,
+                "category_id": 1,
+                "is_active": True
+            }
+        }
+    }
+
+
+class BrowseProductsQuery(BaseModel):
+    category_ids: List[int] = Field(default_factory=list, max_length=50)
+    min_price: Optional[float] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+    in_stock: bool = False
+    is_active: Optional[bool] = True
+    skip: int = Field(0, ge=0)
+    limit: int = Field(20, ge=1, le=100)
 
     model_config = {
         "json_schema_extra": {
             "example": {
-                "query": "wireless",
+                "category_ids": [1, 2],
+                "min_price": 25,
+                "max_price": 100,
+                "in_stock": True,
+                "is_active": True,
                 "skip": 0,
+                "limit": 20
+            }
+        }
+    }
+
+
+class ExportProductsQuery(BaseModel):
+    format: str = Field("csv", pattern="^(csv|ndjson)$")
+    updated_since: Optional[datetime] = None
+    category_id: Optional[int] = Field(None, gt=0)
+    is_active: Optional[bool] = None
+    gzip: bool = False
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "format": "ndjson",
+                "updated_since": "2024-01-31T00:00:00Z",
+                "category_id": None,
+                "is_active": None,
+                "gzip": True
+            }
+        }
+    }
+
+
+class AutocompleteProductsQuery(BaseModel):
+    prefix: str = Field(..., min_length=1, max_length=100)
+    limit: int = Field(10, ge=1, le=50)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "prefix": "wirel",
                 "limit": 10
             }
         }
     }
 
 
+class GetProductStockQuery(BaseModel):
+    product_id: int = Field(..., gt=0)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "product_id": 1
+            }
+        }
+    }
+
+
 class ProductDTO(BaseModel):
     id: int
     name: str
     description: Optional[str]
     price: float
-    stock_quantity: int
+    # Includes the shards of sharded products
+    stock_quantity: int = Field(validation_alias=AliasChoices("available_stock", "stock_quantity"))
     sku: str
     is_active: bool
     category_id: int
@@ -62,4 +165,65 @@ class ProductDTO(BaseModel):
     updated_at: Optional[datetime]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ProductBatchDTO(BaseModel):
+    # In the order they were requested, without duplicates
+    products: List[ProductDTO]
+    missing_ids: List[int]
+
+
+class CategoryFacetDTO(BaseModel):
+    category_id: int
+    count: int
+
+
+class PriceRangeFacetDTO(BaseModel):
+    min_price: float
+    # None for the last, open-ended range
+    max_price: Optional[float]
+    count: int
+
+
+class ProductFacetsDTO(BaseModel):
+    # Each facet is counted under every filter except its own
+    categories: List[CategoryFacetDTO]
+    price_ranges: List[PriceRangeFacetDTO]
+    in_stock: int
+
+
+class ProductBrowseDTO(BaseModel):
+    total: int
+    products: List[ProductDTO]
+    facets: ProductFacetsDTO
+
+
+class ProductStockDTO(BaseModel):
+    product_id: int
+    sharded: bool
+    stock_quantity: int
+    shards: List[int]
+
+
+class ProductSuggestionDTO(BaseModel):
+    id: int
+    name: str
+    sku: str
+
+
+class RejectedProductRowDTO(BaseModel):
+    # Data row number in the file (NDJSON line, or CSV row after the header)
+    line: int
+    sku: Optional[str]
+    error: str
+
+
+class ProductImportResultDTO(BaseModel):
+    inserted: int
+    updated: int
+    rejected: int
+    rejected_reasons: Dict[str, int]
+    rejected_sample: List[RejectedProductRowDTO]
+    # File under UPLOAD_DIR listing every rejected row, if there were any
+    rejected_report: Optional[str] = None
@@ -20,6 +20,7 @@ class GetUsersQuery(BaseModel):
     limit: int = Field(20, ge=1, le=100)
     role: Optional[str] = Field(None, pattern="^(customer|admin|moderator)$")
     is_active: bool = True
+    cursor: Optional[str] = None
 
     model_config = {
         "json_schema_extra": {
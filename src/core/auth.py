@@ -3,7 +3,9 @@ from typing import Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.config import settings
 from src.domain.models.user import User
 
@@ -30,16 +32,16 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await run_in_threadpool(verify_password, password, user.hashed_password):
         return False
     return user
 
 
-def get_current_user(token: str, db: Session):
+async def get_current_user(token: str, db: AsyncSession):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -52,7 +54,7 @@ def get_current_user(token: str, db: Session):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
         raise credentials_exception
     return user
\ No newline at end of file
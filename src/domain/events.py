@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from pydantic import BaseModel
+from typing import Any, ClassVar, Dict, List, Optional
+
+
+class DomainEvent(BaseModel, ABC):
+    """Something that happened in a command; written to the outbox with the change."""
+
+    aggregate_type: ClassVar[str]
+
+    @property
+    def event_type(self) -> str:
+        return type(self).__name__
+
+    @property
+    @abstractmethod
+    def aggregate_id(self) -> int:
+        """Id of the ``aggregate_type`` row the event belongs to."""
+
+
+class OrderCreated(DomainEvent):
+    aggregate_type: ClassVar[str] = "order"
+
+    order_id: int
+    order_number: str
+    user_id: int
+    total_amount: float
+    items: List[Dict[str, Any]]
+
+    @property
+    def aggregate_id(self) -> int:
+        return self.order_id
+
+
+class OrderCancelled(DomainEvent):
+    aggregate_type: ClassVar[str] = "order"
+
+    order_id: int
+    user_id: int
+    previous_status: Optional[str] = None
+
+    @property
+    def aggregate_id(self) -> int:
+        return self.order_id
+
+
+class ProductUpdated(DomainEvent):
+    aggregate_type: ClassVar[str] = "product"
+
+    product_id: int
+    changes: Dict[str, Any]
+
+    @property
+    def aggregate_id(self) -> int:
+        return self.product_id
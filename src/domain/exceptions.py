@@ -0,0 +1,27 @@
+from typing import Iterable
+
+
+class InsufficientStockError(ValueError):
+    """Raised when an order asks for more units than are in stock."""
+
+    def __init__(self, product_ids: Iterable[int]):
+        self.product_ids = sorted(product_ids)
+        super().__init__(
+            "Insufficient stock for product(s): " + ", ".join(str(pid) for pid in self.product_ids)
+        )
+
+
+class CategoryNotFoundError(ValueError):
+    """Raised when a command refers to a category that does not exist."""
+
+    def __init__(self, category_id: int):
+        self.category_id = category_id
+        super().__init__(f"Category with id {category_id} not found")
+
+
+class InvalidStatusTransitionError(ValueError):
+    """Raised when an order is asked to move to a status its current one cannot reach."""
+
+    def __init__(self, order_id: int, current: str, requested: str):
+        self.order_id = order_id
+        super().__init__(f"Order {order_id} cannot move from {current} to {requested}")
@@ -1,6 +1,9 @@
 from .product import Product
+from .product_stock_shard import ProductStockShard
 from .user import User
 from .order import Order
+from .order_summary import OrderSummary
+from .outbox_event import OutboxEvent
 from .category import Category
 
-__all__ = ["Product", "User", "Order", "Category"]
\ No newline at end of file
+__all__ = ["Product", "ProductStockShard", "User", "Order", "OrderSummary", "OutboxEvent", "Category"]
\ No newline at end of file
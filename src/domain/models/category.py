@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.infrastructure.database import Base
@@ -6,12 +6,19 @@ from src.infrastructure.database import Base
 
 class Category(Base):
     __tablename__ = "categories"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Subtree lookups are prefix matches on the path
+        Index("ix_categories_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
     slug = Column(String(100), unique=True, nullable=False, index=True)
     description = Column(Text)
-    parent_id = Column(Integer, nullable=True)
+    parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
+    # Materialized path: ids from the root down to this category, e.g. "1/4/9/"
+    path = Column(Text, nullable=False, server_default="")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -19,4 +26,4 @@ class Category(Base):
     products = relationship("Product", back_populates="category")
 
     def __repr__(self):
-        return f"<Category(name='{self.name}', slug='{self.slug}')>"
\ No newline at end of file
+        return f"<Category(name='{self.name}', slug='{self.slug}')>"
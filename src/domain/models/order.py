@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, ForeignKeyConstraint, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.infrastructure.database import Base
@@ -14,6 +14,21 @@ class OrderStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses an order may move to from each status
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED, OrderStatus.PROCESSING, OrderStatus.CANCELLED},
+    OrderStatus.CONFIRMED: {OrderStatus.PROCESSING, OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.PROCESSING: {OrderStatus.SHIPPED, OrderStatus.CANCELLED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
+def statuses_allowed_to_become(status: OrderStatus) -> list:
+    return [source for source, targets in ORDER_STATUS_TRANSITIONS.items() if status in targets]
+
+
 class PaymentMethod(str, enum.Enum):
     CREDIT_CARD = "credit_card"
     PAYPAL = "paypal"
@@ -23,25 +38,36 @@ class PaymentMethod(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Monthly partitions are created by src.infrastructure.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    order_number = Column(String(50), unique=True, nullable=False, index=True)
+    # The partition key has to be part of the primary key (and of any unique
+    # constraint), so order_number is indexed but not unique
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_number = Column(String(50), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
     payment_method = Column(Enum(PaymentMethod), nullable=False)
     subtotal = Column(Float, nullable=False)
+    discount_amount = Column(Float, nullable=False, default=0, server_default="0")
     tax_amount = Column(Float, default=0)
     shipping_cost = Column(Float, default=0)
     total_amount = Column(Float, nullable=False)
     shipping_address = Column(Text, nullable=False)
     billing_address = Column(Text, nullable=False)
     notes = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="orders")
-    items = relationship("OrderItem", back_populates="order")
+    # Repositories load items explicitly; a lazy load here would be an N+1 query
+    items = relationship("OrderItem", back_populates="order", order_by="OrderItem.id", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Order(order_number='{self.order_number}', status='{self.status}')>"
@@ -49,13 +75,20 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        ForeignKeyConstraint(["order_id", "created_at"], ["orders.id", "orders.created_at"]),
+        Index("ix_order_items_order_id_created_at", "order_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Float, nullable=False)
     total_price = Column(Float, nullable=False)
+    # Copy of the order's created_at: items live in the same month partition
+    created_at = Column(DateTime(timezone=True), primary_key=True)
 
     # Relationships
     order = relationship("Order", back_populates="items")
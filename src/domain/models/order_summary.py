@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from src.infrastructure.database import Base
+
+
+class OrderSummary(Base):
+    """Denormalized read model of an order and its items.
+
+    Maintained by the order command handlers in the same transaction as
+    the write; order lists without a creation time range read only this
+    table.
+    """
+
+    __tablename__ = "order_summaries"
+    __table_args__ = (
+        Index("ix_order_summaries_created_at_id", "created_at", "id"),
+        Index("ix_order_summaries_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_order_summaries_status_created_at_id", "status", "created_at", "id"),
+    )
+
+    # Same value as orders.id
+    id = Column(Integer, primary_key=True)
+    order_number = Column(String(50), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)
+    payment_method = Column(String(20), nullable=False)
+    item_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    subtotal = Column(Float, nullable=False)
+    discount_amount = Column(Float, nullable=False, default=0)
+    tax_amount = Column(Float, nullable=False)
+    shipping_cost = Column(Float, nullable=False)
+    total_amount = Column(Float, nullable=False)
+    shipping_address = Column(Text, nullable=False)
+    billing_address = Column(Text, nullable=False)
+    notes = Column(Text)
+    items = Column(JSONB, nullable=False, default=list)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<OrderSummary(order_number='{self.order_number}', status='{self.status}')>"
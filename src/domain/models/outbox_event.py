@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from src.infrastructure.database import Base
+
+
+class OutboxEvent(Base):
+    """A domain event waiting to be relayed to the task queue.
+
+    Rows are inserted in the same transaction as the change they describe
+    and deleted by the relay once published.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event_type = Column(String(100), nullable=False)
+    aggregate_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type='{self.event_type}')>"
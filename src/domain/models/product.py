@@ -1,20 +1,42 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Computed, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import query_expression, relationship
+from sqlalchemy.sql import func, false
 from src.infrastructure.database import Base
 
+# Text search configuration of products.search_vector; queries have to use
+# the same one for the GIN index to apply
+SEARCH_CONFIG = "english"
+
 
 class Product(Base):
     __tablename__ = "products"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Incremental exports select rows changed since a point in time
+        Index("ix_products_modified_at", text("coalesce(updated_at, created_at)")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text)
     price = Column(Float, nullable=False)
     stock_quantity = Column(Integer, default=0)
+    # Flash-sale mode: stock is split across product_stock_shards rows
+    stock_sharded = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Sum of the shards, loaded by ProductRepository reads; None when not loaded
+    shard_stock = query_expression()
     sku = Column(String(100), unique=True, nullable=False, index=True)
     is_active = Column(Boolean, default=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    # Name matches rank above description matches
+    search_vector = Column(TSVECTOR, Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+        persisted=True
+    ))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -22,5 +44,10 @@ class Product(Base):
     category = relationship("Category", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
 
+    @property
+    def available_stock(self) -> int:
+        """Units that can be ordered, including those held in shards."""
+        return (self.stock_quantity or 0) + (self.shard_stock or 0)
+
     def __repr__(self):
         return f"<Product(name='{self.name}', price={self.price})>"
\ No newline at end of file
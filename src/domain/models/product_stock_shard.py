@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, ForeignKey, CheckConstraint
+from src.infrastructure.database import Base
+
+
+class ProductStockShard(Base):
+    """One slice of a flash-sale product's stock.
+
+    While ``Product.stock_sharded`` is set, the product's stock lives in
+    these rows instead of ``products.stock_quantity`` so that concurrent
+    orders lock different rows.
+    """
+
+    __tablename__ = "product_stock_shards"
+    __table_args__ = (
+        CheckConstraint("quantity >= 0", name="ck_product_stock_shards_quantity"),
+    )
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductStockShard(product_id={self.product_id}, shard={self.shard}, quantity={self.quantity})>"
@@ -0,0 +1,172 @@
+"""Cart pricing over integer cents, vectorized across many carts at once.
+
+Every line of every cart is flattened into parallel numpy arrays, so pricing
+a batch costs a fixed number of array operations rather than Python work
+per cart. Rules are applied in this order:
+
+1. Line promotions (category discounts, buy-X-get-Y). When several match a
+   line, only the largest discount is applied.
+2. Cart promotions (percentage off above a minimum subtotal) on the
+   discounted subtotal. The best eligible one wins.
+3. Shipping by tier on the discounted subtotal.
+4. Tax on the discounted subtotal.
+
+Percentages are rounded half up to the cent.
+"""
+from typing import List, Literal, NamedTuple, Sequence, Tuple, Union
+import numpy as np
+from pydantic import BaseModel, Field, TypeAdapter
+from typing_extensions import Annotated
+
+
+class PercentageOffPromotion(BaseModel):
+    type: Literal["percentage_off"] = "percentage_off"
+    name: str
+    percent: float = Field(..., gt=0, le=100)
+    min_subtotal: float = Field(0, ge=0)
+
+
+class BuyXGetYPromotion(BaseModel):
+    type: Literal["buy_x_get_y"] = "buy_x_get_y"
+    name: str
+    product_id: int
+    buy: int = Field(..., ge=1)
+    get: int = Field(..., ge=1)
+
+
+class CategoryDiscountPromotion(BaseModel):
+    type: Literal["category_discount"] = "category_discount"
+    name: str
+    category_id: int
+    percent: float = Field(..., gt=0, le=100)
+
+
+Promotion = Annotated[
+    Union[PercentageOffPromotion, BuyXGetYPromotion, CategoryDiscountPromotion],
+    Field(discriminator="type"),
+]
+promotions_adapter = TypeAdapter(List[Promotion])
+
+
+class CartLines(NamedTuple):
+    """Flattened lines of a batch of carts; lines of one cart are contiguous."""
+
+    cart_index: np.ndarray
+    product_ids: np.ndarray
+    category_ids: np.ndarray
+    quantities: np.ndarray
+    unit_cents: np.ndarray
+
+
+class Quotes(NamedTuple):
+    """Per-cart amounts in cents, plus the names of the promotions applied to each cart."""
+
+    subtotal: np.ndarray
+    discount: np.ndarray
+    shipping: np.ndarray
+    tax: np.ndarray
+    total: np.ndarray
+    promotions: List[List[str]]
+
+
+def to_cents(amounts) -> np.ndarray:
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def _percent_of(cents: np.ndarray, basis_points) -> np.ndarray:
+    return (cents * basis_points + 5000) // 10000
+
+
+def build_cart_lines(carts: Sequence[Sequence[Tuple[int, int, int, int]]]) -> CartLines:
+    """Flatten ``(product_id, category_id, quantity, unit_cents)`` lines per cart."""
+    rows = [(index, *line) for index, cart in enumerate(carts) for line in cart]
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 5).T
+    return CartLines(*columns)
+
+
+class PricingEngine:
+    def __init__(
+        self,
+        tax_rate_bps: int,
+        shipping_tiers: Sequence[Sequence[int]],
+        promotions: Sequence[Promotion] = (),
+    ):
+        self.tax_rate_bps = tax_rate_bps
+        tiers = sorted((int(minimum), int(cost)) for minimum, cost in shipping_tiers)
+        self.tier_minimums = np.array([minimum for minimum, _ in tiers], dtype=np.int64)
+        self.tier_costs = np.array([cost for _, cost in tiers], dtype=np.int64)
+        self.line_promotions = [
+            promotion for promotion in promotions if not isinstance(promotion, PercentageOffPromotion)
+        ]
+        self.cart_promotions = [
+            promotion for promotion in promotions if isinstance(promotion, PercentageOffPromotion)
+        ]
+
+    @classmethod
+    def from_settings(cls, settings) -> "PricingEngine":
+        return cls(
+            tax_rate_bps=settings.TAX_RATE_BPS,
+            shipping_tiers=settings.SHIPPING_TIERS,
+            promotions=promotions_adapter.validate_python(settings.PROMOTIONS),
+        )
+
+    def price(self, lines: CartLines, cart_count: int) -> Quotes:
+        # Lines are grouped by cart, so per-cart sums are one reduceat each
+        starts = np.searchsorted(lines.cart_index, np.arange(cart_count))
+        line_totals = lines.quantities * lines.unit_cents
+        subtotal = np.add.reduceat(line_totals, starts)
+
+        applied = [[] for _ in range(cart_count)]
+        line_discount = np.zeros_like(line_totals)
+        if self.line_promotions:
+            candidates = np.stack([self._line_discount(promotion, lines, line_totals)
+                                   for promotion in self.line_promotions])
+            winner = candidates.argmax(axis=0)
+            line_discount = candidates.max(axis=0)
+            for rule, promotion in enumerate(self.line_promotions):
+                used = np.add.reduceat((winner == rule) & (line_discount > 0), starts)
+                for cart in np.flatnonzero(used):
+                    applied[cart].append(promotion.name)
+        discounted = subtotal - np.add.reduceat(line_discount, starts)
+
+        cart_discount = np.zeros_like(subtotal)
+        if self.cart_promotions:
+            candidates = np.stack([
+                np.where(
+                    discounted >= to_cents(promotion.min_subtotal),
+                    _percent_of(discounted, int(round(promotion.percent * 100))),
+                    0,
+                )
+                for promotion in self.cart_promotions
+            ])
+            winner = candidates.argmax(axis=0)
+            cart_discount = candidates.max(axis=0)
+            for cart in np.flatnonzero(cart_discount):
+                applied[cart].append(self.cart_promotions[winner[cart]].name)
+        net = discounted - cart_discount
+
+        shipping = np.zeros_like(net)
+        if len(self.tier_costs):
+            tier = np.searchsorted(self.tier_minimums, net, side="right") - 1
+            shipping = np.where(tier >= 0, self.tier_costs[np.maximum(tier, 0)], 0)
+        tax = _percent_of(net, self.tax_rate_bps)
+        return Quotes(
+            subtotal=subtotal,
+            discount=subtotal - net,
+            shipping=shipping,
+            tax=tax,
+            total=net + shipping + tax,
+            promotions=applied,
+        )
+
+    @staticmethod
+    def _line_discount(promotion, lines: CartLines, line_totals: np.ndarray) -> np.ndarray:
+        if isinstance(promotion, CategoryDiscountPromotion):
+            return np.where(
+                lines.category_ids == promotion.category_id,
+                _percent_of(line_totals, int(round(promotion.percent * 100))),
+                0,
+            )
+        # Buy X get Y: every full group of buy + get units has ``get`` units free
+        free_units = (lines.quantities // (promotion.buy + promotion.get)) * promotion.get
+        return np.where(lines.product_ids == promotion.product_id, free_units * lines.unit_cents, 0)
@@ -0,0 +1,104 @@
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+# Prefixes this short match a large part of the catalog, so their results
+# are kept until the index next changes
+CACHED_PREFIX_LENGTH = 2
+
+# Sorts after any character that can follow a prefix
+PREFIX_END = "\U0010ffff"
+
+
+class Suggestion(NamedTuple):
+    id: int
+    name: str
+    sku: str
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _keys(name: str, sku: str) -> List[str]:
+    # The name from each of its words on, so "head" finds "Wireless Headphones"
+    words = normalize(name).split(" ")
+    keys = {" ".join(words[i:]) for i in range(len(words))}
+    keys.add(normalize(sku))
+    keys.discard("")
+    return sorted(keys)
+
+
+class AutocompleteIndex:
+    """Prefix index over active product names and SKUs, kept in process memory.
+
+    Keys live in one sorted list of ``(key, product_id)`` pairs: a lookup is a
+    binary search to the first key with the prefix and a scan over the keys
+    that share it. Matches are ranked by popularity (units sold).
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, int]] = []
+        self._products: Dict[int, Suggestion] = {}
+        self._popularity: Dict[int, int] = {}
+        self._cache: Dict[Tuple[str, int], List[Suggestion]] = {}
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def rebuild(self, products: Iterable[Tuple[int, str, str]], popularity: Dict[int, int]):
+        """Replace the whole index with ``(id, name, sku)`` rows."""
+        entries = []
+        suggestions = {}
+        for product_id, name, sku in products:
+            suggestions[product_id] = Suggestion(product_id, name, sku)
+            entries.extend((key, product_id) for key in _keys(name, sku))
+        entries.sort()
+        self._entries = entries
+        self._products = suggestions
+        self._popularity = dict(popularity)
+        self._cache.clear()
+
+    def upsert(self, product_id: int, name: str, sku: str):
+        self.remove(product_id)
+        self._products[product_id] = Suggestion(product_id, name, sku)
+        for key in _keys(name, sku):
+            insort(self._entries, (key, product_id))
+        self._cache.clear()
+
+    def remove(self, product_id: int):
+        suggestion = self._products.pop(product_id, None)
+        if suggestion is None:
+            return
+        for key in _keys(suggestion.name, suggestion.sku):
+            index = bisect_left(self._entries, (key, product_id))
+            if index < len(self._entries) and self._entries[index] == (key, product_id):
+                del self._entries[index]
+        self._cache.clear()
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        cached = len(prefix) <= CACHED_PREFIX_LENGTH
+        if cached and (prefix, limit) in self._cache:
+            return self._cache[(prefix, limit)]
+
+        # Every key with the prefix sorts between these two bounds
+        start = bisect_left(self._entries, (prefix,))
+        end = bisect_left(self._entries, (prefix + PREFIX_END,), start)
+        matches = {product_id for _, product_id in self._entries[start:end]}
+        popularity = self._popularity
+        products = self._products
+        top = heapq.nsmallest(
+            limit,
+            matches,
+            key=lambda product_id: (-popularity.get(product_id, 0), len(products[product_id].name), product_id),
+        )
+        result = [self._products[product_id] for product_id in top]
+        if cached:
+            self._cache[(prefix, limit)] = result
+        return result
+
+
+autocomplete_index = AutocompleteIndex()
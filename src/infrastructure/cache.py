@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+MISSING = object()
+
+
+class TTLCache:
+    """Bounded in-process cache whose entries expire ``ttl`` seconds after being set.
+
+    When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            value = await loader()
+            self.set(key, value)
+        return value
+
+    def delete(self, *keys: Hashable):
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,77 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Sorts after the digits and "/" that make up a path
+PATH_END = "\U0010ffff"
+
+
+class CategoryNode(NamedTuple):
+    id: int
+    name: str
+    slug: str
+    parent_id: Optional[int]
+    path: str
+
+
+def path_ids(path: str) -> List[int]:
+    """Ids along a materialized path, root first."""
+    return [int(part) for part in path.split("/") if part]
+
+
+class CategoryTree:
+    """The category hierarchy, kept in process memory.
+
+    Nodes are sorted by materialized path, so the subtree of a category is
+    the contiguous run of paths that start with its own. Descendant lookups
+    are a binary search; the nested tree is built once per rebuild.
+    """
+
+    def __init__(self):
+        self._load([])
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def rebuild(self, nodes: Iterable[CategoryNode]):
+        self._load(list(nodes))
+
+    def get(self, category_id: int) -> Optional[CategoryNode]:
+        return self._nodes.get(category_id)
+
+    def descendants(self, category_id: int) -> List[int]:
+        """``category_id`` and every category below it; unknown ids map to themselves."""
+        node = self._nodes.get(category_id)
+        # A category inserted outside the API may not have its path yet
+        if node is None or not node.path:
+            return [category_id]
+        start = bisect_left(self._paths, node.path)
+        end = bisect_left(self._paths, node.path + PATH_END, start)
+        return self._ids[start:end]
+
+    def ancestors(self, category_id: int) -> List[int]:
+        """``category_id`` and every category above it, root first."""
+        node = self._nodes.get(category_id)
+        return path_ids(node.path) if node and node.path else [category_id]
+
+    def tree(self) -> List[dict]:
+        """Root categories, each with its nested ``children``."""
+        return self._tree
+
+    def _load(self, nodes: List[CategoryNode]):
+        nodes.sort(key=lambda node: node.path)
+        self._nodes: Dict[int, CategoryNode] = {node.id: node for node in nodes}
+        self._paths = [node.path for node in nodes]
+        self._ids = [node.id for node in nodes]
+
+        entries = {
+            node.id: {"id": node.id, "name": node.name, "slug": node.slug, "children": []} for node in nodes
+        }
+        roots = []
+        # Siblings are listed by name
+        for node in sorted(nodes, key=lambda node: (node.name.casefold(), node.id)):
+            parent = entries.get(node.parent_id)
+            (parent["children"] if parent else roots).append(entries[node.id])
+        self._tree = roots
+
+
+category_tree = CategoryTree()
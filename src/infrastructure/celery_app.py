@@ -0,0 +1,16 @@
+from celery import Celery
+from src.core.config import settings
+
+celery_app = Celery(
+    "commercial_api",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["src.infrastructure.tasks"],
+)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    # Events are redelivered if a worker dies mid-task; subscribers must be idempotent
+    task_acks_late=True,
+    task_ignore_result=settings.CELERY_RESULT_BACKEND is None,
+)
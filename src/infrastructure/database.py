@@ -1,17 +1,73 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from src.core.config import settings
+from src.infrastructure.pool_metrics import InstrumentedQueuePool
+from src.infrastructure.replicas import LSN_HEADER, Replica, ReplicaSet, parse_lsn
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def create_engine_from_settings(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def create_session_factory(bind) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+engine = create_engine_from_settings(settings.async_database_url)
+AsyncSessionLocal = create_session_factory(engine)
+
+
+def _create_replica(url: str) -> Replica:
+    replica_engine = create_engine_from_settings(url)
+    return Replica(replica_engine, create_session_factory(replica_engine))
+
+
+replica_set = ReplicaSet(
+    AsyncSessionLocal,
+    [_create_replica(url) for url in settings.DATABASE_REPLICA_URLS],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def _mark_committed(session):
+    session.info["committed"] = True
+
+
+async def get_db(request: Request):
+    """Primary session for commands; commits are reported back to the client as an LSN."""
+    async with AsyncSessionLocal() as db:
+        event.listen(db.sync_session, "after_commit", _mark_committed)
+        request.state.primary_session = db
+        yield db
+
+
+async def get_read_db(request: Request):
+    """Session for query handlers, served by a replica when one is fresh enough."""
+    min_lsn = request.headers.get(LSN_HEADER)
+    replica = await replica_set.replica_for_read(min_lsn)
+    session_factory = replica.session_factory if replica else AsyncSessionLocal
+    async with session_factory() as db:
+        # Read by the entity caches to tell how fresh this session's rows are
+        db.info["min_lsn"] = parse_lsn(min_lsn)
+        if replica is not None:
+            db.info["replay_lsn"] = replica.replay_lsn
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,46 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.infrastructure.cache import TTLCache
+from typing import Iterable, Optional
+
+# Per-worker caches of product and user DTOs. Writes in this worker
+# invalidate them after commit; writes in other workers show up once the TTL
+# expires. Products are keyed by ("id", id), and ("sku", sku) maps to the id.
+product_cache = TTLCache(ttl=settings.PRODUCT_CACHE_TTL_SECONDS, maxsize=settings.PRODUCT_CACHE_MAX_SIZE)
+user_cache = TTLCache(ttl=settings.USER_CACHE_TTL_SECONDS, maxsize=settings.USER_CACHE_MAX_SIZE)
+
+
+def invalidate_products(product_ids: Iterable[int]):
+    # SKU entries only point at ids, so dropping the id entry is enough
+    product_cache.delete(*[("id", product_id) for product_id in product_ids])
+
+
+def invalidate_user(user_id: int):
+    user_cache.delete(user_id)
+
+
+# Primary WAL position after the latest commit in this worker. A replica
+# that has not replayed up to it may still return rows that the commit
+# invalidated, so it must not refill the caches.
+_last_commit_lsn = 0
+
+
+def note_commit(lsn: Optional[int]):
+    global _last_commit_lsn
+    if lsn is not None and lsn > _last_commit_lsn:
+        _last_commit_lsn = lsn
+
+
+def can_read_cache(db: AsyncSession) -> bool:
+    # A client that sent the LSN of its last write reads past the cache, which
+    # may hold entries from before that write if another worker made it
+    return db.info.get("min_lsn") is None
+
+
+def can_fill_cache(db: AsyncSession) -> bool:
+    """Whether rows read through ``db`` are at least as new as this worker's last commit."""
+    if "replay_lsn" not in db.info:
+        # The primary
+        return True
+    replay_lsn = db.info["replay_lsn"]
+    return replay_lsn is not None and replay_lsn >= _last_commit_lsn
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterable, AsyncIterator, Sequence
+
+# Columns of a product export, in CSV order
+EXPORT_COLUMNS = (
+    "id", "sku", "name", "description", "price", "stock_quantity",
+    "category_id", "is_active", "created_at", "updated_at",
+)
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+async def encode_rows(chunks: AsyncIterable[Sequence], format: str) -> AsyncIterator[bytes]:
+    """Encode chunks of ``EXPORT_COLUMNS`` rows as CSV (with a header) or NDJSON, one chunk at a time."""
+    if format == "csv":
+        yield _csv_lines([EXPORT_COLUMNS])
+        async for rows in chunks:
+            yield _csv_lines([_csv_row(row) for row in rows])
+    else:
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        async for rows in chunks:
+            yield "".join(
+                dumps(dict(zip(EXPORT_COLUMNS, _with_text_values(row)))) + "\n" for row in rows
+            ).encode()
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    # wbits=31 writes a gzip header and trailer rather than a raw zlib stream
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _csv_lines(rows) -> bytes:
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(rows)
+    return out.getvalue().encode()
+
+
+def _with_text_values(row: Sequence) -> list:
+    # Only the trailing timestamps need converting; done by position, as
+    # per-value type checks cost more than the encoding itself
+    values = list(row)
+    values[-2] = values[-2].isoformat() if values[-2] else None
+    values[-1] = values[-1].isoformat() if values[-1] else None
+    return values
+
+
+def _csv_row(row: Sequence) -> list:
+    values = _with_text_values(row)
+    # is_active, spelled as in NDJSON
+    values[-3] = "true" if values[-3] else "false"
+    return values
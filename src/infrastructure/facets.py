@@ -0,0 +1,201 @@
+from typing import Collection, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import numpy as np
+from src.core.config import settings
+
+# (id, category_id, price, stock_quantity, is_active); stock includes shards
+FacetRow = Tuple[int, int, float, int, bool]
+
+
+class FacetResult(NamedTuple):
+    # Matching product ids, ascending
+    ids: np.ndarray
+    # Counts under every filter except the facet's own, so that the other
+    # values of a facet stay visible once one of them is selected
+    categories: Dict[int, int]
+    price_buckets: List[int]
+    in_stock: int
+
+
+class FacetIndex:
+    """Filter and facet index over products, kept in process memory.
+
+    Each product has a slot in parallel arrays. Every category, price bucket
+    and stock/active state is a boolean mask over the slots, so a filter
+    combination is an intersection of masks and a facet count is the
+    population count of one. A rebuild lays the slots out in id order; slots
+    of deleted products are cleared, not reused, until the next rebuild.
+
+    Writes only mark products stale; ``refresh`` reloads them before the
+    next read, which keeps stock updates off the order path.
+    """
+
+    def __init__(self, price_bounds: Sequence[float]):
+        # Bucket i holds prices in [bounds[i], bounds[i + 1]); the last is open
+        self.price_bounds = np.asarray(sorted(price_bounds), dtype=np.float64)
+        self._stale: Set[int] = set()
+        self._load([])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._present[:self._size]))
+
+    def rebuild(self, rows: Iterable[FacetRow]):
+        """Replace the whole index."""
+        self._load(list(rows))
+
+    def mark_stale(self, product_ids: Iterable[int]):
+        self._stale.update(product_ids)
+
+    def take_stale(self) -> List[int]:
+        stale, self._stale = sorted(self._stale), set()
+        return stale
+
+    def refresh(self, product_ids: Iterable[int], rows: Iterable[FacetRow]):
+        """Apply the current ``rows`` of ``product_ids``; ids without a row are removed."""
+        rows_by_id = {row[0]: row for row in rows}
+        for product_id in product_ids:
+            row = rows_by_id.get(product_id)
+            if row is None:
+                self._remove(product_id)
+            else:
+                self._upsert(row)
+
+    def search(
+        self,
+        category_ids: Optional[Collection[int]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: bool = False,
+        is_active: Optional[bool] = True
+    ) -> FacetResult:
+        size = self._size
+        base = self._present[:size].copy()
+        if is_active is not None:
+            base &= self._active[:size] if is_active else ~self._active[:size]
+
+        category_mask = None
+        if category_ids:
+            category_mask = np.zeros(size, dtype=bool)
+            for category_id in category_ids:
+                bits = self._categories.get(category_id)
+                if bits is not None:
+                    category_mask |= bits[:size]
+
+        price_mask = None
+        if min_price is not None or max_price is not None:
+            prices = self._price[:size]
+            price_mask = np.ones(size, dtype=bool)
+            if min_price is not None:
+                price_mask &= prices >= min_price
+            if max_price is not None:
+                price_mask &= prices <= max_price
+
+        stock_mask = self._in_stock[:size] if in_stock else None
+
+        def combined(*masks):
+            mask = base
+            for other in masks:
+                if other is not None:
+                    mask = mask & other
+            return mask
+
+        matches = combined(category_mask, price_mask, stock_mask)
+        without_category = combined(price_mask, stock_mask)
+        without_price = combined(category_mask, stock_mask)
+        without_stock = combined(category_mask, price_mask)
+        ids = self._ids[:size][matches]
+        if not self._sorted:
+            ids.sort()
+        return FacetResult(
+            ids=ids,
+            categories={
+                category_id: count
+                for category_id, bits in self._categories.items()
+                if (count := int(np.count_nonzero(without_category & bits[:size])))
+            },
+            price_buckets=[int(np.count_nonzero(without_price & bits[:size])) for bits in self._buckets],
+            in_stock=int(np.count_nonzero(without_stock & self._in_stock[:size])),
+        )
+
+    def _load(self, rows: List[FacetRow]):
+        rows.sort()
+        size = len(rows)
+        columns = list(zip(*rows)) or [(), (), (), (), ()]
+        ids, category_ids, prices, stock, active = (np.asarray(column) for column in columns)
+        self._size = size
+        self._sorted = True
+        self._ids = ids.astype(np.int64)
+        self._slots = {int(product_id): slot for slot, product_id in enumerate(self._ids)}
+        self._category = category_ids.astype(np.int64)
+        self._price = prices.astype(np.float64)
+        self._present = np.ones(size, dtype=bool)
+        self._active = active.astype(bool)
+        self._in_stock = stock.astype(np.int64) > 0
+        self._categories = {
+            int(category_id): self._category == category_id for category_id in np.unique(self._category)
+        }
+        bucket = self._bucket_of(self._price)
+        self._buckets = [bucket == index for index in range(len(self.price_bounds))]
+
+    def _bucket_of(self, prices: np.ndarray) -> np.ndarray:
+        # Prices below the first bound count towards the first bucket
+        return np.maximum(np.searchsorted(self.price_bounds, prices, side="right") - 1, 0)
+
+    def _upsert(self, row: FacetRow):
+        product_id, category_id, price, stock, active = row
+        slot = self._slots.get(product_id)
+        if slot is None:
+            slot = self._append(product_id)
+        else:
+            self._categories[int(self._category[slot])][slot] = False
+            for bits in self._buckets:
+                bits[slot] = False
+        self._category[slot] = category_id
+        self._price[slot] = price
+        self._present[slot] = True
+        self._active[slot] = bool(active)
+        self._in_stock[slot] = (stock or 0) > 0
+        if category_id not in self._categories:
+            self._categories[category_id] = np.zeros(len(self._ids), dtype=bool)
+        self._categories[category_id][slot] = True
+        self._buckets[int(self._bucket_of(np.float64(price)))][slot] = True
+
+    def _remove(self, product_id: int):
+        slot = self._slots.pop(product_id, None)
+        if slot is None:
+            return
+        self._present[slot] = False
+        self._active[slot] = False
+        self._in_stock[slot] = False
+        self._categories[int(self._category[slot])][slot] = False
+        for bits in self._buckets:
+            bits[slot] = False
+
+    def _append(self, product_id: int) -> int:
+        slot = self._size
+        if slot == len(self._ids):
+            self._grow(max(16, 2 * len(self._ids)))
+        self._size += 1
+        self._ids[slot] = product_id
+        self._slots[product_id] = slot
+        if slot and self._ids[slot - 1] > product_id:
+            # An older product this index missed; results get sorted until the next rebuild
+            self._sorted = False
+        return slot
+
+    def _grow(self, capacity: int):
+        def grown(array: np.ndarray) -> np.ndarray:
+            bigger = np.zeros(capacity, dtype=array.dtype)
+            bigger[:len(array)] = array
+            return bigger
+
+        self._ids = grown(self._ids)
+        self._category = grown(self._category)
+        self._price = grown(self._price)
+        self._present = grown(self._present)
+        self._active = grown(self._active)
+        self._in_stock = grown(self._in_stock)
+        self._categories = {category_id: grown(bits) for category_id, bits in self._categories.items()}
+        self._buckets = [grown(bits) for bits in self._buckets]
+
+
+facet_index = FacetIndex(settings.PRODUCT_PRICE_BUCKETS)
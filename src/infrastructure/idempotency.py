@@ -0,0 +1,140 @@
+import asyncio
+import base64
+import heapq
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+from src.core.config import settings
+
+PENDING = "pending"
+DONE = "done"
+
+
+class MemoryIdempotencyStore:
+    """Per-process store; duplicates only coalesce within one worker."""
+
+    def __init__(self, ttl: float, lock_timeout: float):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._records: Dict[str, tuple] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        # (expires_at, key) in expiry order; entries whose record was since
+        # replaced or released are skipped when they come up
+        self._expiry: List[Tuple[float, str]] = []
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Claim ``key`` for this request; returns the existing record if it is taken."""
+        self._purge()
+        entry = self._records.get(key)
+        if entry is not None:
+            return entry[1]
+        self._store(key, self.lock_timeout, {"state": PENDING, "fingerprint": fingerprint})
+        self._events[key] = asyncio.Event()
+        return None
+
+    async def wait(self, key: str, timeout: float) -> Optional[dict]:
+        event = self._events.get(key)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._purge()
+        entry = self._records.get(key)
+        return entry[1] if entry else None
+
+    async def complete(self, key: str, record: dict):
+        self._store(key, self.ttl, {**record, "state": DONE})
+        self._wake(key)
+
+    async def release(self, key: str):
+        self._records.pop(key, None)
+        self._wake(key)
+
+    async def close(self):
+        pass
+
+    def _wake(self, key: str):
+        event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _store(self, key: str, ttl: float, record: dict):
+        expires_at = time.monotonic() + ttl
+        self._records[key] = (expires_at, record)
+        heapq.heappush(self._expiry, (expires_at, key))
+
+    def _purge(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] < now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._records.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self._records[key]
+                self._wake(key)
+
+
+class RedisIdempotencyStore:
+    """Shared across workers; Redis key expiry removes stale claims and responses."""
+
+    poll_interval = 0.05
+
+    def __init__(self, url: str, ttl: float, lock_timeout: float, prefix: str = "idempotency:"):
+        from redis import asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[dict]:
+        pending = json.dumps({"state": PENDING, "fingerprint": fingerprint})
+        claimed = await self.redis.set(
+            self.prefix + key, pending, nx=True, px=int(self.lock_timeout * 1000)
+        )
+        if claimed:
+            return None
+        return await self._get(key)
+
+    async def wait(self, key: str, timeout: float) -> Optional[dict]:
+        deadline = time.monotonic() + timeout
+        while True:
+            record = await self._get(key)
+            if record is None or record["state"] == DONE or time.monotonic() >= deadline:
+                return record
+            await asyncio.sleep(self.poll_interval)
+
+    async def complete(self, key: str, record: dict):
+        record = {**record, "state": DONE, "body": base64.b64encode(record["body"]).decode()}
+        await self.redis.set(self.prefix + key, json.dumps(record), px=int(self.ttl * 1000))
+
+    async def release(self, key: str):
+        await self.redis.delete(self.prefix + key)
+
+    async def close(self):
+        await self.redis.aclose()
+
+    async def _get(self, key: str) -> Optional[dict]:
+        raw = await self.redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        if record["state"] == DONE:
+            record["body"] = base64.b64decode(record["body"])
+        return record
+
+
+def create_idempotency_store():
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        return RedisIdempotencyStore(
+            settings.REDIS_URL,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+        )
+    return MemoryIdempotencyStore(
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+    )
+
+
+idempotency_store = create_idempotency_store()
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, List, Tuple
+
+# Columns a product import may carry; the rest of the products table is
+# managed by the application
+IMPORT_COLUMNS = ("name", "description", "price", "stock_quantity", "sku", "category_id", "is_active")
+REQUIRED_COLUMNS = ("name", "price", "sku", "category_id")
+# Staging-only column for rows the parser already rejected
+PARSE_ERROR_COLUMN = "error"
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload grows past ``MAX_FILE_SIZE`` while it is streamed."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"Upload exceeds the maximum size of {max_size} bytes")
+
+
+async def limit_size(chunks: AsyncIterable[bytes], max_size: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_size:
+            raise UploadTooLargeError(max_size)
+        yield chunk
+
+
+async def split_csv_header(chunks: AsyncIterable[bytes]) -> Tuple[List[str], AsyncIterator[bytes]]:
+    """Read the header line; returns its column names and the remaining data chunks."""
+    iterator = chunks.__aiter__()
+    buffer = b""
+    while b"\n" not in buffer:
+        try:
+            buffer += await iterator.__anext__()
+        except StopAsyncIteration:
+            break
+    header, _, rest = buffer.partition(b"\n")
+    columns = [name.strip().lower() for name in next(csv.reader([header.decode("utf-8-sig").rstrip("\r")]), [])]
+    _check_columns(columns)
+
+    async def body():
+        if rest:
+            yield rest
+        async for chunk in iterator:
+            yield chunk
+
+    return columns, body()
+
+
+async def ndjson_to_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Re-encode NDJSON as CSV rows of ``IMPORT_COLUMNS`` plus ``error``, one chunk at a time.
+
+    Lines that are not JSON objects become rows carrying only an error, so
+    they are reported as rejected along with the rows the database rejects.
+    """
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if lines:
+            yield _csv_rows(lines)
+    if pending.strip():
+        yield _csv_rows([pending])
+
+
+def _csv_rows(lines: List[bytes]) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            document = json.loads(line)
+        except ValueError:
+            document = None
+        if not isinstance(document, dict):
+            writer.writerow([None] * len(IMPORT_COLUMNS) + ["invalid JSON object"])
+            continue
+        writer.writerow([_csv_value(document.get(column)) for column in IMPORT_COLUMNS] + [None])
+    return out.getvalue().encode()
+
+
+def _csv_value(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(value)
+
+
+def _check_columns(columns: List[str]):
+    unknown = [column for column in columns if column not in IMPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    if len(set(columns)) != len(columns):
+        raise ValueError("Duplicate columns in header")
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from src.core.config import settings
+from src.domain.models.outbox_event import OutboxEvent
+from src.infrastructure.celery_app import celery_app
+from src.infrastructure.repositories.outbox_repository import OutboxRepository
+from src.infrastructure.tasks import DISPATCH_EVENT_TASK
+
+logger = logging.getLogger(__name__)
+
+
+def _send_to_celery(events: List[OutboxEvent]) -> int:
+    sent = 0
+    try:
+        with celery_app.producer_or_acquire() as producer:
+            try:
+                for event in events:
+                    celery_app.send_task(
+                        DISPATCH_EVENT_TASK,
+                        args=[event.event_type, event.payload],
+                        # Stable id so consumers can deduplicate redeliveries
+                        task_id=f"outbox-{event.id}",
+                        producer=producer,
+                    )
+                    sent += 1
+            except Exception:
+                logger.exception("Publishing outbox event %s failed", events[sent].id)
+    except Exception:
+        # Acquiring or releasing the connection failed, so the sends are not
+        # known to have reached the broker; the whole batch is sent again
+        logger.exception("Publishing a batch of %d outbox events failed", len(events))
+        return 0
+    return sent
+
+
+async def publish_to_celery(events: List[OutboxEvent]) -> int:
+    """Send ``events`` in order over one broker connection; returns how many were sent."""
+    return await asyncio.to_thread(_send_to_celery, events)
+
+
+class OutboxRelay:
+    """Moves outbox rows to the task queue in id order, one batch per transaction.
+
+    Several relays may run at once: each locks its batch with SKIP LOCKED.
+    Delivery is at-least-once, since a crash after publishing and before
+    the commit re-sends the batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        publish: Callable[[List[OutboxEvent]], Awaitable[int]] = publish_to_celery,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.publish = publish
+        self.batch_size = batch_size
+
+    async def relay_batch(self) -> int:
+        async with self.session_factory() as db:
+            repository = OutboxRepository(db)
+            events = await repository.claim_batch(self.batch_size)
+            if not events:
+                return 0
+            sent = await self.publish(events)
+            if sent:
+                await repository.delete([event.id for event in events[:sent]])
+            if sent < len(events):
+                await repository.record_failure(events[sent].id)
+            await db.commit()
+            return sent
+
+    async def relay_pending(self):
+        """Relay batches until the outbox is empty or publishing fails."""
+        while True:
+            sent = await self.relay_batch()
+            if sent < self.batch_size:
+                return
+
+
+async def main():
+    from src.infrastructure.database import AsyncSessionLocal, engine
+    from src.infrastructure.periodic import run_periodically
+
+    logging.basicConfig(level=logging.INFO)
+    relay = OutboxRelay(AsyncSessionLocal)
+    try:
+        await run_periodically(settings.OUTBOX_POLL_INTERVAL_SECONDS, relay.relay_pending)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_paginate(query, model, cursor: Optional[str], skip: int, limit: int):
+    """Order by (created_at, id) and continue after ``cursor``, or fall back to ``skip``."""
+    query = query.order_by(model.created_at, model.id)
+    if cursor:
+        query = query.where(tuple_(model.created_at, model.id) > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(items: Sequence, limit: int) -> Optional[str]:
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response, items: Sequence, limit: int):
+    cursor = next_cursor(items, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,77 @@
+import logging
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month on created_at
+PARTITIONED_TABLES = ["orders", "order_items"]
+
+MAINTENANCE_LOCK_ID = 0x70617274
+
+
+def add_months(month: date, months: int) -> date:
+    year, month_index = divmod(month.month - 1 + months, 12)
+    return date(month.year + year, month_index + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
+async def ensure_monthly_partitions(
+    conn: AsyncConnection,
+    months_ahead: int,
+    today: Optional[date] = None,
+) -> List[str]:
+    """Create the partitions for this month and the next ``months_ahead`` months.
+
+    Also makes sure every table has a DEFAULT partition, so an insert never
+    fails for lack of a partition. Returns the names of the partitions created.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MAINTENANCE_LOCK_ID})
+    this_month = (today or date.today()).replace(day=1)
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = set(await conn.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": table},
+        ))
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{add_months(month, 1)} 00:00:00+00')"
+                    ))
+            except Exception:
+                # Rows for this month already landed in the default partition
+                logger.exception("Could not create partition %s", name)
+                continue
+            created.append(name)
+        if f"{table}_default" not in existing:
+            await conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+            created.append(f"{table}_default")
+    return created
+
+
+def created_between(query, model, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+    """Restrict ``query`` to rows created in ``[created_from, created_to)``.
+
+    On the partitioned tables the planner then skips every partition
+    outside the range.
+    """
+    if created_from is not None:
+        query = query.where(model.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(model.created_at < created_to)
+    return query
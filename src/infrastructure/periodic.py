@@ -0,0 +1,17 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval: float, job: Callable[[], Awaitable[None]]):
+    """Run ``job`` every ``interval`` seconds until cancelled, logging failures."""
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Periodic job %s failed", getattr(job, "__name__", job))
+        await asyncio.sleep(interval)
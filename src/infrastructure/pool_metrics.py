@@ -0,0 +1,73 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for a single connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to get a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+def pool_status(pool) -> dict:
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = pool.size() + pool._max_overflow
+        checked_out = pool.checkedout()
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout": pool.timeout(),
+            "exhausted": checked_out >= capacity,
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        status["waits"] = pool.metrics.snapshot()
+    return status
@@ -0,0 +1,114 @@
+import asyncio
+import itertools
+import time
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# Header carrying the primary WAL position of a client's last write
+LSN_HEADER = "X-DB-LSN"
+
+REPLICA_STATUS_SQL = text(
+    "SELECT pg_last_wal_replay_lsn()::text AS replay_lsn, "
+    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END AS lag"
+)
+CURRENT_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+
+def parse_lsn(lsn: Optional[str]) -> Optional[int]:
+    """Convert a Postgres LSN such as '16/B374D848' to a comparable integer."""
+    if not lsn:
+        return None
+    try:
+        high, low = lsn.split("/")
+        return (int(high, 16) << 32) + int(low, 16)
+    except ValueError:
+        return None
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, session_factory: async_sessionmaker):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.replay_lsn: Optional[int] = None
+        self.lag: Optional[float] = None
+        self.healthy = False
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        async with self._lock:
+            try:
+                async with self.engine.connect() as conn:
+                    row = (await conn.execute(REPLICA_STATUS_SQL)).one()
+                self.replay_lsn = parse_lsn(row.replay_lsn)
+                self.lag = float(row.lag)
+                self.healthy = True
+            except Exception:
+                self.healthy = False
+            self.checked_at = time.monotonic()
+
+    def status(self) -> dict:
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+        }
+
+
+class ReplicaSet:
+    """Chooses a replica session for reads, falling back to the primary.
+
+    A replica is used only when its replication lag is within
+    ``max_lag`` and, if the client sent the LSN of its last write, it has
+    replayed at least up to that position.
+    """
+
+    def __init__(
+        self,
+        primary_factory: async_sessionmaker,
+        replicas: List[Replica],
+        max_lag: float,
+        check_interval: float,
+    ):
+        self.primary_factory = primary_factory
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(replicas) if replicas else None
+
+    async def _is_usable(self, replica: Replica, min_lsn: Optional[int]) -> bool:
+        if time.monotonic() - replica.checked_at > self.check_interval:
+            await replica.refresh()
+        if not replica.healthy or replica.lag is None or replica.lag > self.max_lag:
+            return False
+        if min_lsn is None:
+            return True
+        if replica.replay_lsn is not None and replica.replay_lsn >= min_lsn:
+            return True
+        # The cached position may be stale; look again before giving up
+        await replica.refresh()
+        return replica.healthy and replica.replay_lsn is not None and replica.replay_lsn >= min_lsn
+
+    async def replica_for_read(self, min_lsn: Optional[str] = None) -> Optional[Replica]:
+        """A usable replica, or None when reads have to go to the primary."""
+        if not self.replicas:
+            return None
+        required = parse_lsn(min_lsn)
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if await self._is_usable(replica, required):
+                return replica
+        return None
+
+    def status(self) -> List[dict]:
+        return [replica.status() for replica in self.replicas]
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+async def current_wal_lsn(db: AsyncSession) -> str:
+    return await db.scalar(CURRENT_LSN_SQL)
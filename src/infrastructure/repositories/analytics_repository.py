@@ -0,0 +1,76 @@
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+
+# Rollups created by the add_sales_analytics_views migration; each has a
+# unique index so it can be refreshed without blocking readers
+SALES_VIEWS = ["sales_daily", "sales_by_product", "sales_by_category", "orders_by_status"]
+
+# Only one worker refreshes at a time
+REFRESH_LOCK_ID = 7_202_601
+
+
+class AnalyticsRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def revenue_per_day(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> List[dict]:
+        conditions = ["TRUE"]
+        if date_from:
+            conditions.append("day >= :date_from")
+        if date_to:
+            conditions.append("day <= :date_to")
+        result = await self.db.execute(
+            text(
+                "SELECT day, order_count, revenue FROM sales_daily "
+                f"WHERE {' AND '.join(conditions)} ORDER BY day"
+            ),
+            {"date_from": date_from, "date_to": date_to},
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def units_per_product(self, limit: int = 100) -> List[dict]:
+        result = await self.db.execute(
+            text(
+                "SELECT product_id, units, revenue FROM sales_by_product "
+                "ORDER BY units DESC, product_id LIMIT :limit"
+            ),
+            {"limit": limit},
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def units_sold(self) -> Dict[int, int]:
+        """Units sold per product; empty if the rollups have not been created."""
+        exists = await self.db.scalar(text("SELECT to_regclass('sales_by_product') IS NOT NULL"))
+        if not exists:
+            return {}
+        result = await self.db.execute(text("SELECT product_id, units FROM sales_by_product"))
+        return {product_id: units for product_id, units in result}
+
+    async def revenue_per_category(self) -> List[dict]:
+        result = await self.db.execute(
+            text("SELECT category_id, units, revenue FROM sales_by_category ORDER BY revenue DESC")
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def orders_per_status(self) -> List[dict]:
+        result = await self.db.execute(
+            text("SELECT status, order_count, revenue FROM orders_by_status ORDER BY status")
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def refresh(self) -> bool:
+        """Refresh every rollup concurrently; returns False if another worker holds the lock."""
+        locked = await self.db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": REFRESH_LOCK_ID}
+        )
+        if not locked:
+            return False
+        for view in SALES_VIEWS:
+            await self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+        return True
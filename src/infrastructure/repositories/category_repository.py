@@ -0,0 +1,67 @@
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.models.category import Category
+from src.domain.models.product import Product
+from src.infrastructure.category_tree import CategoryNode
+from typing import List, Optional
+
+
+class CategoryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, category_data: dict, parent: Optional[Category] = None) -> Category:
+        # The path ends with the category's own id, so the id is drawn first
+        category_id = await self.db.scalar(select(func.nextval(func.pg_get_serial_sequence("categories", "id"))))
+        category = Category(
+            id=category_id, path=f"{parent.path if parent else ''}{category_id}/", updated_at=None, **category_data
+        )
+        self.db.add(category)
+        await self.db.flush()
+        return category
+
+    async def get_by_id(self, category_id: int) -> Optional[Category]:
+        return await self.db.scalar(select(Category).where(Category.id == category_id))
+
+    async def get_by_slug(self, slug: str) -> Optional[Category]:
+        return await self.db.scalar(select(Category).where(Category.slug == slug))
+
+    async def get_tree_nodes(self) -> List[CategoryNode]:
+        result = await self.db.execute(
+            select(Category.id, Category.name, Category.slug, Category.parent_id, Category.path)
+        )
+        return [CategoryNode(*row) for row in result]
+
+    async def update(self, category_id: int, category_data: dict) -> Optional[Category]:
+        category = await self.get_by_id(category_id)
+        if category:
+            for key, value in category_data.items():
+                setattr(category, key, value)
+        return category
+
+    async def move(self, category: Category, parent: Optional[Category]) -> None:
+        """Re-parent ``category``, rewriting the paths of its whole subtree in one statement."""
+        old_path = category.path
+        new_path = f"{parent.path if parent else ''}{category.id}/"
+        await self.db.execute(
+            update(Category)
+            .where(Category.path.startswith(old_path))
+            .values(path=new_path + func.substr(Category.path, len(old_path) + 1), updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        category.parent_id = parent.id if parent else None
+        category.path = new_path
+        await self.db.flush()
+
+    async def has_children(self, category_id: int) -> bool:
+        return await self.db.scalar(select(exists().where(Category.parent_id == category_id)))
+
+    async def has_products(self, category_id: int) -> bool:
+        return await self.db.scalar(select(exists().where(Product.category_id == category_id)))
+
+    async def delete(self, category_id: int) -> bool:
+        category = await self.get_by_id(category_id)
+        if category:
+            await self.db.delete(category)
+            return True
+        return False
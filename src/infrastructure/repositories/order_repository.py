@@ -1,71 +1,200 @@
-from sqlalchemy.orm import Session
-from src.domain.models.order import Order, OrderItem
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import Row, any_, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+from sqlalchemy.orm.attributes import set_committed_value
+from src.core.config import settings
+from src.domain.models.order import Order, OrderItem, OrderStatus
+from src.infrastructure.pagination import keyset_paginate
+from src.infrastructure.partitions import created_between
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
 import uuid
 
+ITEM_LOADERS = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "subquery": subqueryload,
+}
+
 
 class OrderRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, items_loading: Optional[str] = None):
         self.db = db
+        self.items_loader = ITEM_LOADERS[items_loading or settings.ORDER_ITEMS_LOADING]
+
+    def _select_orders(self):
+        # Items are always loaded with the page of orders; Order.items never lazy loads
+        return select(Order).options(self.items_loader(Order.items))
 
-    def create(self, order_data: dict) -> Order:
+    async def _fetch_orders(self, query) -> List[Order]:
+        result = await self.db.scalars(query)
+        # Joined loading repeats the order row per item
+        return list(result.unique())
+
+    async def create(self, order_data: dict) -> Order:
         # Generate unique order number
         order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8]}"
         order_data['order_number'] = order_number
 
-        order = Order(**order_data)
+        # updated_at is only generated on UPDATE; leaving it unset makes the
+        # eager-defaults flush re-select it
+        order = Order(updated_at=None, **order_data)
         self.db.add(order)
-        self.db.commit()
-        self.db.refresh(order)
+        await self.db.flush()
         return order
 
-    def get_by_id(self, order_id: int) -> Optional[Order]:
-        return self.db.query(Order).filter(Order.id == order_id).first()
+    async def get_by_id(self, order_id: int, created_at: Optional[datetime] = None) -> Optional[Order]:
+        query = self._select_orders().where(Order.id == order_id)
+        if created_at is not None:
+            # Known creation time: only one partition is read
+            query = query.where(Order.created_at == created_at)
+        orders = await self._fetch_orders(query.execution_options(populate_existing=True))
+        return orders[0] if orders else None
+
+    async def get_version(self, order_id: int) -> Optional[Row]:
+        """created_at and updated_at of an order, without loading it or its items."""
+        result = await self.db.execute(
+            select(Order.created_at, Order.updated_at).where(Order.id == order_id)
+        )
+        return result.first()
 
-    def get_by_order_number(self, order_number: str) -> Optional[Order]:
-        return self.db.query(Order).filter(Order.order_number == order_number).first()
+    async def touch(self, order_id: int, created_at: datetime) -> None:
+        """Bump ``updated_at`` when only the order's items changed."""
+        await self.db.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.created_at == created_at)
+            .values(updated_at=func.now())
+        )
 
-    def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 20) -> List[Order]:
-        return self.db.query(Order).filter(Order.user_id == user_id).offset(skip).limit(limit).all()
+    async def get_by_order_number(self, order_number: str) -> Optional[Order]:
+        query = self._select_orders().where(Order.order_number == order_number)
+        try:
+            # ORD-YYYYMMDD-xxxxxxxx; a day either side covers the local vs UTC date
+            day = datetime.strptime(order_number.split('-')[1], '%Y%m%d')
+        except (IndexError, ValueError):
+            pass
+        else:
+            query = created_between(query, Order, day - timedelta(days=1), day + timedelta(days=2))
+        orders = await self._fetch_orders(query)
+        return orders[0] if orders else None
 
-    def get_all(self, skip: int = 0, limit: int = 100, status: Optional[str] = None) -> List[Order]:
-        query = self.db.query(Order)
+    async def get_by_user_id(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> List[Order]:
+        query = self._select_orders().where(Order.user_id == user_id)
+        query = created_between(query, Order, created_from, created_to)
+        return await self._fetch_orders(keyset_paginate(query, Order, cursor, skip, limit))
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> List[Order]:
+        query = self._select_orders()
 
         if status:
-            query = query.filter(Order.status == status)
+            query = query.where(Order.status == status)
+        query = created_between(query, Order, created_from, created_to)
 
-        return query.offset(skip).limit(limit).all()
+        return await self._fetch_orders(keyset_paginate(query, Order, cursor, skip, limit))
 
-    def update_status(self, order_id: int, status: str) -> Optional[Order]:
-        order = self.get_by_id(order_id)
+    async def update(self, order_id: int, order_data: dict) -> Optional[Order]:
+        order = await self.get_by_id(order_id)
         if order:
-            order.status = status
-            self.db.commit()
-            self.db.refresh(order)
+            for key, value in order_data.items():
+                setattr(order, key, value)
         return order
 
-    def add_item(self, order_id: int, item_data: dict) -> OrderItem:
-        item_data['order_id'] = order_id
-        item = OrderItem(**item_data)
+    async def update_status(self, order_id: int, status: str) -> Optional[Order]:
+        return await self.update(order_id, {'status': status})
+
+    async def bulk_update_status(
+        self,
+        status: OrderStatus,
+        allowed_from: List[OrderStatus],
+        order_ids: Optional[List[int]] = None,
+        current_status: Optional[OrderStatus] = None,
+        created_before: Optional[datetime] = None,
+    ) -> List[Row]:
+        """Move every matching order in ``allowed_from`` to ``status`` in one UPDATE.
+
+        Returns ``(id, previous_status, user_id)`` rows for the orders that changed.
+        """
+        matching = select(Order.id, Order.status).where(Order.status.in_(allowed_from))
+        if order_ids is not None:
+            matching = matching.where(Order.id == any_(func.cast(order_ids, ARRAY(Integer))))
+        if current_status is not None:
+            matching = matching.where(Order.status == current_status)
+        if created_before is not None:
+            matching = matching.where(Order.created_at < created_before)
+        # Locking in the subquery makes the returned previous status exact
+        previous = matching.order_by(Order.id).with_for_update().subquery()
+
+        result = await self.db.execute(
+            update(Order)
+            .where(Order.id == previous.c.id)
+            .values(status=status, updated_at=func.now())
+            .returning(Order.id, previous.c.status.label('previous_status'), Order.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result)
+
+    async def get_statuses(self, order_ids: List[int]) -> Dict[int, OrderStatus]:
+        result = await self.db.execute(
+            select(Order.id, Order.status).where(Order.id == any_(func.cast(order_ids, ARRAY(Integer))))
+        )
+        return dict(result.all())
+
+    async def get_item_quantities(self, order_ids: List[int]) -> List[dict]:
+        """Units per product over the items of ``order_ids``."""
+        result = await self.db.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id == any_(func.cast(order_ids, ARRAY(Integer))))
+            .group_by(OrderItem.product_id)
+        )
+        return [{'product_id': product_id, 'quantity': quantity} for product_id, quantity in result]
+
+    async def add_item(self, order: Order, item_data: dict) -> OrderItem:
+        item = OrderItem(order_id=order.id, created_at=order.created_at, **item_data)
         self.db.add(item)
-        self.db.commit()
-        self.db.refresh(item)
         return item
 
-    def update_item(self, item_id: int, item_data: dict) -> Optional[OrderItem]:
-        item = self.db.query(OrderItem).filter(OrderItem.id == item_id).first()
+    async def add_items(self, order: Order, items_data: List[dict]) -> List[OrderItem]:
+        """Insert all items of a new order with one multi-row INSERT ... RETURNING."""
+        result = await self.db.scalars(
+            insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True),
+            [{**item_data, 'order_id': order.id, 'created_at': order.created_at} for item_data in items_data],
+        )
+        items = list(result)
+        # The order was created in this session, so its items are exactly these rows
+        set_committed_value(order, 'items', items)
+        return items
+
+    async def get_item(self, item_id: int) -> Optional[OrderItem]:
+        return await self.db.scalar(select(OrderItem).where(OrderItem.id == item_id))
+
+    async def update_item(self, item_id: int, item_data: dict) -> Optional[OrderItem]:
+        item = await self.get_item(item_id)
         if item:
             for key, value in item_data.items():
                 setattr(item, key, value)
-            self.db.commit()
-            self.db.refresh(item)
         return item
 
-    def delete_item(self, item_id: int) -> bool:
-        item = self.db.query(OrderItem).filter(OrderItem.id == item_id).first()
+    async def delete_item(self, item_id: int) -> bool:
+        item = await self.get_item(item_id)
         if item:
-            self.db.delete(item)
-            self.db.commit()
+            await self.db.delete(item)
             return True
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,127 @@
+from sqlalchemy import any_, delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.models.order import Order, OrderStatus, PaymentMethod
+from src.domain.models.order_summary import OrderSummary
+from src.infrastructure.pagination import keyset_paginate
+from typing import List, Optional
+from datetime import datetime
+
+REBUILD_SQL = text("""
+INSERT INTO order_summaries (
+    id, order_number, user_id, status, payment_method, item_count, total_quantity,
+    subtotal, discount_amount, tax_amount, shipping_cost, total_amount, shipping_address,
+    billing_address, notes, items, created_at, updated_at
+)
+SELECT
+    o.id, o.order_number, o.user_id, lower(o.status::text), lower(o.payment_method::text),
+    count(i.id), coalesce(sum(i.quantity), 0),
+    o.subtotal, o.discount_amount, o.tax_amount, o.shipping_cost, o.total_amount, o.shipping_address,
+    o.billing_address, o.notes,
+    coalesce(
+        jsonb_agg(
+            jsonb_build_object(
+                'id', i.id, 'product_id', i.product_id, 'quantity', i.quantity,
+                'unit_price', i.unit_price, 'total_price', i.total_price
+            ) ORDER BY i.id
+        ) FILTER (WHERE i.id IS NOT NULL),
+        '[]'::jsonb
+    ),
+    coalesce(o.created_at, now()), o.updated_at
+FROM orders o
+LEFT JOIN order_items i ON i.order_id = o.id AND i.created_at = o.created_at
+GROUP BY o.id, o.created_at
+""")
+
+
+class OrderSummaryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def upsert(self, order: Order) -> None:
+        """Write the summary of ``order``, whose items must already be loaded."""
+        items = [
+            {
+                'id': item.id,
+                'product_id': item.product_id,
+                'quantity': item.quantity,
+                'unit_price': item.unit_price,
+                'total_price': item.total_price,
+            }
+            for item in sorted(order.items, key=lambda item: item.id)
+        ]
+        values = {
+            'id': order.id,
+            'order_number': order.order_number,
+            'user_id': order.user_id,
+            'status': OrderStatus(order.status).value,
+            'payment_method': PaymentMethod(order.payment_method).value,
+            'item_count': len(items),
+            'total_quantity': sum(item['quantity'] for item in items),
+            'subtotal': order.subtotal,
+            'discount_amount': order.discount_amount,
+            'tax_amount': order.tax_amount,
+            'shipping_cost': order.shipping_cost,
+            'total_amount': order.total_amount,
+            'shipping_address': order.shipping_address,
+            'billing_address': order.billing_address,
+            'notes': order.notes,
+            'items': items,
+            'created_at': order.created_at,
+            'updated_at': order.updated_at,
+        }
+        stmt = insert(OrderSummary).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OrderSummary.id],
+            set_={key: stmt.excluded[key] for key in values if key != 'id'},
+        )
+        await self.db.execute(stmt)
+
+    async def update_status(self, order_ids: List[int], status: OrderStatus) -> None:
+        await self.db.execute(
+            update(OrderSummary)
+            .where(OrderSummary.id == any_(func.cast(order_ids, ARRAY(Integer))))
+            .values(status=status.value, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_by_id(self, order_id: int) -> Optional[OrderSummary]:
+        return await self.db.scalar(select(OrderSummary).where(OrderSummary.id == order_id))
+
+    async def get_created_at(self, order_id: int) -> Optional[datetime]:
+        """The order's partition key, so that reading the order touches one partition."""
+        return await self.db.scalar(select(OrderSummary.created_at).where(OrderSummary.id == order_id))
+
+    async def get_by_user_id(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> List[OrderSummary]:
+        query = select(OrderSummary).where(OrderSummary.user_id == user_id)
+        result = await self.db.scalars(keyset_paginate(query, OrderSummary, cursor, skip, limit))
+        return list(result)
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[OrderSummary]:
+        query = select(OrderSummary)
+
+        if status:
+            query = query.where(OrderSummary.status == status)
+
+        result = await self.db.scalars(keyset_paginate(query, OrderSummary, cursor, skip, limit))
+        return list(result)
+
+    async def rebuild(self) -> int:
+        """Regenerate every summary from the orders and order_items tables."""
+        await self.db.execute(delete(OrderSummary))
+        result = await self.db.execute(REBUILD_SQL)
+        return result.rowcount
@@ -0,0 +1,54 @@
+from sqlalchemy import any_, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import BigInteger
+from src.domain.events import DomainEvent
+from src.domain.models.outbox_event import OutboxEvent
+from typing import List
+
+
+class OutboxRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, *events: DomainEvent) -> None:
+        """Stage ``events`` in the caller's transaction."""
+        if not events:
+            return
+        await self.db.execute(
+            insert(OutboxEvent),
+            [
+                {
+                    'event_type': event.event_type,
+                    'aggregate_type': event.aggregate_type,
+                    'aggregate_id': event.aggregate_id,
+                    'payload': event.model_dump(mode='json'),
+                }
+                for event in events
+            ],
+        )
+
+    async def claim_batch(self, batch_size: int) -> List[OutboxEvent]:
+        """Lock the oldest unpublished events; concurrent relays skip each other's rows."""
+        result = await self.db.scalars(
+            select(OutboxEvent)
+            .order_by(OutboxEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result)
+
+    async def delete(self, event_ids: List[int]) -> None:
+        await self.db.execute(
+            delete(OutboxEvent)
+            .where(OutboxEvent.id == any_(func.cast(event_ids, ARRAY(BigInteger))))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def record_failure(self, event_id: int) -> None:
+        await self.db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == event_id)
+            .values(attempts=OutboxEvent.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,130 @@
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.imports import IMPORT_COLUMNS, PARSE_ERROR_COLUMN
+from typing import AsyncIterable, Sequence
+
+STAGING_TABLE = "product_import"
+
+CREATE_STAGING_SQL = text(f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    line bigserial,
+    {', '.join(f'{column} text' for column in IMPORT_COLUMNS)},
+    {PARSE_ERROR_COLUMN} text
+) ON COMMIT DROP
+""")
+
+# Everything arrives as text; each row gets the first reason it cannot be
+# imported, checked in order so that casts only run on values that passed
+# the pattern before them. When a SKU repeats, the last row wins.
+CHECK_SQL = text(f"""
+CREATE TEMP TABLE {STAGING_TABLE}_checked ON COMMIT DROP AS
+SELECT
+    i.line,
+    btrim(i.name) AS name,
+    nullif(i.description, '') AS description,
+    btrim(i.price) AS price,
+    coalesce(nullif(btrim(i.stock_quantity), ''), '0') AS stock_quantity,
+    btrim(i.sku) AS sku,
+    btrim(i.category_id) AS category_id,
+    coalesce(nullif(btrim(i.is_active), ''), 'true') AS is_active,
+    CASE
+        WHEN i.error IS NOT NULL THEN i.error
+        WHEN coalesce(btrim(i.sku), '') = '' OR length(btrim(i.sku)) > 100 THEN 'invalid sku'
+        WHEN coalesce(btrim(i.name), '') = '' OR length(btrim(i.name)) > 255 THEN 'invalid name'
+        WHEN coalesce(btrim(i.price), '') !~ '^[0-9]{{1,12}}(\\.[0-9]+)?$' THEN 'invalid price'
+        WHEN btrim(i.price)::numeric <= 0 THEN 'invalid price'
+        WHEN coalesce(nullif(btrim(i.stock_quantity), ''), '0') !~ '^[0-9]{{1,9}}$' THEN 'invalid stock_quantity'
+        WHEN coalesce(btrim(i.category_id), '') !~ '^[0-9]{{1,9}}$' THEN 'invalid category_id'
+        WHEN NOT EXISTS (SELECT 1 FROM categories c WHERE c.id = btrim(i.category_id)::integer)
+            THEN 'unknown category_id'
+        WHEN lower(coalesce(nullif(btrim(i.is_active), ''), 'true'))
+            NOT IN ('true', 'false', 't', 'f', '1', '0', 'yes', 'no') THEN 'invalid is_active'
+        WHEN i.line <> max(i.line) OVER (PARTITION BY btrim(i.sku)) THEN 'duplicate sku'
+    END AS error
+FROM {STAGING_TABLE} i
+""")
+
+# Categories the upsert moves products out of; their cached pages are stale too
+PREVIOUS_CATEGORIES_SQL = text(f"""
+SELECT DISTINCT p.category_id
+FROM products p JOIN {STAGING_TABLE}_checked c ON c.sku = p.sku
+WHERE c.error IS NULL
+""")
+
+# Sharded products keep their stock in the shards, so the import leaves
+# their stock_quantity alone
+UPSERT_SQL = text(f"""
+WITH upserted AS (
+    INSERT INTO products (name, description, price, stock_quantity, sku, category_id, is_active)
+    SELECT name, description, price::numeric, stock_quantity::integer, sku, category_id::integer, is_active::boolean
+    FROM {STAGING_TABLE}_checked
+    WHERE error IS NULL
+    ON CONFLICT (sku) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        price = excluded.price,
+        stock_quantity = CASE WHEN products.stock_sharded THEN products.stock_quantity
+                              ELSE excluded.stock_quantity END,
+        category_id = excluded.category_id,
+        is_active = excluded.is_active,
+        updated_at = now()
+    RETURNING xmax = 0 AS inserted, category_id
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS inserted,
+    count(*) FILTER (WHERE NOT inserted) AS updated,
+    coalesce(array_agg(DISTINCT category_id), '{{}}') AS category_ids
+FROM upserted
+""")
+
+REJECTED_SQL = f"SELECT line, sku, error FROM {STAGING_TABLE}_checked WHERE error IS NOT NULL ORDER BY line"
+
+
+class ProductImportRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def copy_rows(self, chunks: AsyncIterable[bytes], columns: Sequence[str]) -> None:
+        """Stream CSV ``chunks`` (no header) into the staging table with COPY.
+
+        The staging table lives until the transaction ends.
+        """
+        await self.db.execute(CREATE_STAGING_SQL)
+        connection = await self._driver_connection()
+        try:
+            await connection.copy_to_table(STAGING_TABLE, source=chunks, columns=list(columns), format="csv")
+        except asyncpg.DataError as e:
+            # Malformed CSV: wrong number of fields, bad quoting or encoding
+            raise ValueError(f"Malformed import file: {e}")
+
+    async def upsert_staged(self, sample_size: int = 20) -> dict:
+        """Validate the staged rows and upsert the valid ones into products by SKU."""
+        await self.db.execute(CHECK_SQL)
+        previous_categories = list((await self.db.execute(PREVIOUS_CATEGORIES_SQL)).scalars())
+        counts = (await self.db.execute(UPSERT_SQL)).one()
+        reasons = await self.db.execute(
+            text(f"SELECT error, count(*) FROM {STAGING_TABLE}_checked WHERE error IS NOT NULL GROUP BY error")
+        )
+        sample = await self.db.execute(text(f"{REJECTED_SQL} LIMIT :limit"), {"limit": sample_size})
+        rejected_reasons = {reason: count for reason, count in reasons}
+        return {
+            "inserted": counts.inserted,
+            "updated": counts.updated,
+            "rejected": sum(rejected_reasons.values()),
+            "rejected_reasons": rejected_reasons,
+            "rejected_sample": [dict(row) for row in sample.mappings()],
+            "category_ids": sorted(set(counts.category_ids) | set(previous_categories)),
+        }
+
+    async def write_rejected(self, path: str) -> None:
+        """Write every rejected row to ``path`` as CSV, streamed by the database."""
+        connection = await self._driver_connection()
+        await connection.copy_from_query(REJECTED_SQL, output=path, format="csv", header=True)
+
+    async def _driver_connection(self) -> asyncpg.Connection:
+        # COPY is not exposed by SQLAlchemy; the asyncpg connection under the
+        # session runs it inside the same transaction
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        return raw.driver_connection
@@ -1,61 +1,181 @@
-from sqlalchemy.orm import Session
-from src.domain.models.product import Product
-from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import any_, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import with_expression
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.types import Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.domain.models.product import Product, SEARCH_CONFIG
+from src.domain.models.product_stock_shard import ProductStockShard
+from src.infrastructure.pagination import keyset_paginate
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+
+def _shard_stock():
+    # Sharded products keep their stock in product_stock_shards
+    return select(func.coalesce(func.sum(ProductStockShard.quantity), 0)).where(
+        ProductStockShard.product_id == Product.id
+    ).scalar_subquery()
+
+
+def _stock_with_shards():
+    return func.coalesce(Product.stock_quantity, 0) + _shard_stock()
+
+
+def _select_products():
+    return select(Product).options(with_expression(Product.shard_stock, _shard_stock()))
 
 
 class ProductRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create(self, product_data: dict) -> Product:
-        product = Product(**product_data)
+    async def create(self, product_data: dict) -> Product:
+        product = Product(updated_at=None, **product_data)
         self.db.add(product)
-        self.db.commit()
-        self.db.refresh(product)
+        await self.db.flush()
         return product
 
-    def get_by_id(self, product_id: int) -> Optional[Product]:
-        return self.db.query(Product).filter(Product.id == product_id).first()
+    async def get_by_id(self, product_id: int) -> Optional[Product]:
+        return await self.db.scalar(_select_products().where(Product.id == product_id))
 
-    def get_by_sku(self, sku: str) -> Optional[Product]:
-        return self.db.query(Product).filter(Product.sku == sku).first()
+    async def get_by_sku(self, sku: str) -> Optional[Product]:
+        return await self.db.scalar(_select_products().where(Product.sku == sku))
 
-    def get_all(
+    async def get_many(self, product_ids: List[int]) -> List[Product]:
+        """The products among ``product_ids``, in one query and in no particular order."""
+        result = await self.db.scalars(
+            _select_products().where(Product.id == any_(func.cast(list(product_ids), ARRAY(Integer))))
+        )
+        return list(result)
+
+    async def get_all(
         self,
         skip: int = 0,
         limit: int = 100,
-        category_id: Optional[int] = None,
-        is_active: bool = True
+        category_ids: Optional[List[int]] = None,
+        is_active: bool = True,
+        cursor: Optional[str] = None
     ) -> List[Product]:
-        query = self.db.query(Product)
+        query = _select_products()
 
-        if category_id:
-            query = query.filter(Product.category_id == category_id)
+        if category_ids:
+            query = query.where(Product.category_id == any_(func.cast(list(category_ids), ARRAY(Integer))))
 
         if is_active:
-            query = query.filter(Product.is_active == True)
+            query = query.where(Product.is_active == True)
+
+        result = await self.db.scalars(keyset_paginate(query, Product, cursor, skip, limit))
+        return list(result)
+
+    async def get_autocomplete_entries(self) -> List[Tuple[int, str, str]]:
+        result = await self.db.execute(
+            select(Product.id, Product.name, Product.sku).where(Product.is_active == True)
+        )
+        return [tuple(row) for row in result]
+
+    async def stream_for_export(
+        self,
+        chunk_size: int,
+        updated_since: Optional[datetime] = None,
+        category_id: Optional[int] = None,
+        is_active: Optional[bool] = None
+    ) -> AsyncIterator[Sequence[tuple]]:
+        """Export rows in id order, fetched ``chunk_size`` at a time from a server-side cursor.
+
+        Rows follow ``EXPORT_COLUMNS``; the stock of sharded products is the
+        sum of their shards.
+        """
+        stmt = select(
+            Product.id, Product.sku, Product.name, Product.description, Product.price,
+            _stock_with_shards().label("stock_quantity"),
+            Product.category_id, Product.is_active, Product.created_at, Product.updated_at
+        ).order_by(Product.id)
 
-        return query.offset(skip).limit(limit).all()
+        if updated_since:
+            # Matches the ix_products_modified_at expression index
+            stmt = stmt.where(func.coalesce(Product.updated_at, Product.created_at) >= updated_since)
 
-    def update(self, product_id: int, product_data: dict) -> Optional[Product]:
-        product = self.get_by_id(product_id)
+        if category_id:
+            stmt = stmt.where(Product.category_id == category_id)
+
+        if is_active is not None:
+            stmt = stmt.where(Product.is_active == is_active)
+
+        result = await self.db.stream(stmt.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield [tuple(row) for row in rows]
+
+    async def get_facet_rows(self, product_ids: Optional[List[int]] = None) -> List[Tuple[int, int, float, int, bool]]:
+        """``(id, category_id, price, stock_quantity, is_active)`` of ``product_ids``, or of every product."""
+        stmt = select(
+            Product.id, Product.category_id, Product.price, _stock_with_shards(),
+            func.coalesce(Product.is_active, False)
+        )
+        if product_ids is not None:
+            stmt = stmt.where(Product.id == any_(func.cast(list(product_ids), ARRAY(Integer))))
+        result = await self.db.execute(stmt)
+        return [tuple(row) for row in result]
+
+    async def get_pricing(self, product_ids: List[int]) -> Dict[int, Tuple[float, int]]:
+        """Price and category of the active products among ``product_ids``, in one query."""
+        result = await self.db.execute(
+            select(Product.id, Product.price, Product.category_id).where(
+                Product.id == any_(func.cast(list(product_ids), ARRAY(Integer))),
+                Product.is_active == True
+            )
+        )
+        return {product_id: (price, category_id) for product_id, price, category_id in result}
+
+    async def update(self, product_id: int, product_data: dict) -> Optional[Product]:
+        product = await self.get_by_id(product_id)
         if product:
             for key, value in product_data.items():
                 setattr(product, key, value)
-            self.db.commit()
-            self.db.refresh(product)
+            # Flushing refreshes updated_at, which clears the loaded shard_stock
+            shard_stock = product.shard_stock
+            await self.db.flush()
+            set_committed_value(product, "shard_stock", shard_stock)
         return product
 
-    def delete(self, product_id: int) -> bool:
-        product = self.get_by_id(product_id)
+    async def delete(self, product_id: int) -> bool:
+        product = await self.get_by_id(product_id)
         if product:
-            self.db.delete(product)
-            self.db.commit()
+            await self.db.delete(product)
             return True
         return False
 
-    def search(self, query: str, skip: int = 0, limit: int = 20) -> List[Product]:
-        return self.db.query(Product).filter(
-            Product.name.ilike(f"%{query}%") |
-            Product.description.ilike(f"%{query}%")
-        ).offset(skip).limit(limit).all()
\ No newline at end of file
+    async def search(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        is_active: Optional[bool] = None
+    ) -> List[Product]:
+        """Products matching ``query``, best matches first.
+
+        ``query`` uses web search syntax ("quoted phrases", -excluded, or).
+        With ``PRODUCT_SEARCH_MODE=ilike`` this falls back to substring
+        matching on name and description, unranked.
+        """
+        if settings.PRODUCT_SEARCH_MODE == "ilike":
+            stmt = _select_products().where(
+                Product.name.ilike(f"%{query}%") |
+                Product.description.ilike(f"%{query}%")
+            ).order_by(Product.id)
+        else:
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            stmt = _select_products().where(Product.search_vector.op("@@")(ts_query)).order_by(
+                func.ts_rank_cd(Product.search_vector, ts_query).desc(), Product.id
+            )
+
+        if category_id:
+            stmt = stmt.where(Product.category_id == category_id)
+
+        if is_active is not None:
+            stmt = stmt.where(Product.is_active == is_active)
+
+        result = await self.db.scalars(stmt.offset(skip).limit(limit))
+        return list(result)
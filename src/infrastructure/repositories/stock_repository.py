@@ -0,0 +1,310 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.exceptions import InsufficientStockError
+from typing import Dict, List, Optional, Set
+
+# Rows are locked in id order so that concurrent orders over the same
+# products cannot deadlock, then decremented only where enough stock is left.
+RESERVE_SQL = text(
+    """
+    WITH requested AS (
+        SELECT * FROM unnest(CAST(:product_ids AS integer[]), CAST(:quantities AS integer[]))
+            AS r(product_id, quantity)
+    ), locked AS (
+        SELECT p.id FROM products p
+        JOIN requested r ON r.product_id = p.id
+        WHERE NOT p.stock_sharded
+        ORDER BY p.id
+        FOR UPDATE OF p
+    )
+    UPDATE products p
+    SET stock_quantity = p.stock_quantity - r.quantity, updated_at = now()
+    FROM requested r, locked l
+    WHERE p.id = r.product_id AND l.id = p.id AND p.stock_quantity >= r.quantity
+    RETURNING p.id, p.category_id
+    """
+)
+
+RELEASE_SQL = text(
+    """
+    WITH requested AS (
+        SELECT * FROM unnest(CAST(:product_ids AS integer[]), CAST(:quantities AS integer[]))
+            AS r(product_id, quantity)
+    ), locked AS (
+        SELECT p.id FROM products p
+        JOIN requested r ON r.product_id = p.id
+        WHERE NOT p.stock_sharded
+        ORDER BY p.id
+        FOR UPDATE OF p
+    )
+    UPDATE products p
+    SET stock_quantity = p.stock_quantity + r.quantity, updated_at = now()
+    FROM requested r, locked l
+    WHERE p.id = r.product_id AND l.id = p.id
+    RETURNING p.id, p.category_id
+    """
+)
+
+# A random shard that is not locked by another transaction and can cover the
+# whole quantity; concurrent orders on one product spread over the shards.
+RESERVE_SHARD_SQL = text(
+    """
+    UPDATE product_stock_shards s
+    SET quantity = s.quantity - :quantity
+    WHERE (s.product_id, s.shard) = (
+        SELECT product_id, shard FROM product_stock_shards
+        WHERE product_id = :product_id AND quantity >= :quantity
+        ORDER BY random()
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING s.shard
+    """
+)
+
+RELEASE_SHARD_SQL = text(
+    """
+    UPDATE product_stock_shards s
+    SET quantity = s.quantity + :quantity
+    WHERE (s.product_id, s.shard) = (
+        SELECT product_id, shard FROM product_stock_shards
+        WHERE product_id = :product_id
+        ORDER BY random()
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING s.shard
+    """
+)
+
+
+# Shard updates leave the product row alone; this marks the product as
+# changed once the transaction is about to commit, in id order like above.
+TOUCH_SQL = text(
+    """
+    WITH locked AS (
+        SELECT id FROM products
+        WHERE id = ANY(CAST(:product_ids AS integer[]))
+        ORDER BY id
+        -- The order's items already hold KEY SHARE locks on these rows
+        FOR NO KEY UPDATE
+    )
+    UPDATE products p
+    SET updated_at = now()
+    FROM locked l
+    WHERE p.id = l.id
+    """
+)
+
+
+def _sum_quantities(items: List[dict]) -> Dict[int, int]:
+    quantities: Dict[int, int] = {}
+    for item in items:
+        quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+    return quantities
+
+
+class StockRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # Products whose stock this transaction changed, and their categories
+        self.changed_product_ids: Set[int] = set()
+        self.changed_category_ids: Set[int] = set()
+        # Sharded products among them, whose updated_at is bumped by touch_sharded
+        self.sharded_product_ids: Set[int] = set()
+
+    async def reserve(self, items: List[dict]) -> None:
+        """Take stock for ``items`` (dicts with product_id and quantity).
+
+        Regular products are decremented by one conditional UPDATE; sharded
+        products take their quantity from a single shard. Raises
+        ``InsufficientStockError`` if any product is short, leaving the
+        caller's transaction to roll back the partial reservation.
+        """
+        quantities = _sum_quantities(items)
+        if not quantities:
+            return
+        self.changed_product_ids.update(quantities)
+        reserved = self._track(await self.db.execute(RESERVE_SQL, self._params(quantities)))
+
+        remaining = {pid: qty for pid, qty in quantities.items() if pid not in reserved}
+        if not remaining:
+            return
+        sharded = await self._sharded_ids(remaining)
+        short = [pid for pid in remaining if pid not in sharded]
+        if short:
+            raise InsufficientStockError(short)
+        self.sharded_product_ids.update(sharded)
+        for product_id in sorted(sharded):
+            if not await self._reserve_from_shards(product_id, remaining[product_id]):
+                short.append(product_id)
+        if short:
+            raise InsufficientStockError(short)
+
+    async def release(self, items: List[dict]) -> None:
+        """Put the stock of ``items`` back, e.g. when an order is cancelled."""
+        quantities = _sum_quantities(items)
+        if not quantities:
+            return
+        self.changed_product_ids.update(quantities)
+        released = self._track(await self.db.execute(RELEASE_SQL, self._params(quantities)))
+
+        remaining = {pid: qty for pid, qty in quantities.items() if pid not in released}
+        if not remaining:
+            return
+        sharded = await self._sharded_ids(remaining)
+        self.sharded_product_ids.update(sharded)
+        for product_id in sorted(sharded):
+            params = {'product_id': product_id, 'quantity': remaining[product_id]}
+            shard = (await self.db.execute(RELEASE_SHARD_SQL, params)).scalar()
+            if shard is None:
+                # Every shard is locked by an in-flight order; wait for one
+                await self.db.execute(
+                    text(
+                        "UPDATE product_stock_shards SET quantity = quantity + :quantity "
+                        "WHERE product_id = :product_id "
+                        "AND shard = (SELECT min(shard) FROM product_stock_shards WHERE product_id = :product_id)"
+                    ),
+                    params,
+                )
+
+    async def touch_sharded(self) -> None:
+        """Bump ``updated_at`` of the sharded products whose shards changed.
+
+        Called right before commit, so the product row lock is held only for
+        the commit itself and concurrent orders still spread over the shards.
+        """
+        if not self.sharded_product_ids:
+            return
+        await self.db.execute(TOUCH_SQL, {'product_ids': sorted(self.sharded_product_ids)})
+        self.sharded_product_ids.clear()
+
+    async def get_stock(self, product_id: int) -> Optional[dict]:
+        result = await self.db.execute(
+            text(
+                "SELECT p.stock_sharded, p.stock_quantity, "
+                "coalesce(array_agg(s.quantity ORDER BY s.shard) FILTER (WHERE s.shard IS NOT NULL), '{}') "
+                "FROM products p LEFT JOIN product_stock_shards s ON s.product_id = p.id "
+                "WHERE p.id = :product_id GROUP BY p.id"
+            ),
+            {'product_id': product_id},
+        )
+        row = result.first()
+        if row is None:
+            return None
+        sharded, stock_quantity, shards = row
+        return {
+            'product_id': product_id,
+            'sharded': sharded,
+            'stock_quantity': stock_quantity + sum(shards),
+            'shards': list(shards),
+        }
+
+    async def enable_sharding(self, product_id: int, shard_count: int) -> Optional[dict]:
+        """Move a product's stock into ``shard_count`` evenly filled shards."""
+        total = await self._collect_stock(product_id)
+        if total is None:
+            return None
+        base, extra = divmod(total, shard_count)
+        await self.db.execute(
+            text(
+                "INSERT INTO product_stock_shards (product_id, shard, quantity) "
+                "SELECT :product_id, shard, :base + CASE WHEN shard < :extra THEN 1 ELSE 0 END "
+                "FROM generate_series(0, :shard_count - 1) AS shard"
+            ),
+            {'product_id': product_id, 'base': base, 'extra': extra, 'shard_count': shard_count},
+        )
+        await self.db.execute(
+            text(
+                "UPDATE products SET stock_sharded = true, stock_quantity = 0, updated_at = now() "
+                "WHERE id = :product_id"
+            ),
+            {'product_id': product_id},
+        )
+        return await self.get_stock(product_id)
+
+    async def disable_sharding(self, product_id: int) -> Optional[dict]:
+        """Fold a product's shards back into ``products.stock_quantity``."""
+        total = await self._collect_stock(product_id)
+        if total is None:
+            return None
+        await self.db.execute(
+            text(
+                "UPDATE products SET stock_sharded = false, stock_quantity = :total, updated_at = now() "
+                "WHERE id = :product_id"
+            ),
+            {'product_id': product_id, 'total': total},
+        )
+        return await self.get_stock(product_id)
+
+    async def _collect_stock(self, product_id: int) -> Optional[int]:
+        self.changed_product_ids.add(product_id)
+        # Locking the product row serializes re-sharding against itself
+        row = (await self.db.execute(
+            text("SELECT stock_quantity, category_id FROM products WHERE id = :product_id FOR UPDATE"),
+            {'product_id': product_id},
+        )).first()
+        if row is None:
+            return None
+        stock, category_id = row
+        self.changed_category_ids.add(category_id)
+        shard_total = (await self.db.execute(
+            text(
+                "WITH deleted AS (DELETE FROM product_stock_shards WHERE product_id = :product_id "
+                "RETURNING quantity) SELECT coalesce(sum(quantity), 0) FROM deleted"
+            ),
+            {'product_id': product_id},
+        )).scalar()
+        return (stock or 0) + shard_total
+
+    async def _sharded_ids(self, quantities: Dict[int, int]) -> Set[int]:
+        return self._track(await self.db.execute(
+            text(
+                "SELECT id, category_id FROM products "
+                "WHERE id = ANY(CAST(:product_ids AS integer[])) AND stock_sharded"
+            ),
+            {'product_ids': list(quantities)},
+        ))
+
+    def _track(self, result) -> Set[int]:
+        """Product ids of ``(id, category_id)`` rows, noting their categories as changed."""
+        product_ids = set()
+        for product_id, category_id in result:
+            product_ids.add(product_id)
+            self.changed_category_ids.add(category_id)
+        return product_ids
+
+    async def _reserve_from_shards(self, product_id: int, quantity: int) -> bool:
+        params = {'product_id': product_id, 'quantity': quantity}
+        if (await self.db.execute(RESERVE_SHARD_SQL, params)).scalar() is not None:
+            return True
+        # No single free shard can cover the quantity: lock them all and
+        # drain them in order
+        result = await self.db.execute(
+            text(
+                "SELECT shard, quantity FROM product_stock_shards "
+                "WHERE product_id = :product_id ORDER BY shard FOR UPDATE"
+            ),
+            {'product_id': product_id},
+        )
+        shards = result.all()
+        if sum(available for _, available in shards) < quantity:
+            return False
+        for shard, available in shards:
+            taken = min(available, quantity)
+            if taken:
+                await self.db.execute(
+                    text(
+                        "UPDATE product_stock_shards SET quantity = quantity - :taken "
+                        "WHERE product_id = :product_id AND shard = :shard"
+                    ),
+                    {'product_id': product_id, 'shard': shard, 'taken': taken},
+                )
+                quantity -= taken
+            if not quantity:
+                break
+        return True
+
+    @staticmethod
+    def _params(quantities: Dict[int, int]) -> dict:
+        return {'product_ids': list(quantities), 'quantities': list(quantities.values())}
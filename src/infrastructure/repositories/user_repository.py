@@ -1,58 +1,58 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.models.user import User
+from src.infrastructure.pagination import keyset_paginate
 from typing import List, Optional
 
 
 class UserRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create(self, user_data: dict) -> User:
-        user = User(**user_data)
+    async def create(self, user_data: dict) -> User:
+        user = User(updated_at=None, **user_data)
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.flush()
         return user
 
-    def get_by_id(self, user_id: int) -> Optional[User]:
-        return self.db.query(User).filter(User.id == user_id).first()
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.id == user_id))
 
-    def get_by_email(self, email: str) -> Optional[User]:
-        return self.db.query(User).filter(User.email == email).first()
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.email == email))
 
-    def get_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(User).filter(User.username == username).first()
+    async def get_by_username(self, username: str) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.username == username))
 
-    def get_all(
+    async def get_all(
         self,
         skip: int = 0,
         limit: int = 100,
         role: Optional[str] = None,
-        is_active: bool = True
+        is_active: bool = True,
+        cursor: Optional[str] = None
     ) -> List[User]:
-        query = self.db.query(User)
+        query = select(User)
 
         if role:
-            query = query.filter(User.role == role)
+            query = query.where(User.role == role)
 
         if is_active:
-            query = query.filter(User.is_active == True)
+            query = query.where(User.is_active == True)
 
-        return query.offset(skip).limit(limit).all()
+        result = await self.db.scalars(keyset_paginate(query, User, cursor, skip, limit))
+        return list(result)
 
-    def update(self, user_id: int, user_data: dict) -> Optional[User]:
-        user = self.get_by_id(user_id)
+    async def update(self, user_id: int, user_data: dict) -> Optional[User]:
+        user = await self.get_by_id(user_id)
         if user:
             for key, value in user_data.items():
                 setattr(user, key, value)
-            self.db.commit()
-            self.db.refresh(user)
         return user
 
-    def delete(self, user_id: int) -> bool:
-        user = self.get_by_id(user_id)
+    async def delete(self, user_id: int) -> bool:
+        user = await self.get_by_id(user_id)
         if user:
-            self.db.delete(user)
-            self.db.commit()
+            await self.db.delete(user)
             return True
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from src.core.config import settings
+from src.infrastructure.cache import MISSING, TTLCache
+from src.infrastructure.category_tree import category_tree
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+def make_key(namespace: str, version: int, params: dict) -> str:
+    """Cache key for ``params`` under ``version``; a version bump orphans older keys."""
+    return f"{namespace}:v{version}:{json.dumps(params, sort_keys=True, default=str, separators=(',', ':'))}"
+
+
+class _SingleFlight:
+    """Coalesces concurrent loads of one key within this process."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _coalesce(self, key: str, load: Loader) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(load())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so that one cancelled caller does not cancel the load for the others
+        return await asyncio.shield(future)
+
+
+class MemoryResultCache(_SingleFlight):
+    """Per-process cache; each worker computes and invalidates on its own."""
+
+    def __init__(self, ttl: float, maxsize: int = 4096):
+        super().__init__()
+        self._data = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._versions: Dict[str, int] = {}
+
+    async def get_version(self, scope: str) -> int:
+        return self._versions.get(scope, 0)
+
+    async def bump(self, *scopes: str):
+        for scope in scopes:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    async def get(self, key: str) -> Any:
+        """The cached value of ``key``, or ``MISSING``; never loads it."""
+        return self._data.get(key)
+
+    async def get_or_load(self, key: str, loader: Loader) -> Any:
+        value = self._data.get(key)
+        if value is not MISSING:
+            return value
+        return await self._coalesce(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: str, loader: Loader) -> Any:
+        value = await loader()
+        self._data.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return self._data.stats()
+
+    async def close(self):
+        pass
+
+
+class RedisResultCache(_SingleFlight):
+    """Shared across workers; versions are Redis counters, values JSON with a TTL.
+
+    On a miss one worker takes a short lock on the key and computes it. The
+    others poll for the value and only compute it themselves if the lock
+    holder has not finished within ``lock_timeout``.
+    """
+
+    poll_interval = 0.02
+
+    def __init__(self, url: str, ttl: float, lock_timeout: float, prefix: str = "results:"):
+        from redis import asyncio as redis
+
+        super().__init__()
+        self.redis = redis.from_url(url)
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def get_version(self, scope: str) -> int:
+        return int(await self.redis.get(f"{self.prefix}version:{scope}") or 0)
+
+    async def bump(self, *scopes: str):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"{self.prefix}version:{scope}")
+            await pipe.execute()
+
+    async def get(self, key: str) -> Any:
+        """The cached value of ``key``, or ``MISSING``; never loads it."""
+        value = await self._get(key)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def get_or_load(self, key: str, loader: Loader) -> Any:
+        value = await self.get(key)
+        if value is not MISSING:
+            return value
+        return await self._coalesce(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: str, loader: Loader) -> Any:
+        lock_key = f"{self.prefix}lock:{key}"
+        deadline = time.monotonic() + self.lock_timeout
+        while not await self.redis.set(lock_key, 1, nx=True, px=int(self.lock_timeout * 1000)):
+            await asyncio.sleep(self.poll_interval)
+            value = await self._get(key)
+            if value is not MISSING:
+                return value
+            if time.monotonic() >= deadline:
+                return await loader()
+        try:
+            value = await loader()
+            await self.redis.set(self.prefix + key, json.dumps(value), px=int(self.ttl * 1000))
+        finally:
+            await self.redis.delete(lock_key)
+        return value
+
+    async def _get(self, key: str) -> Any:
+        raw = await self.redis.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_result_cache(backend: Optional[str] = None):
+    if (backend or settings.RESULT_CACHE_BACKEND) == "redis":
+        return RedisResultCache(
+            settings.REDIS_URL,
+            ttl=settings.RESULT_CACHE_TTL_SECONDS,
+            lock_timeout=settings.RESULT_CACHE_LOCK_TIMEOUT_SECONDS,
+        )
+    return MemoryResultCache(ttl=settings.RESULT_CACHE_TTL_SECONDS)
+
+
+result_cache = create_result_cache()
+
+
+def product_list_scope(category_id: Optional[int]) -> str:
+    # Filtered pages depend only on their category, the rest on the whole catalog
+    return f"category:{category_id}" if category_id else "catalog"
+
+
+async def product_lists_changed(*category_ids: int) -> None:
+    # Pages that include subcategories are scoped to an ancestor of the change
+    await result_cache.bump(product_list_scope(None), *{
+        product_list_scope(ancestor_id)
+        for category_id in category_ids
+        for ancestor_id in category_tree.ancestors(category_id)
+    })
@@ -0,0 +1,28 @@
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List
+from src.infrastructure.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_EVENT_TASK = "events.dispatch"
+
+_subscribers: Dict[str, List[Callable[[dict], None]]] = defaultdict(list)
+
+
+def subscribe(event_type: str):
+    """Register the decorated function to run in the worker for ``event_type``."""
+    def register(func: Callable[[dict], None]):
+        _subscribers[event_type].append(func)
+        return func
+    return register
+
+
+@celery_app.task(name=DISPATCH_EVENT_TASK, bind=True, max_retries=5, default_retry_delay=10)
+def dispatch_event(self, event_type: str, payload: dict):
+    logger.info("Dispatching %s to %d subscriber(s)", event_type, len(_subscribers[event_type]))
+    try:
+        for subscriber in _subscribers[event_type]:
+            subscriber(payload)
+    except Exception as exc:
+        raise self.retry(exc=exc)
@@ -0,0 +1,75 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infrastructure.database import get_db, replica_set
+from src.infrastructure.entity_cache import invalidate_products, note_commit
+from src.infrastructure.facets import facet_index
+from src.infrastructure.replicas import current_wal_lsn, parse_lsn
+from src.infrastructure.result_cache import product_lists_changed
+from src.infrastructure.repositories.category_repository import CategoryRepository
+from src.infrastructure.repositories.order_repository import OrderRepository
+from src.infrastructure.repositories.order_summary_repository import OrderSummaryRepository
+from src.infrastructure.repositories.outbox_repository import OutboxRepository
+from src.infrastructure.repositories.product_import_repository import ProductImportRepository
+from src.infrastructure.repositories.product_repository import ProductRepository
+from src.infrastructure.repositories.stock_repository import StockRepository
+from src.infrastructure.repositories.user_repository import UserRepository
+
+
+class UnitOfWork:
+    """Transaction boundary for one command.
+
+    Repositories only stage changes on the shared session; the handler
+    calls ``commit`` once when the whole command has succeeded. Leaving the
+    ``async with`` block through an exception rolls everything back.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.products = ProductRepository(session)
+        self.product_imports = ProductImportRepository(session)
+        self.categories = CategoryRepository(session)
+        self.users = UserRepository(session)
+        self.orders = OrderRepository(session)
+        self.order_summaries = OrderSummaryRepository(session)
+        self.stock = StockRepository(session)
+        self.outbox = OutboxRepository(session)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            await self.rollback()
+
+    async def flush(self):
+        await self.session.flush()
+
+    async def commit(self):
+        # Sharded stock changes only touch shard rows until now
+        await self.stock.touch_sharded()
+        await self.session.commit()
+        if replica_set.replicas:
+            # Replicas behind this position must not refill the entity caches;
+            # ReadYourWritesMiddleware also returns it to the client
+            lsn = await current_wal_lsn(self.session)
+            self.session.info["commit_lsn"] = lsn
+            note_commit(parse_lsn(lsn))
+        # Cached products, list pages and the in-stock facet depend on stock levels
+        if self.stock.changed_product_ids:
+            invalidate_products(self.stock.changed_product_ids)
+            facet_index.mark_stale(self.stock.changed_product_ids)
+            await product_lists_changed(*self.stock.changed_category_ids)
+        self._clear_stock_changes()
+
+    async def rollback(self):
+        await self.session.rollback()
+        self._clear_stock_changes()
+
+    def _clear_stock_changes(self):
+        self.stock.changed_product_ids.clear()
+        self.stock.changed_category_ids.clear()
+        self.stock.sharded_product_ids.clear()
+
+
+async def get_uow(db: AsyncSession = Depends(get_db)) -> UnitOfWork:
+    return UnitOfWork(db)
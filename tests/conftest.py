@@ -0,0 +1,60 @@
+import uuid
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.core.config import settings
+from src.domain.models import Category, Product, User
+from src.infrastructure.database import Base, create_session_factory
+from src.infrastructure.partitions import ensure_monthly_partitions
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """Engine on the configured DATABASE_URL, with the schema created.
+
+    Tests that need it are skipped when no database is reachable.
+    """
+    engine = create_async_engine(settings.async_database_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await ensure_monthly_partitions(conn, settings.ORDER_PARTITION_MONTHS_AHEAD)
+    except (OSError, ConnectionError) as e:
+        await engine.dispose()
+        pytest.skip(f"database not available: {e}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(engine):
+    async with create_session_factory(engine)() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def product(db):
+    """A product in a category of its own, committed."""
+    suffix = uuid.uuid4().hex[:12]
+    category = Category(name=f"Category {suffix}", slug=f"category-{suffix}", path="")
+    db.add(category)
+    await db.flush()
+    product = Product(
+        name=f"Product {suffix}", price=10.0, stock_quantity=1000,
+        sku=f"SKU-{suffix}", category_id=category.id
+    )
+    db.add(product)
+    await db.commit()
+    return product
+
+
+@pytest_asyncio.fixture
+async def user(db):
+    suffix = uuid.uuid4().hex[:12]
+    user = User(
+        email=f"{suffix}@example.com", username=f"user_{suffix}",
+        full_name="Test User", hashed_password="x"
+    )
+    db.add(user)
+    await db.commit()
+    return user
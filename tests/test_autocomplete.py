@@ -0,0 +1,96 @@
+import pytest
+from src.infrastructure.autocomplete import AutocompleteIndex, Suggestion, normalize
+
+PRODUCTS = [
+    (1, "Wireless Headphones", "WH-100"),
+    (2, "Headphone Stand", "HS-200"),
+    (3, "Head Torch", "HT-300"),
+    (4, "Desk Lamp", "DL-400"),
+]
+
+
+@pytest.fixture
+def index():
+    index = AutocompleteIndex()
+    index.rebuild(PRODUCTS, popularity={1: 5, 2: 50, 3: 5})
+    return index
+
+
+def ids(suggestions):
+    return [suggestion.id for suggestion in suggestions]
+
+
+def test_normalize_folds_case_and_whitespace():
+    assert normalize("  Wireless\tHEADPHONES ") == "wireless headphones"
+
+
+def test_lookup_orders_by_popularity_then_name_length(index):
+    # 2 sold most; 1 and 3 tie on popularity and the shorter name wins
+    assert ids(index.lookup("head")) == [2, 3, 1]
+
+
+def test_lookup_matches_from_any_word_and_sku(index):
+    assert ids(index.lookup("lamp")) == [4]
+    assert ids(index.lookup("dl-4")) == [4]
+    assert ids(index.lookup("wireless head")) == [1]
+
+
+def test_lookup_is_case_and_space_insensitive(index):
+    assert ids(index.lookup("  HEAD   TO")) == [3]
+
+
+def test_lookup_respects_limit(index):
+    assert ids(index.lookup("head", limit=2)) == [2, 3]
+
+
+def test_lookup_with_no_match_or_empty_prefix(index):
+    assert index.lookup("zzz") == []
+    assert index.lookup("   ") == []
+
+
+def test_a_product_matching_several_keys_is_returned_once(index):
+    index.upsert(5, "Head Head", "HEAD-1")
+    assert ids(index.lookup("head")).count(5) == 1
+
+
+def test_upsert_adds_a_product(index):
+    index.upsert(5, "Desk Organizer", "DO-500")
+    assert len(index) == 5
+    assert index.lookup("desk o") == [Suggestion(5, "Desk Organizer", "DO-500")]
+
+
+def test_upsert_replaces_the_old_keys(index):
+    index.upsert(4, "Floor Lamp", "FL-400")
+    assert ids(index.lookup("desk")) == []
+    assert ids(index.lookup("dl")) == []
+    assert index.lookup("floor") == [Suggestion(4, "Floor Lamp", "FL-400")]
+    assert len(index) == 4
+
+
+def test_remove_drops_every_key(index):
+    index.remove(2)
+    assert ids(index.lookup("head")) == [3, 1]
+    assert ids(index.lookup("stand")) == []
+    assert ids(index.lookup("hs")) == []
+    assert len(index) == 3
+
+
+def test_remove_unknown_product_is_a_no_op(index):
+    index.remove(99)
+    assert len(index) == 4
+
+
+def test_cached_short_prefixes_see_later_changes(index):
+    # Two-character prefixes are cached; changes must invalidate them
+    assert ids(index.lookup("he")) == [2, 3, 1]
+    index.remove(3)
+    assert ids(index.lookup("he")) == [2, 1]
+    index.upsert(6, "Hex Keys", "HK-600")
+    assert ids(index.lookup("he")) == [2, 1, 6]
+
+
+def test_rebuild_replaces_everything(index):
+    index.rebuild([(7, "Kettle", "KT-700")], popularity={})
+    assert len(index) == 1
+    assert index.lookup("head") == []
+    assert ids(index.lookup("ke")) == [7]
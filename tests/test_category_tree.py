@@ -0,0 +1,188 @@
+from datetime import datetime, timezone
+import pytest
+from src.application.commands.category_commands import UpdateCategoryCommand
+from src.application.handlers import category_handlers
+from src.application.handlers.category_handlers import UpdateCategoryHandler
+from src.domain.models.category import Category
+from src.infrastructure.category_tree import CategoryNode, CategoryTree, category_tree, path_ids
+
+NODES = [
+    CategoryNode(1, "Electronics", "electronics", None, "1/"),
+    CategoryNode(2, "Audio", "audio", 1, "1/2/"),
+    CategoryNode(3, "Headphones", "headphones", 2, "1/2/3/"),
+    CategoryNode(4, "Computers", "computers", 1, "1/4/"),
+    CategoryNode(5, "home", "home", None, "5/"),
+    # Its path starts with the same digit as category 1's
+    CategoryNode(12, "Garden", "garden", None, "12/"),
+]
+
+
+class FakeCategories:
+    """In-memory stand-in for CategoryRepository."""
+
+    def __init__(self, nodes):
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.rows = {
+            node.id: Category(
+                id=node.id, name=node.name, slug=node.slug, parent_id=node.parent_id,
+                path=node.path, created_at=created_at, updated_at=None
+            )
+            for node in nodes
+        }
+
+    async def get_by_id(self, category_id):
+        return self.rows.get(category_id)
+
+    async def get_by_slug(self, slug):
+        return next((row for row in self.rows.values() if row.slug == slug), None)
+
+    async def move(self, category, parent):
+        old_path = category.path
+        new_path = f"{parent.path if parent else ''}{category.id}/"
+        for row in self.rows.values():
+            if row.path.startswith(old_path):
+                row.path = new_path + row.path[len(old_path):]
+        category.parent_id = parent.id if parent else None
+
+    async def update(self, category_id, category_data):
+        category = self.rows.get(category_id)
+        for key, value in category_data.items():
+            setattr(category, key, value)
+        return category
+
+
+class FakeSession:
+    """Answers the tree rebuild's query from the fake repository."""
+
+    def __init__(self, categories):
+        self.categories = categories
+
+    async def execute(self, statement):
+        return [(row.id, row.name, row.slug, row.parent_id, row.path) for row in self.categories.rows.values()]
+
+
+class FakeUnitOfWork:
+    def __init__(self, nodes):
+        self.categories = FakeCategories(nodes)
+        self.session = FakeSession(self.categories)
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def tree():
+    tree = CategoryTree()
+    tree.rebuild(NODES)
+    return tree
+
+
+@pytest.fixture
+def changed_lists(monkeypatch):
+    changed = []
+
+    async def product_lists_changed(*category_ids):
+        changed.extend(category_ids)
+
+    monkeypatch.setattr(category_handlers, "product_lists_changed", product_lists_changed)
+    yield changed
+    category_tree.rebuild([])
+
+
+async def move(category_id, parent_id):
+    uow = FakeUnitOfWork(NODES)
+    await UpdateCategoryHandler(uow).handle(category_id, UpdateCategoryCommand(parent_id=parent_id))
+    return uow
+
+
+def test_path_ids():
+    assert path_ids("1/2/3/") == [1, 2, 3]
+    assert path_ids("") == []
+
+
+def test_descendants_are_the_subtree(tree):
+    assert tree.descendants(1) == [1, 2, 3, 4]
+    assert tree.descendants(2) == [2, 3]
+    assert tree.descendants(3) == [3]
+    assert tree.descendants(12) == [12]
+
+
+def test_descendants_of_unknown_or_pathless_categories(tree):
+    assert tree.descendants(99) == [99]
+    tree.rebuild(NODES + [CategoryNode(7, "Pending", "pending", None, "")])
+    assert tree.descendants(7) == [7]
+    assert tree.descendants(1) == [1, 2, 3, 4]
+
+
+def test_ancestors_are_root_first(tree):
+    assert tree.ancestors(3) == [1, 2, 3]
+    assert tree.ancestors(5) == [5]
+    assert tree.ancestors(99) == [99]
+
+
+def test_tree_nests_children_sorted_by_name(tree):
+    roots = tree.tree()
+    assert [root["id"] for root in roots] == [1, 12, 5]
+    assert [child["id"] for child in roots[0]["children"]] == [2, 4]
+    assert roots[0]["children"][0]["children"][0]["slug"] == "headphones"
+    assert len(tree) == len(NODES)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("category_id, parent_id", [(2, 2), (1, 2), (1, 3)])
+async def test_move_under_own_subtree_is_rejected(changed_lists, category_id, parent_id):
+    uow = FakeUnitOfWork(NODES)
+    with pytest.raises(ValueError, match="cannot be moved under itself"):
+        await UpdateCategoryHandler(uow).handle(category_id, UpdateCategoryCommand(parent_id=parent_id))
+    assert not uow.committed
+    assert uow.categories.rows[3].path == "1/2/3/"
+    assert changed_lists == []
+
+
+@pytest.mark.asyncio
+async def test_move_under_unknown_parent_is_rejected(changed_lists):
+    with pytest.raises(ValueError, match="not found"):
+        await move(2, 99)
+
+
+@pytest.mark.asyncio
+async def test_move_rewrites_the_subtree(changed_lists):
+    uow = await move(2, 5)
+    assert uow.committed
+    assert uow.categories.rows[2].parent_id == 5
+    assert uow.categories.rows[3].path == "5/2/3/"
+    assert category_tree.descendants(5) == [5, 2, 3]
+    assert category_tree.descendants(1) == [1, 4]
+    assert category_tree.ancestors(3) == [5, 2, 3]
+    # List pages of the old and the new ancestors change
+    assert sorted(set(changed_lists)) == [1, 2, 5]
+
+
+@pytest.mark.asyncio
+async def test_move_to_root(changed_lists):
+    await move(3, None)
+    assert category_tree.ancestors(3) == [3]
+    assert category_tree.descendants(1) == [1, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_move_next_to_a_path_prefix_is_allowed(changed_lists):
+    # "12/" starts like "1/" but is not in its subtree
+    await move(1, 12)
+    assert category_tree.descendants(12) == [12, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_update_without_parent_does_not_move(changed_lists):
+    uow = FakeUnitOfWork(NODES)
+    await UpdateCategoryHandler(uow).handle(2, UpdateCategoryCommand(name="Sound"))
+    assert uow.categories.rows[2].name == "Sound"
+    assert category_tree.ancestors(3) == [1, 2, 3]
+    assert changed_lists == []
@@ -0,0 +1,124 @@
+import pytest
+from src.infrastructure.facets import FacetIndex
+
+# (id, category_id, price, stock_quantity, is_active)
+ROWS = [
+    (1, 10, 20.0, 5, True),
+    (2, 10, 60.0, 0, True),
+    (3, 20, 120.0, 3, True),
+    (4, 20, 40.0, 0, True),
+    (5, 10, 30.0, 2, False),
+]
+
+
+@pytest.fixture
+def index():
+    index = FacetIndex([0, 50, 100])
+    index.rebuild(ROWS)
+    return index
+
+
+def test_unfiltered_search_counts_active_products(index):
+    result = index.search()
+    assert result.ids.tolist() == [1, 2, 3, 4]
+    assert result.categories == {10: 2, 20: 2}
+    assert result.price_buckets == [2, 1, 1]
+    assert result.in_stock == 2
+
+
+def test_category_counts_ignore_the_category_filter(index):
+    result = index.search(category_ids=[10])
+    assert result.ids.tolist() == [1, 2]
+    assert result.categories == {10: 2, 20: 2}
+    assert result.price_buckets == [1, 1, 0]
+    assert result.in_stock == 1
+
+
+def test_several_categories_are_a_union(index):
+    assert index.search(category_ids=[10, 20]).ids.tolist() == [1, 2, 3, 4]
+    assert index.search(category_ids=[99]).ids.tolist() == []
+
+
+def test_price_counts_ignore_the_price_filter(index):
+    result = index.search(min_price=30, max_price=100)
+    assert result.ids.tolist() == [2, 4]
+    assert result.categories == {10: 1, 20: 1}
+    assert result.price_buckets == [2, 1, 1]
+    assert result.in_stock == 0
+
+
+def test_price_bounds_are_inclusive(index):
+    assert index.search(min_price=40, max_price=60).ids.tolist() == [2, 4]
+
+
+def test_stock_counts_ignore_the_stock_filter(index):
+    result = index.search(category_ids=[10], in_stock=True)
+    assert result.ids.tolist() == [1]
+    assert result.categories == {10: 1, 20: 1}
+    assert result.price_buckets == [1, 0, 0]
+    assert result.in_stock == 1
+
+
+def test_active_filter(index):
+    assert index.search(is_active=False).ids.tolist() == [5]
+    assert index.search(is_active=None).ids.tolist() == [1, 2, 3, 4, 5]
+    assert len(index) == 5
+
+
+def test_prices_below_the_first_bound_count_in_the_first_bucket():
+    index = FacetIndex([10, 50])
+    index.rebuild([(1, 1, 5.0, 1, True), (2, 1, 10.0, 1, True), (3, 1, 75.0, 1, True)])
+    assert index.search().price_buckets == [2, 1]
+
+
+def test_take_stale_returns_each_id_once():
+    index = FacetIndex([0])
+    index.mark_stale([3, 1])
+    index.mark_stale([3])
+    assert index.take_stale() == [1, 3]
+    assert index.take_stale() == []
+
+
+def test_refresh_updates_removes_and_adds(index):
+    index.refresh([2, 4, 6], [(2, 20, 150.0, 4, True), (6, 10, 10.0, 1, True)])
+    result = index.search()
+    assert result.ids.tolist() == [1, 2, 3, 6]
+    assert result.categories == {10: 2, 20: 2}
+    assert result.price_buckets == [2, 0, 2]
+    assert result.in_stock == 4
+    assert index.search(category_ids=[20]).ids.tolist() == [2, 3]
+    assert len(index) == 5
+
+
+def test_emptied_categories_drop_out_of_the_counts(index):
+    index.refresh([3, 4], [(3, 10, 120.0, 3, True), (4, 10, 40.0, 0, True)])
+    assert index.search().categories == {10: 4}
+
+
+def test_refresh_keeps_results_in_id_order(index):
+    index.refresh([0], [(0, 10, 15.0, 1, True)])
+    assert index.search().ids.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_refresh_grows_an_empty_index():
+    index = FacetIndex([0, 20])
+    rows = [(product_id, product_id % 3, float(product_id), product_id % 2, True) for product_id in range(1, 41)]
+    index.refresh([row[0] for row in rows], rows)
+    result = index.search(category_ids=[0], in_stock=True)
+    assert len(index) == 40
+    assert result.ids.tolist() == [3, 9, 15, 21, 27, 33, 39]
+    assert result.categories == {0: 7, 1: 7, 2: 6}
+    assert result.price_buckets == [3, 4]
+
+
+def test_refresh_matches_a_rebuild(index):
+    rows = [(1, 20, 80.0, 0, True), (3, 10, 5.0, 1, True), (7, 30, 55.0, 9, True)]
+    index.refresh([1, 3, 5, 7], rows)
+    rebuilt = FacetIndex([0, 50, 100])
+    rebuilt.rebuild([(2, 10, 60.0, 0, True), (4, 20, 40.0, 0, True)] + rows)
+    for filters in ({}, {"category_ids": [10]}, {"min_price": 50}, {"in_stock": True}):
+        refreshed, expected = index.search(**filters), rebuilt.search(**filters)
+        assert refreshed.ids.tolist() == expected.ids.tolist()
+        assert refreshed.categories == expected.categories
+        assert refreshed.price_buckets == expected.price_buckets
+        assert refreshed.in_stock == expected.in_stock
@@ -0,0 +1,204 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from src.api import middleware
+from src.api.middleware import IDEMPOTENCY_KEY_HEADER, IDEMPOTENT_REPLAY_HEADER, IdempotencyMiddleware, _read_body
+from src.core.config import settings
+from src.infrastructure import idempotency
+from src.infrastructure.idempotency import DONE, PENDING, MemoryIdempotencyStore
+
+BODY_LIMIT = 10
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(idempotency, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def store(clock):
+    return MemoryIdempotencyStore(ttl=100, lock_timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_claim_then_duplicate_sees_pending(store):
+    assert await store.claim("a", "f1") is None
+    assert await store.claim("a", "f2") == {"state": PENDING, "fingerprint": "f1"}
+
+
+@pytest.mark.asyncio
+async def test_completed_record_is_returned(store):
+    await store.claim("a", "f1")
+    await store.complete("a", {"fingerprint": "f1", "status": 201, "headers": [], "body": b"{}"})
+    record = await store.claim("a", "f1")
+    assert record["state"] == DONE
+    assert record["status"] == 201
+
+
+@pytest.mark.asyncio
+async def test_claims_expire_in_order(store, clock):
+    await store.claim("a", "f")
+    clock.now += 2
+    await store.claim("b", "f")
+    clock.now += 4
+    # "a" expired at +5, "b" expires at +7
+    assert await store.claim("a", "f") is None
+    assert (await store.claim("b", "f"))["state"] == PENDING
+    clock.now += 2
+    assert await store.claim("b", "f") is None
+
+
+@pytest.mark.asyncio
+async def test_completed_record_outlives_its_claim(store, clock):
+    await store.claim("a", "f")
+    clock.now += 1
+    await store.complete("a", {"fingerprint": "f", "status": 200, "headers": [], "body": b""})
+    # The claim's expiry entry comes up first and must not drop the response
+    clock.now += 10
+    assert (await store.claim("a", "f"))["state"] == DONE
+    clock.now += 91
+    assert await store.claim("a", "f") is None
+
+
+@pytest.mark.asyncio
+async def test_stale_expiry_does_not_drop_a_newer_claim(store, clock):
+    await store.claim("a", "f")
+    await store.release("a")
+    clock.now += 4
+    await store.claim("a", "f")
+    # The first claim's entry (+5) comes up; the new claim lasts until +9
+    clock.now += 2
+    assert (await store.claim("a", "f"))["state"] == PENDING
+    clock.now += 4
+    assert await store.claim("a", "f") is None
+
+
+@pytest.mark.asyncio
+async def test_release_frees_the_key(store):
+    await store.claim("a", "f")
+    await store.release("a")
+    assert await store.wait("a", 0) is None
+    assert await store.claim("a", "f") is None
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_when_completed(store):
+    await store.claim("a", "f")
+    waiter = asyncio.create_task(store.wait("a", 5))
+    await asyncio.sleep(0)
+    await store.complete("a", {"fingerprint": "f", "status": 200, "headers": [], "body": b"ok"})
+    record = await asyncio.wait_for(waiter, 1)
+    assert record["body"] == b"ok"
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_on_pending(store):
+    await store.claim("a", "f")
+    assert (await store.wait("a", 0.01))["state"] == PENDING
+
+
+def receiver(*chunks):
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    return receive
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunks, expected", [
+    ((b"",), b""),
+    ((b"12345", b"67890"), b"1234567890"),
+    ((b"12345", b"67890", b"1"), None),
+    ((b"12345678901",), None),
+])
+async def test_read_body_stops_past_the_limit(chunks, expected):
+    assert await _read_body(receiver(*chunks), BODY_LIMIT) == expected
+
+
+class EchoApp:
+    """Responds with the request body it received."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"x-echo", b"1")]})
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture
+def app(monkeypatch, store):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_MAX_BODY_BYTES", BODY_LIMIT)
+    monkeypatch.setattr(middleware, "idempotency_store", store)
+    return EchoApp()
+
+
+async def request(app, *chunks, key="key-1", content_length=None):
+    headers = [(b"authorization", b"Bearer token")]
+    if key is not None:
+        headers.append((IDEMPOTENCY_KEY_HEADER.lower().encode(), key.encode()))
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/api/v1/orders/", "query_string": b"", "headers": headers}
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await IdempotencyMiddleware(app)(scope, receiver(*chunks), send)
+    start = messages[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in messages[1:])
+
+
+@pytest.mark.asyncio
+async def test_body_at_the_limit_is_executed_and_replayed(app):
+    status, _, body = await request(app, b"12345", b"67890")
+    assert (status, body) == (201, b"1234567890")
+    status, headers, body = await request(app, b"1234567890")
+    assert (status, body) == (201, b"1234567890")
+    assert headers[IDEMPOTENT_REPLAY_HEADER.lower().encode()] == b"true"
+    assert app.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_past_the_limit_is_rejected(app):
+    status, _, body = await request(app, b"12345", b"67890", b"1")
+    assert status == 413
+    assert str(BODY_LIMIT) in json.loads(body)["detail"]
+    assert app.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_content_length_past_the_limit_is_rejected_unread(app):
+    # No body messages: the middleware must not try to receive one
+    status, _, _ = await request(app, content_length=BODY_LIMIT + 1)
+    assert status == 413
+    assert app.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_body_does_not_claim_the_key(app):
+    await request(app, b"12345678901")
+    status, _, body = await request(app, b"ok")
+    assert (status, body) == (201, b"ok")
+
+
+@pytest.mark.asyncio
+async def test_requests_without_a_key_are_not_limited(app):
+    status, _, body = await request(app, b"x" * (BODY_LIMIT * 3), key=None)
+    assert (status, body) == (201, b"x" * (BODY_LIMIT * 3))
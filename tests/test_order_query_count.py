@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from typing import List
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from src.application.queries.order_queries import OrderDTO
+from src.infrastructure.repositories.order_repository import ITEM_LOADERS, OrderRepository
+
+PAGE_SIZES = [1, 10, 30]
+
+
+@contextmanager
+def count_statements(engine) -> List[str]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest_asyncio.fixture
+async def orders(db, user, product):
+    """Orders with two items each; returns their creation time."""
+    repository = OrderRepository(db)
+    for _ in range(max(PAGE_SIZES)):
+        order = await repository.create({
+            'user_id': user.id,
+            'payment_method': 'paypal',
+            'subtotal': 20.0,
+            'total_amount': 20.0,
+            'shipping_address': 'Shipping address',
+            'billing_address': 'Billing address',
+        })
+        await repository.add_items(order, [
+            {'product_id': product.id, 'quantity': 1, 'unit_price': 10.0, 'total_price': 10.0},
+            {'product_id': product.id, 'quantity': 1, 'unit_price': 10.0, 'total_price': 10.0},
+        ])
+    await db.commit()
+    return order.created_at
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("items_loading", sorted(ITEM_LOADERS))
+async def test_order_pages_run_constant_number_of_statements(engine, db, user, orders, items_loading):
+    repository = OrderRepository(db, items_loading)
+    pages = {
+        # Skips orders that other tests left in the database
+        "get_all": lambda limit: repository.get_all(limit=limit, created_from=orders),
+        "get_by_user_id": lambda limit: repository.get_by_user_id(user.id, limit=limit),
+    }
+    for name, load_page in pages.items():
+        counts = {}
+        for limit in PAGE_SIZES:
+            db.expunge_all()
+            with count_statements(engine) as statements:
+                page = await load_page(limit)
+                dtos = [OrderDTO.model_validate(order) for order in page]
+            assert len(page) == limit
+            assert all(len(dto.items) == 2 for dto in dtos)
+            counts[limit] = len(statements)
+        assert len(set(counts.values())) == 1, f"{name} with {items_loading}: {counts}"
+        # The orders, plus at most one query for all of their items
+        assert counts[1] <= 2
@@ -0,0 +1,105 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from src.domain.models import Product
+from src.infrastructure.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    keyset_paginate,
+    next_cursor,
+    set_next_cursor,
+)
+
+CREATED_AT = datetime(2024, 3, 9, 14, 30, 5, 123456, tzinfo=timezone.utc)
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def compiled(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize("created_at, id", [
+    (CREATED_AT, 1),
+    (CREATED_AT.astimezone(timezone(timedelta(hours=-5))), 2 ** 40),
+    (datetime(2024, 3, 9), 7),
+])
+def test_cursor_round_trip(created_at, id):
+    assert decode_cursor(encode_cursor(created_at, id)) == (created_at, id)
+
+
+def test_cursor_keeps_the_timezone_offset():
+    decoded, _ = decode_cursor(encode_cursor(CREATED_AT, 1))
+    assert decoded.utcoffset() == timedelta(0)
+
+
+def test_cursor_is_url_safe_without_padding():
+    for id in range(20):
+        cursor = encode_cursor(CREATED_AT, id)
+        assert "=" not in cursor
+        assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "a",
+    "not a cursor!",
+    b64(b"\xff\xfe"),
+    b64(b"[1, 2"),
+    b64(json.dumps(5).encode()),
+    b64(json.dumps(None).encode()),
+    b64(json.dumps({"created_at": "2024-03-09"}).encode()),
+    b64(json.dumps(["2024-03-09T14:30:05"]).encode()),
+    b64(json.dumps(["2024-03-09T14:30:05", 1, 2]).encode()),
+    b64(json.dumps([1, 2]).encode()),
+    b64(json.dumps(["yesterday", 1]).encode()),
+    b64(json.dumps(["2024-03-09T14:30:05", "one"]).encode()),
+    b64(json.dumps(["2024-03-09T14:30:05", None]).encode()),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(cursor)
+
+
+def test_keyset_paginate_continues_after_the_cursor():
+    query = keyset_paginate(select(Product), Product, encode_cursor(CREATED_AT, 5), skip=40, limit=20)
+    sql = compiled(query)
+    assert "(products.created_at, products.id) > (" in sql
+    assert "ORDER BY products.created_at, products.id" in sql
+    # The cursor replaces the offset
+    assert "OFFSET" not in sql
+    assert "LIMIT" in sql
+
+
+def test_keyset_paginate_falls_back_to_skip():
+    sql = compiled(keyset_paginate(select(Product), Product, None, skip=40, limit=20))
+    assert "OFFSET" in sql
+    assert ">" not in sql
+
+
+def test_keyset_paginate_rejects_malformed_cursor():
+    with pytest.raises(ValueError):
+        keyset_paginate(select(Product), Product, "garbage", skip=0, limit=20)
+
+
+def test_next_cursor_only_for_full_pages():
+    items = [SimpleNamespace(created_at=CREATED_AT + timedelta(seconds=i), id=i) for i in range(3)]
+    assert next_cursor(items, limit=4) is None
+    assert next_cursor([], limit=1) is None
+    assert decode_cursor(next_cursor(items, limit=3)) == (items[-1].created_at, 2)
+
+
+def test_set_next_cursor_header():
+    items = [SimpleNamespace(created_at=CREATED_AT, id=9)]
+    response = SimpleNamespace(headers={})
+    set_next_cursor(response, items, limit=2)
+    assert NEXT_CURSOR_HEADER not in response.headers
+    set_next_cursor(response, items, limit=1)
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (CREATED_AT, 9)
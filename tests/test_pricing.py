@@ -0,0 +1,121 @@
+import numpy as np
+from src.domain.pricing import (
+    BuyXGetYPromotion,
+    CategoryDiscountPromotion,
+    PercentageOffPromotion,
+    PricingEngine,
+    build_cart_lines,
+    promotions_adapter,
+    to_cents,
+)
+
+
+def quote(engine, carts):
+    return engine.price(build_cart_lines(carts), len(carts))
+
+
+def test_to_cents_rounds_to_the_nearest_cent():
+    assert to_cents([19.99, 0.1 + 0.2, 5]).tolist() == [1999, 30, 500]
+
+
+def test_shipping_uses_the_highest_tier_reached():
+    engine = PricingEngine(tax_rate_bps=0, shipping_tiers=[(5000, 0), (0, 500), (2000, 250)])
+    quotes = quote(engine, [
+        [(1, 1, 1, 1999)],
+        [(1, 1, 1, 2000)],
+        [(1, 1, 1, 4999)],
+        [(1, 1, 1, 5000)],
+    ])
+    assert quotes.shipping.tolist() == [500, 250, 250, 0]
+    assert quotes.total.tolist() == [2499, 2250, 5249, 5000]
+
+
+def test_no_shipping_below_the_lowest_tier():
+    engine = PricingEngine(tax_rate_bps=0, shipping_tiers=[(1000, 300)])
+    quotes = quote(engine, [[(1, 1, 1, 500)], [(1, 1, 1, 1000)]])
+    assert quotes.shipping.tolist() == [0, 300]
+
+
+def test_no_tiers_means_free_shipping():
+    engine = PricingEngine(tax_rate_bps=0, shipping_tiers=[])
+    assert quote(engine, [[(1, 1, 2, 700)]]).shipping.tolist() == [0]
+
+
+def test_line_promotions_apply_only_the_largest_discount():
+    engine = PricingEngine(tax_rate_bps=0, shipping_tiers=[], promotions=[
+        CategoryDiscountPromotion(name="category", category_id=7, percent=10),
+        BuyXGetYPromotion(name="bogo", product_id=1, buy=2, get=1),
+    ])
+    quotes = quote(engine, [
+        # Three units of product 1: one is free (1000), beating 10% (300)
+        [(1, 7, 3, 1000)],
+        # Two units: no full group, so only the category discount applies
+        [(1, 7, 2, 1000)],
+        # Neither promotion matches
+        [(2, 8, 1, 1000)],
+    ])
+    assert quotes.subtotal.tolist() == [3000, 2000, 1000]
+    assert quotes.discount.tolist() == [1000, 200, 0]
+    assert quotes.promotions == [["bogo"], ["category"], []]
+
+
+def test_buy_x_get_y_counts_every_full_group():
+    engine = PricingEngine(tax_rate_bps=0, shipping_tiers=[], promotions=[
+        BuyXGetYPromotion(name="bogo", product_id=1, buy=2, get=1),
+    ])
+    quotes = quote(engine, [[(1, 1, 7, 100)]])
+    assert quotes.discount.tolist() == [200]
+
+
+def test_cart_promotion_applies_to_the_discounted_subtotal():
+    engine = PricingEngine(tax_rate_bps=0, shipping_tiers=[], promotions=[
+        BuyXGetYPromotion(name="bogo", product_id=1, buy=2, get=1),
+        PercentageOffPromotion(name="five", percent=5, min_subtotal=20),
+        PercentageOffPromotion(name="ten", percent=10, min_subtotal=50),
+    ])
+    quotes = quote(engine, [
+        # 3000 subtotal, 2000 after the free unit: only "five" is eligible
+        [(1, 1, 3, 1000)],
+        # 6000 with no line discount: "ten" is the better of the two
+        [(2, 1, 6, 1000)],
+        # Below every minimum
+        [(2, 1, 1, 1000)],
+    ])
+    assert quotes.discount.tolist() == [1100, 600, 0]
+    assert quotes.total.tolist() == [1900, 5400, 1000]
+    assert quotes.promotions == [["bogo", "five"], ["ten"], []]
+
+
+def test_tax_rounds_half_up_to_the_cent():
+    engine = PricingEngine(tax_rate_bps=50, shipping_tiers=[])
+    quotes = quote(engine, [[(1, 1, 1, 100)], [(1, 1, 1, 99)], [(1, 1, 1, 300)]])
+    # 0.5 -> 1, 0.495 -> 0, 1.5 -> 2
+    assert quotes.tax.tolist() == [1, 0, 2]
+
+
+def test_tax_is_charged_on_the_discounted_subtotal():
+    engine = PricingEngine(tax_rate_bps=825, shipping_tiers=[(0, 500)], promotions=[
+        PercentageOffPromotion(name="ten", percent=10),
+    ])
+    quotes = quote(engine, [[(1, 1, 1, 1371)]])
+    # 1371 - 137 = 1234; 8.25% of 1234 is 101.805
+    assert quotes.tax.tolist() == [102]
+    assert quotes.total.tolist() == [1234 + 500 + 102]
+
+
+def test_amounts_are_integer_cents():
+    engine = PricingEngine(tax_rate_bps=825, shipping_tiers=[(0, 500)])
+    quotes = quote(engine, [[(1, 1, 1, 1999)]])
+    for amounts in quotes[:5]:
+        assert amounts.dtype == np.int64
+
+
+def test_promotions_are_parsed_by_type():
+    promotions = promotions_adapter.validate_python([
+        {"type": "percentage_off", "name": "ten", "percent": 10},
+        {"type": "buy_x_get_y", "name": "bogo", "product_id": 1, "buy": 1, "get": 1},
+        {"type": "category_discount", "name": "cat", "category_id": 3, "percent": 15},
+    ])
+    assert [type(promotion) for promotion in promotions] == [
+        PercentageOffPromotion, BuyXGetYPromotion, CategoryDiscountPromotion
+    ]